@@ -0,0 +1 @@
+"""Micro and load benchmarks for cooking_forum_backend."""
@@ -0,0 +1,84 @@
+"""
+Encode/decode throughput of the JWT backends.
+
+Usage::
+
+    python -m benchmarks.jwt_throughput [--number 20000]
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Tuple
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jose import jwt
+
+from cooking_forum_backend.services.jwt_backends import (
+    AsymmetricBackend,
+    HS256Backend,
+    JoseBackend,
+    JWTBackend,
+)
+
+SECRET = "benchmark_secret"
+
+
+def _backends() -> Dict[str, JWTBackend]:
+    return {
+        "python-jose HS256": JoseBackend(SECRET, "HS256"),
+        "HS256Backend": HS256Backend(SECRET),
+        "EdDSA": AsymmetricBackend(
+            "EdDSA",
+            {"bench": ed25519.Ed25519PrivateKey.generate()},
+            "bench",
+        ),
+        "ES256": AsymmetricBackend(
+            "ES256",
+            {"bench": ec.generate_private_key(ec.SECP256R1())},
+            "bench",
+        ),
+    }
+
+
+def _ops_per_second(operation: Callable[[], object], number: int) -> float:
+    best = min(timeit.repeat(operation, number=number, repeat=5))
+    return number / best
+
+
+def run(number: int) -> Dict[str, Tuple[float, float]]:
+    """
+    Measure every backend.
+
+    :param number: operations per measurement.
+    :return: encode and decode operations per second by backend.
+    """
+    claims = {
+        "sub": "benchmark_user",
+        "jti": "0123456789abcdef0123456789abcdef",
+        "exp": datetime.utcnow() + timedelta(hours=1),
+    }
+    results = {}
+    for name, backend in _backends().items():
+        token = backend.encode(claims)
+        # Every backend must produce standard tokens.
+        assert jwt.get_unverified_claims(token)["sub"] == "benchmark_user"
+        results[name] = (
+            _ops_per_second(lambda: backend.encode(claims), number),  # noqa: B023
+            _ops_per_second(lambda: backend.decode(token), number),  # noqa: B023
+        )
+    return results
+
+
+def main() -> None:
+    """Print the benchmark results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'backend':<20}{'encode/s':>12}{'decode/s':>12}")  # noqa: WPS421
+    for name, (encode, decode) in run(args.number).items():
+        print(f"{name:<20}{encode:>12.0f}{decode:>12.0f}")  # noqa: WPS421
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Latency of the recipe search over a seeded corpus.
+
+Seeds the configured database (COOKING_FORUM_BACKEND_DB_* variables) up to
+the requested number of recipes, then times the first page and a deep page
+of a few queries. Seeding is skipped for recipes already there.
+
+Usage::
+
+    python -m benchmarks.recipe_search [--recipes 1000000] [--repeat 20] [--pages 10]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from cooking_forum_backend.db.bulk import bulk_insert
+from cooking_forum_backend.db.engine import create_db_engine
+from cooking_forum_backend.db.meta import meta
+from cooking_forum_backend.db.models import load_all_models
+from cooking_forum_backend.db.models.recipe_model import RecipeModel
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.db.repositories.recipe_repository import (
+    RecipeRepository,
+    RecipeSearchCursor,
+)
+
+BATCH_SIZE = 10000
+AUTHOR = "benchmark_author"
+QUERIES = (
+    "chicken garlic",
+    '"tomato sauce"',
+    "vegan chocolate cake",
+    "lemon -salmon",
+    "saffron or cardamom",
+)
+
+ADJECTIVES = (
+    "crispy", "creamy", "spicy", "smoky", "quick", "rustic", "vegan", "tangy",
+    "classic", "roasted", "grilled", "braised", "sweet", "zesty", "hearty",
+)
+INGREDIENTS = (
+    "chicken", "garlic", "tomato", "basil", "lemon", "salmon", "rice", "beans",
+    "chocolate", "butter", "flour", "saffron", "cardamom", "ginger", "onion",
+    "mushroom", "spinach", "potato", "pork", "beef", "tofu", "chickpeas",
+    "coconut", "lime", "honey", "cumin", "paprika", "yogurt", "eggs", "cheese",
+)
+DISHES = (
+    "stew", "curry", "salad", "soup", "pie", "risotto", "tacos", "cake",
+    "pasta", "sauce", "bowl", "skewers", "bread", "pancakes", "casserole",
+)
+STEPS = (
+    "Chop the {0} and fry it with the {1} until golden.",
+    "Simmer the {0} in the {1} sauce for twenty minutes.",
+    "Whisk the {0} with the {1} and season to taste.",
+    "Roast the {0} in a hot oven, then toss with the {1}.",
+    "Bake until the {0} is set and serve with the {1}.",
+)
+
+
+def _recipe(rng: random.Random, author_id: int) -> Dict[str, Any]:
+    ingredients = rng.sample(INGREDIENTS, 6)
+    steps = [
+        rng.choice(STEPS).format(*rng.sample(ingredients, 2))
+        for _ in range(rng.randint(3, 6))
+    ]
+    return {
+        "author_id": author_id,
+        "title": (
+            f"{rng.choice(ADJECTIVES).capitalize()} "
+            f"{ingredients[0]} {rng.choice(DISHES)}"
+        ),
+        "ingredients": ", ".join(ingredients),
+        "instructions": " ".join(steps),
+        "created_at": datetime.utcnow(),
+    }
+
+
+async def seed(engine: AsyncEngine, recipes: int) -> None:
+    """
+    Fill the database up to a number of recipes.
+
+    :param engine: engine of the database.
+    :param recipes: number of recipes wanted.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(meta.create_all)
+        author_id = await conn.scalar(
+            select(UserModel.id).where(UserModel.username == AUTHOR),
+        )
+        existing = await conn.scalar(select(func.count()).select_from(RecipeModel))
+
+    if author_id is None:
+        await bulk_insert(
+            engine,
+            UserModel.__table__,
+            [
+                {
+                    "username": AUTHOR,
+                    "email": f"{AUTHOR}@example.com",
+                    "password": "!",
+                    "two_fa_enabled": False,
+                    "created_at": datetime.utcnow(),
+                },
+            ],
+        )
+        async with engine.connect() as conn:  # noqa: WPS440
+            author_id = await conn.scalar(
+                select(UserModel.id).where(UserModel.username == AUTHOR),
+            )
+
+    rng = random.Random(existing)
+    started = time.perf_counter()
+    for offset in range(existing, recipes, BATCH_SIZE):
+        rows = [
+            _recipe(rng, author_id)
+            for _ in range(min(BATCH_SIZE, recipes - offset))
+        ]
+        await bulk_insert(engine, RecipeModel.__table__, rows)
+        print(f"\rseeded {offset + len(rows)}/{recipes}", end="")  # noqa: WPS421
+
+    if existing < recipes:
+        async with engine.begin() as conn:  # noqa: WPS440
+            await conn.execute(text("ANALYZE recipes"))
+        elapsed = time.perf_counter() - started
+        print(f"\nseeding took {elapsed:.1f}s")  # noqa: WPS421
+
+
+async def _timed_search(
+    engine: AsyncEngine,
+    query: str,
+    after: Optional[RecipeSearchCursor],
+) -> Tuple[float, Optional[RecipeSearchCursor], int]:
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        started = time.perf_counter()
+        hits = await RecipeRepository(session).search(query, limit=20, after=after)
+        elapsed = time.perf_counter() - started
+
+    cursor = (hits[-1][1], hits[-1][0].id) if hits else None
+    return elapsed, cursor, len(hits)
+
+
+async def run(recipes: int, repeat: int, pages: int) -> List[Tuple[str, ...]]:
+    """
+    Seed the database and time the queries.
+
+    :param recipes: size of the corpus.
+    :param repeat: timings per query.
+    :param pages: depth of the deep page.
+    :return: rows of the results table.
+    """
+    load_all_models()
+    engine = create_db_engine()
+    try:
+        await seed(engine, recipes)
+        rows = []
+        for query in QUERIES:
+            first_page = []
+            for _ in range(repeat):
+                elapsed, _, hits = await _timed_search(engine, query, None)
+                first_page.append(elapsed * 1000)
+
+            cursor = None
+            for _ in range(pages):  # noqa: WPS440
+                elapsed, cursor, _ = await _timed_search(engine, query, cursor)
+                if cursor is None:
+                    break
+
+            quantiles = statistics.quantiles(first_page, n=20)
+            rows.append(
+                (
+                    query,
+                    str(hits),
+                    f"{statistics.median(first_page):.1f}",
+                    f"{quantiles[-1]:.1f}",
+                    f"{elapsed * 1000:.1f}",
+                ),
+            )
+        return rows
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Print the benchmark results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recipes", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args.recipes, args.repeat, args.pages))
+    print(  # noqa: WPS421
+        f"{'query':<24}{'hits':>6}{'p50 ms':>10}{'p95 ms':>10}"
+        f"{'page ' + str(args.pages) + ' ms':>14}",
+    )
+    for query, hits, p50, p95, deep in rows:
+        print(f"{query:<24}{hits:>6}{p50:>10}{p95:>10}{deep:>14}")  # noqa: WPS421
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Python overhead of the hot queries, before and after lambda statements.
+
+Times ``UserRepository.get_by_username`` and
+``OTPRepository.get_active_by_user_id`` on the configured database
+(COOKING_FORUM_BACKEND_DB_* variables), against:
+
+* the previous code, building a ``select()`` on every call,
+* the same without SQLAlchemy's compiled cache,
+* the repositories with prepared statements disabled,
+* the bare asyncpg round trip of the same SQL, the floor.
+
+The overhead column is the time over that floor.
+
+Usage::
+
+    python -m benchmarks.statement_cache [--calls 5000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from cooking_forum_backend.db.engine import create_db_engine
+from cooking_forum_backend.db.meta import meta
+from cooking_forum_backend.db.models import load_all_models
+from cooking_forum_backend.db.models.otp_model import OTPModel
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.db.repositories.otp_repository import OTPRepository
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.settings import settings
+
+Query = Callable[[AsyncSession], Awaitable[Any]]
+
+ROUNDS = 5
+
+
+async def _select_username(session: AsyncSession) -> Any:
+    results = await session.execute(
+        select(UserModel).where(UserModel.username == "benchmark_user"),
+    )
+    return results.scalar_one_or_none()
+
+
+async def _select_active_otp(session: AsyncSession) -> Any:
+    results = await session.execute(
+        select(OTPModel)
+        .where(OTPModel.user_id == 0)
+        .where(OTPModel.expires_at > datetime.utcnow())
+        .where(OTPModel.used_at.is_(None))
+        .order_by(OTPModel.expires_at.desc()),
+    )
+    return results.scalar_one_or_none()
+
+
+QUERIES: Dict[str, Tuple[Query, Query]] = {
+    "get_by_username": (
+        _select_username,
+        lambda session: UserRepository(session).get_by_username("benchmark_user"),
+    ),
+    "get_active_by_user_id": (
+        _select_active_otp,
+        lambda session: OTPRepository(session).get_active_by_user_id(0),
+    ),
+}
+
+
+async def _per_call(engine: AsyncEngine, query: Query, calls: int) -> float:
+    async with AsyncSession(engine) as session:
+        for _ in range(100):
+            await query(session)
+
+        rounds = []
+        for _ in range(ROUNDS):  # noqa: WPS440
+            started = time.perf_counter()
+            for _ in range(calls // ROUNDS):  # noqa: WPS440
+                await query(session)
+            rounds.append((time.perf_counter() - started) / (calls // ROUNDS))
+    return statistics.median(rounds) * 1e6
+
+
+async def _driver_floor(engine: AsyncEngine, query: Query, calls: int) -> float:
+    # Captures the SQL sent by the repository, then runs it with asyncpg.
+    statements: List[Tuple[str, Tuple[Any, ...]]] = []
+    async with AsyncSession(engine) as session:
+        connection = await session.connection()
+
+        def capture(*args: Any) -> None:  # noqa: WPS430
+            statements.append((args[2], tuple(args[3])))
+
+        event.listen(connection.sync_connection, "before_cursor_execute", capture)
+        await query(session)
+        event.remove(connection.sync_connection, "before_cursor_execute", capture)
+
+        raw = await connection.get_raw_connection()
+        driver = raw.driver_connection
+        sql, parameters = statements[-1]
+        prepared = await driver.prepare(sql)
+        rounds = []
+        for _ in range(ROUNDS):
+            started = time.perf_counter()
+            for _ in range(calls // ROUNDS):  # noqa: WPS440
+                await prepared.fetch(*parameters)
+            rounds.append((time.perf_counter() - started) / (calls // ROUNDS))
+    return statistics.median(rounds) * 1e6
+
+
+async def run(calls: int) -> List[Tuple[str, ...]]:
+    """
+    Time every variant of the hot queries.
+
+    :param calls: calls per variant.
+    :return: rows of the results table.
+    """
+    load_all_models()
+    engine = create_db_engine()
+    uncached = engine.execution_options(compiled_cache=None)
+    unprepared = create_db_engine(
+        make_url(settings.db_url).update_query_dict(
+            {"prepared_statement_cache_size": "0"},
+        ).render_as_string(hide_password=False),
+    )
+    rows = []
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(meta.create_all)
+
+        for name, (before, after) in QUERIES.items():
+            floor = await _driver_floor(engine, after, calls)
+            variants = (
+                ("select(), no compiled cache", uncached, before),
+                ("select() (before)", engine, before),
+                ("lambda_stmt (after)", engine, after),
+                ("lambda_stmt, not prepared", unprepared, after),
+            )
+            rows.append((name, "asyncpg prepared", f"{floor:.0f}", "-"))
+            for label, variant_engine, query in variants:
+                per_call = await _per_call(variant_engine, query, calls)
+                rows.append(
+                    (name, label, f"{per_call:.0f}", f"{per_call - floor:.0f}"),
+                )
+        return rows
+    finally:
+        await engine.dispose()
+        await unprepared.dispose()
+
+
+def main() -> None:
+    """Print the benchmark results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args.calls))
+    print(  # noqa: WPS421
+        f"{'query':<24}{'variant':<30}{'us/call':>10}{'overhead us':>14}",
+    )
+    for query, variant, per_call, overhead in rows:
+        print(  # noqa: WPS421
+            f"{query:<24}{variant:<30}{per_call:>10}{overhead:>14}",
+        )
+
+
+if __name__ == "__main__":
+    main()
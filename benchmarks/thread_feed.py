@@ -0,0 +1,261 @@
+"""
+Latency of the threads feed as the number of posts grows.
+
+Seeds the configured database (COOKING_FORUM_BACKEND_DB_* variables) with
+threads, then with posts in stages. At every stage it times the feed read
+from the denormalized threads columns, and the same feed aggregated from the
+posts (join + ORDER BY max(posts.created_at)) for comparison.
+
+Usage::
+
+    python -m benchmarks.thread_feed [--threads 10000] [--posts 10000,100000,1000000]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Coroutine, List, Sequence, Tuple
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from cooking_forum_backend.db.bulk import bulk_insert
+from cooking_forum_backend.db.engine import create_db_engine
+from cooking_forum_backend.db.meta import meta
+from cooking_forum_backend.db.models import load_all_models
+from cooking_forum_backend.db.models.post_model import PostModel
+from cooking_forum_backend.db.models.thread_model import ThreadModel
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.db.repositories.thread_repository import ThreadRepository
+
+BATCH_SIZE = 10000
+AUTHOR = "benchmark_author"
+PAGE_SIZE = 20
+
+AGGREGATED_FEED = (
+    select(
+        ThreadModel.id,
+        ThreadModel.title,
+        func.count(PostModel.id).label("post_count"),
+        func.max(PostModel.created_at).label("last_activity_at"),
+    )
+    .join(PostModel, PostModel.thread_id == ThreadModel.id)
+    .group_by(ThreadModel.id, ThreadModel.title)
+    .order_by(text("last_activity_at DESC"), ThreadModel.id.desc())
+    .limit(PAGE_SIZE)
+)
+
+
+async def _author_id(engine: AsyncEngine) -> int:
+    query = select(UserModel.id).where(UserModel.username == AUTHOR)
+    async with engine.connect() as conn:
+        author_id = await conn.scalar(query)
+    if author_id is None:
+        await bulk_insert(
+            engine,
+            UserModel.__table__,
+            [
+                {
+                    "username": AUTHOR,
+                    "email": f"{AUTHOR}@example.com",
+                    "password": "!",
+                    "two_fa_enabled": False,
+                    "created_at": datetime.utcnow(),
+                },
+            ],
+        )
+        async with engine.connect() as conn:  # noqa: WPS440
+            author_id = await conn.scalar(query)
+    return author_id
+
+
+async def reset(engine: AsyncEngine, threads: int) -> Tuple[int, int]:
+    """
+    Replace the threads and posts with empty threads.
+
+    :param engine: engine of the database.
+    :param threads: number of threads.
+    :return: author id and id of the first thread.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(meta.create_all)
+        await conn.execute(delete(PostModel))
+        await conn.execute(delete(ThreadModel))
+
+    author_id = await _author_id(engine)
+    start = datetime.utcnow() - timedelta(days=365)
+    await bulk_insert(
+        engine,
+        ThreadModel.__table__,
+        [
+            {
+                "author_id": author_id,
+                "title": f"Thread {number}",
+                "created_at": start,
+                "last_activity_at": start,
+                "post_count": 0,
+            }
+            for number in range(threads)
+        ],
+    )
+    async with engine.connect() as conn:
+        first_thread_id = await conn.scalar(select(func.min(ThreadModel.id)))
+    return author_id, first_thread_id
+
+
+async def add_posts(  # noqa: WPS211
+    engine: AsyncEngine,
+    author_id: int,
+    first_thread_id: int,
+    threads: int,
+    posts: int,
+    rng: random.Random,
+) -> None:
+    """
+    Add posts to random threads, then refresh the denormalized columns.
+
+    Posts are loaded in bulk here, bypassing ThreadRepository.create_post,
+    so the threads are updated with one aggregate query afterwards.
+
+    :param engine: engine of the database.
+    :param author_id: author of the posts.
+    :param first_thread_id: id of the first thread.
+    :param threads: number of threads.
+    :param posts: number of posts to add.
+    :param rng: random generator.
+    """
+    now = datetime.utcnow()
+    for offset in range(0, posts, BATCH_SIZE):
+        await bulk_insert(
+            engine,
+            PostModel.__table__,
+            [
+                {
+                    "thread_id": first_thread_id + rng.randrange(threads),
+                    "author_id": author_id,
+                    "body": "Looks delicious, I'll try it this weekend.",
+                    "created_at": now - timedelta(seconds=rng.randrange(10 ** 7)),
+                }
+                for _ in range(min(BATCH_SIZE, posts - offset))
+            ],
+        )
+
+    post_count = (
+        select(func.count(PostModel.id))
+        .where(PostModel.thread_id == ThreadModel.id)
+        .scalar_subquery()
+    )
+    last_activity_at = (
+        select(func.max(PostModel.created_at))
+        .where(PostModel.thread_id == ThreadModel.id)
+        .scalar_subquery()
+    )
+    async with engine.begin() as conn:
+        await conn.execute(
+            ThreadModel.__table__.update().values(
+                post_count=post_count,
+                last_activity_at=func.coalesce(
+                    last_activity_at,
+                    ThreadModel.last_activity_at,
+                ),
+            ),
+        )
+        await conn.execute(text("ANALYZE threads"))
+        await conn.execute(text("ANALYZE posts"))
+
+
+async def _timings(
+    query: Callable[[], Coroutine[Any, Any, Any]],
+    repeat: int,
+) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await query()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def run(threads: int, stages: Sequence[int], repeat: int) -> List[Tuple[str, ...]]:
+    """
+    Time both feeds at every stage.
+
+    :param threads: number of threads.
+    :param stages: total number of posts of every stage.
+    :param repeat: timings per feed and stage.
+    :return: rows of the results table.
+    """
+    load_all_models()
+    engine = create_db_engine()
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    rng = random.Random(0)
+    rows = []
+    try:
+        author_id, first_thread_id = await reset(engine, threads)
+        total = 0
+        for stage in stages:
+            await add_posts(
+                engine,
+                author_id,
+                first_thread_id,
+                threads,
+                stage - total,
+                rng,
+            )
+            total = stage
+
+            async with session_factory() as session:
+                repository = ThreadRepository(session)
+                feed = await repository.get_feed(limit=PAGE_SIZE)
+                after = (feed[-1].last_activity_at, feed[-1].id)
+
+                denormalized = await _timings(
+                    lambda: repository.get_feed(limit=PAGE_SIZE),
+                    repeat,
+                )
+                next_page = await _timings(
+                    lambda: repository.get_feed(  # noqa: B023
+                        limit=PAGE_SIZE,
+                        after=after,
+                    ),
+                    repeat,
+                )
+                aggregated = await _timings(
+                    lambda: session.execute(AGGREGATED_FEED),
+                    repeat,
+                )
+
+            rows.append(
+                (
+                    str(stage),
+                    f"{statistics.median(denormalized):.2f}",
+                    f"{statistics.median(next_page):.2f}",
+                    f"{statistics.median(aggregated):.2f}",
+                ),
+            )
+        return rows
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Print the benchmark results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=10000)
+    parser.add_argument("--posts", default="10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    stages = sorted(int(stage) for stage in args.posts.split(","))
+
+    rows = asyncio.run(run(args.threads, stages, args.repeat))
+    print(  # noqa: WPS421
+        f"{'posts':>10}{'feed ms':>12}{'next page ms':>14}{'aggregated ms':>16}",
+    )
+    for posts, feed, next_page, aggregated in rows:
+        print(f"{posts:>10}{feed:>12}{next_page:>14}{aggregated:>16}")  # noqa: WPS421
+
+
+if __name__ == "__main__":
+    main()
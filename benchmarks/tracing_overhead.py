@@ -0,0 +1,163 @@
+"""
+Cost of tracing on an authenticated request.
+
+Times GET /api/users/me (JWT decode, user lookup, serialization) on the
+configured database (COOKING_FORUM_BACKEND_DB_* variables), in process:
+
+* without a tracer,
+* with a tracer, on requests not sampled,
+* on sampled requests, spans kept in memory,
+* on sampled requests, spans written to a file by the exporter thread.
+
+The variants take turns over 20 rounds and the medians are compared;
+overheads below the printed stdev of the baseline rounds are noise. The
+expected overhead at ``--sample-rate`` mixes the sampled and unsampled
+costs. Exits with status 1 when it's over ``--budget-percent``.
+
+Usage::
+
+    python -m benchmarks.tracing_overhead [--requests 3000] [--sample-rate 0.1]
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from httpx import AsyncClient
+
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.crypto import CryptoService
+from cooking_forum_backend.services.tracing import (
+    FileSpanExporter,
+    InMemorySpanExporter,
+    Tracer,
+    set_tracer,
+)
+from cooking_forum_backend.web.application import get_app
+
+ROUNDS = 20
+
+
+async def _round(client: AsyncClient, url: str, token: str, requests: int) -> float:
+    headers = {"Authorization": f"Bearer {token}"}
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(url, headers=headers)
+    elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    return elapsed / requests * 1e6
+
+
+async def run(requests: int, sample_rate: float) -> Tuple[List[Tuple[str, ...]], float]:
+    """
+    Time the request with every tracing variant.
+
+    :param requests: requests per variant.
+    :param sample_rate: sample rate the expected overhead is computed for.
+    :return: rows of the results table, expected overhead in percent.
+    """
+    app = get_app()
+    await app.router.startup()
+    # One access record per request would be measured as well.
+    logging.getLogger("cooking_forum_backend.access").setLevel(logging.WARNING)
+    spans_dir = tempfile.TemporaryDirectory()
+    try:
+        name = uuid.uuid4().hex
+        async with app.state.db_session_factory() as session:
+            await UserRepository(session, CryptoService()).create_user_model(
+                username=name,
+                email=f"{name}@example.com",
+                password=name,
+                two_fa_enabled=False,
+            )
+        token = CryptoService().create_access_token({"sub": name})
+        url = app.url_path_for("me")
+
+        memory = InMemorySpanExporter()
+        variants: List[Tuple[str, Optional[Tracer]]] = [
+            ("no tracer", None),
+            ("not sampled", Tracer(InMemorySpanExporter(), sample_rate=0)),
+            ("sampled, memory", Tracer(memory, sample_rate=1)),
+            (
+                "sampled, file",
+                Tracer(
+                    FileSpanExporter(Path(spans_dir.name) / "spans.jsonl", "bench"),
+                    sample_rate=1,
+                ),
+            ),
+        ]
+        # Variants take turns, so drifts of the machine hit them all alike.
+        rounds: Dict[str, List[float]] = {label: [] for label, _ in variants}
+        async with AsyncClient(app=app, base_url="http://bench") as client:
+            await _round(client, url, token, 200)
+            for _ in range(ROUNDS):
+                for label, tracer in variants:
+                    set_tracer(tracer)
+                    rounds[label].append(
+                        await _round(client, url, token, requests // ROUNDS),
+                    )
+                    set_tracer(None)
+        for _, tracer in variants:  # noqa: WPS440
+            if tracer is not None:
+                tracer.shutdown()
+        timings = {label: statistics.median(times) for label, times in rounds.items()}
+        spread = statistics.stdev(rounds["no tracer"])
+    finally:
+        await app.router.shutdown()
+        spans_dir.cleanup()
+
+    traced_requests = requests // ROUNDS * ROUNDS
+    spans_per_request = len(memory.spans) / traced_requests
+    baseline = timings["no tracer"]
+    rows = []
+    for label, per_request in timings.items():
+        overhead = per_request - baseline
+        per_span = "-"
+        if label.startswith("sampled"):
+            per_span = f"{overhead / spans_per_request:.1f}"
+        rows.append(
+            (label, f"{per_request:.0f}", f"{overhead:.0f}", per_span),
+        )
+
+    expected = sample_rate * (timings["sampled, file"] - baseline) + (
+        1 - sample_rate
+    ) * (timings["not sampled"] - baseline)
+    rows.append(("spans per sampled request", f"{spans_per_request:.1f}", "", ""))
+    rows.append(("stdev of the baseline rounds", f"{spread:.0f}", "", ""))
+    return rows, expected / baseline * 100
+
+
+def main() -> None:
+    """Print the benchmark results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    parser.add_argument("--budget-percent", type=float, default=2)
+    args = parser.parse_args()
+
+    rows, expected = asyncio.run(run(args.requests, args.sample_rate))
+    print(  # noqa: WPS421
+        f"{'variant':<28}{'us/request':>12}{'overhead us':>13}{'us/span':>10}",
+    )
+    for label, per_request, overhead, per_span in rows:
+        print(  # noqa: WPS421
+            f"{label:<28}{per_request:>12}{overhead:>13}{per_span:>10}",
+        )
+
+    verdict = "ok" if expected <= args.budget_percent else "OVER BUDGET"
+    print(  # noqa: WPS421
+        f"expected overhead at sample rate {args.sample_rate}: {expected:.2f}%,"
+        f" budget {args.budget_percent}%: {verdict}",
+    )
+    if expected > args.budget_percent:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Latency of username autocomplete, keystroke by keystroke.
+
+Seeds the configured database (COOKING_FORUM_BACKEND_DB_* variables) up to
+the requested number of users, then types random usernames into
+GET /api/users/autocomplete, one request per keystroke, as the forum
+editor does. Latencies are grouped by prefix length, next to the same
+queries run on the repository without the prefix cache.
+
+Exits with status 1 when the p99 of the endpoint misses the target.
+
+Usage::
+
+    python -m benchmarks.user_autocomplete [--users 100000] [--typed 500] \
+        [--p99-target-ms 20]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from httpx import AsyncClient
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from cooking_forum_backend.db.bulk import bulk_insert
+from cooking_forum_backend.db.engine import create_db_engine
+from cooking_forum_backend.db.meta import meta
+from cooking_forum_backend.db.models import load_all_models
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.web.application import get_app
+
+BATCH_SIZE = 10000
+MAX_TYPED = 8
+SYLLABLES = (
+    "ba", "ko", "mi", "chef", "sal", "ta", "ri", "no", "pe", "lu", "gar", "lic",
+    "tom", "ato", "bake", "er", "cook", "ie", "pan", "zu", "ve", "gan", "ro", "sa",
+)
+
+
+def _username(rng: random.Random, number: int) -> str:
+    syllables = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    return f"{syllables}{number}"
+
+
+async def seed(engine: AsyncEngine, users: int) -> List[str]:
+    """
+    Fill the database up to a number of users.
+
+    :param engine: engine of the database.
+    :param users: number of users wanted.
+    :return: sample of the usernames.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(meta.create_all)
+        existing = await conn.scalar(select(func.count()).select_from(UserModel))
+
+    rng = random.Random(existing)
+    for offset in range(existing, users, BATCH_SIZE):
+        await bulk_insert(
+            engine,
+            UserModel.__table__,
+            [
+                {
+                    "username": _username(rng, number),
+                    "email": f"user{number}@example.com",
+                    "password": "!",
+                    "two_fa_enabled": False,
+                    "created_at": datetime.utcnow(),
+                }
+                for number in range(offset, min(users, offset + BATCH_SIZE))
+            ],
+        )
+        seeded = min(users, offset + BATCH_SIZE)
+        print(f"\rseeded {seeded}/{users}", end="")  # noqa: WPS421
+
+    async with engine.begin() as conn:  # noqa: WPS440
+        if engine.dialect.name == "postgresql":
+            await conn.execute(text("ANALYZE users"))
+        usernames = await conn.scalars(
+            select(UserModel.username).order_by(func.random()).limit(1000),
+        )
+        return list(usernames)
+
+
+async def _uncached(engine: AsyncEngine, prefixes: List[str]) -> Dict[int, List[float]]:
+    timings: Dict[int, List[float]] = defaultdict(list)
+    async with AsyncSession(engine) as session:
+        repository = UserRepository(session)
+        for prefix in prefixes:
+            started = time.perf_counter()
+            await repository.autocomplete(prefix, limit=10)
+            timings[len(prefix)].append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def _endpoint(prefixes: List[str]) -> Dict[int, List[float]]:
+    app = get_app()
+    await app.router.startup()
+    timings: Dict[int, List[float]] = defaultdict(list)
+    try:
+        url = app.url_path_for("autocomplete_users")
+        async with AsyncClient(app=app, base_url="http://bench") as client:
+            for prefix in prefixes:
+                started = time.perf_counter()
+                response = await client.get(url, params={"prefix": prefix})
+                timings[len(prefix)].append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+    finally:
+        await app.router.shutdown()
+    return timings
+
+
+def _p99(timings: List[float]) -> float:
+    if len(timings) < 2:
+        return timings[0]
+    return statistics.quantiles(timings, n=100)[-1]
+
+
+async def run(users: int, typed: int) -> Tuple[bool, List[Tuple[str, ...]], float]:
+    """
+    Seed the database and type usernames.
+
+    :param users: number of users.
+    :param typed: number of usernames typed.
+    :return: whether the trigram index exists, rows of the results table,
+        and the overall p99 of the endpoint in milliseconds.
+    """
+    load_all_models()
+    engine = create_db_engine()
+    try:
+        sample = await seed(engine, users)
+        async with engine.connect() as conn:
+            indexed = engine.dialect.name == "postgresql" and bool(
+                await conn.scalar(text("SELECT to_regclass('ix_users_username_trgm')")),
+            )
+
+        rng = random.Random(0)
+        prefixes = [
+            username[:length]
+            for username in rng.choices(sample, k=typed)
+            for length in range(1, min(len(username), MAX_TYPED) + 1)
+        ]
+        uncached = await _uncached(engine, prefixes)
+    finally:
+        await engine.dispose()
+
+    endpoint = await _endpoint(prefixes)
+    rows = [
+        (
+            str(length),
+            str(len(endpoint[length])),
+            f"{statistics.median(uncached[length]):.2f}",
+            f"{_p99(uncached[length]):.2f}",
+            f"{statistics.median(endpoint[length]):.2f}",
+            f"{_p99(endpoint[length]):.2f}",
+        )
+        for length in sorted(endpoint)
+    ]
+    overall = _p99([timing for timings in endpoint.values() for timing in timings])
+    return indexed, rows, overall
+
+
+def main() -> None:
+    """Print the benchmark results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--typed", type=int, default=500)
+    parser.add_argument("--p99-target-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    indexed, rows, overall = asyncio.run(run(args.users, args.typed))
+    print(f"\ntrigram index: {'yes' if indexed else 'no'}")  # noqa: WPS421
+    print(  # noqa: WPS421
+        f"{'prefix':>6}{'requests':>10}{'query p50':>11}{'query p99':>11}"
+        f"{'http p50':>10}{'http p99':>10}",
+    )
+    for length, requests, query_p50, query_p99, http_p50, http_p99 in rows:
+        print(  # noqa: WPS421
+            f"{length:>6}{requests:>10}{query_p50:>11}{query_p99:>11}"
+            f"{http_p50:>10}{http_p99:>10}",
+        )
+
+    verdict = "ok" if overall <= args.p99_target_ms else "MISSED"
+    print(  # noqa: WPS421
+        f"endpoint p99 {overall:.2f} ms, target {args.p99_target_ms:.2f} ms: {verdict}",
+    )
+    if overall > args.p99_target_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,28 @@
 import uvicorn
 
-from cooking_forum_backend.gunicorn_runner import GunicornApplication
+from cooking_forum_backend.gunicorn_runner import (
+    GunicornApplication,
+    resolve_workers_count,
+)
 from cooking_forum_backend.settings import settings
 
 
 def main() -> None:
     """Entrypoint of the application."""
+    workers_count = resolve_workers_count(
+        settings.workers_count,
+        settings.worker_max_rss_mb,
+    )
     if settings.reload:
         uvicorn.run(
             "cooking_forum_backend.web.application:get_app",
-            workers=settings.workers_count,
+            workers=workers_count,
             host=settings.host,
             port=settings.port,
             reload=settings.reload,
             log_level=settings.log_level.value.lower(),
+            # Requests are logged by the app, see ServerTimingMiddleware.
+            access_log=False,
             factory=True,
         )
     else:
@@ -24,11 +33,15 @@ def main() -> None:
             "cooking_forum_backend.web.application:get_app",
             host=settings.host,
             port=settings.port,
-            workers=settings.workers_count,
+            workers=workers_count,
+            preload_app=settings.preload_app,
+            max_requests=settings.max_requests,
+            max_requests_jitter=settings.max_requests_jitter,
+            timeout=settings.worker_timeout,
+            graceful_timeout=settings.graceful_timeout,
+            keepalive=settings.keepalive,
             factory=True,
-            accesslog="-",
             loglevel=settings.log_level.value.lower(),
-            access_log_format='%r "-" %s "-" %Tf',  # noqa: WPS323
         ).run()
 
 
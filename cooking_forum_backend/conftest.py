@@ -1,20 +1,37 @@
+import os
 from typing import Any, AsyncGenerator
 
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import (
-    AsyncEngine,
-    AsyncSession,
-    async_sessionmaker,
-    create_async_engine,
-)
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
+from cooking_forum_backend.db.capabilities import Capability, supports
 from cooking_forum_backend.db.dependencies import get_db_session
-from cooking_forum_backend.db.utils import create_database, drop_database
+from cooking_forum_backend.db.engine import create_db_engine
+from cooking_forum_backend.db.utils import (
+    create_database,
+    create_template_database,
+    drop_database,
+)
+from cooking_forum_backend.services.response_cache import get_response_cache
 from cooking_forum_backend.settings import settings
 from cooking_forum_backend.web.application import get_app
 
+# Built once with the schema, every test worker gets a copy of it.
+TEMPLATE_DB = f"{settings.db_base}_template"
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """
+    Give every pytest-xdist worker its own database.
+
+    :param config: pytest config.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker:
+        settings.db_base = f"{settings.db_base}_{worker}"
+
 
 @pytest.fixture(scope="session")
 def anyio_backend() -> str:
@@ -31,6 +48,10 @@ async def _engine() -> AsyncGenerator[AsyncEngine, None]:
     """
     Create engine and databases.
 
+    On PostgreSQL the database of the worker is a copy of the template
+    database, which only gets rebuilt when the models change. SQLite
+    databases are created in memory.
+
     :yield: new engine.
     """
     from cooking_forum_backend.db.meta import meta  # noqa: WPS433
@@ -38,17 +59,22 @@ async def _engine() -> AsyncGenerator[AsyncEngine, None]:
 
     load_all_models()
 
-    await create_database()
+    use_template = supports(settings.db_driver, Capability.TEMPLATE_DATABASES)
+    if use_template:
+        await create_template_database(TEMPLATE_DB, meta)
+        await create_database(template=TEMPLATE_DB)
 
-    engine = create_async_engine(str(settings.db_url))
-    async with engine.begin() as conn:
-        await conn.run_sync(meta.create_all)
+    engine = create_db_engine()
+    if not use_template:
+        async with engine.begin() as conn:
+            await conn.run_sync(meta.create_all)
 
     try:
         yield engine
     finally:
         await engine.dispose()
-        await drop_database()
+        if use_template:
+            await drop_database()
 
 
 @pytest.fixture
@@ -90,6 +116,7 @@ def fastapi_app(
 
     :return: fastapi app with mocked dependencies.
     """
+    get_response_cache.cache_clear()
     application = get_app()
     application.dependency_overrides[get_db_session] = lambda: dbsession
     return application  # noqa: WPS331
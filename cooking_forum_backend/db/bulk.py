@@ -0,0 +1,37 @@
+from typing import Any, Dict, List
+
+from sqlalchemy import Table, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from cooking_forum_backend.db.capabilities import Capability, supports
+
+
+async def bulk_insert(
+    engine: AsyncEngine,
+    table: Table,
+    rows: List[Dict[str, Any]],
+) -> None:
+    """
+    Insert many rows at once, such as benchmark fixtures.
+
+    PostgreSQL loads them with COPY, other databases with an
+    executemany INSERT. The rows are committed on return.
+
+    :param engine: engine of the database.
+    :param table: table to fill.
+    :param rows: rows, all with the same columns.
+    """
+    if not rows:
+        return
+
+    async with engine.begin() as conn:
+        if supports(conn.dialect.name, Capability.COPY):
+            columns = list(rows[0])
+            raw_connection = await conn.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                table.name,
+                records=[tuple(row[column] for column in columns) for row in rows],
+                columns=columns,
+            )
+        else:
+            await conn.execute(insert(table), rows)
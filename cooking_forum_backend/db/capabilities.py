@@ -0,0 +1,33 @@
+import enum
+
+
+class Capability(str, enum.Enum):  # noqa: WPS600
+    """Database features not available on every driver."""
+
+    # Bulk loading with COPY
+    COPY = "copy"
+    # CREATE DATABASE ... TEMPLATE, advisory locks
+    TEMPLATE_DATABASES = "template_databases"
+    # Server-side prepared statements cached per connection
+    PREPARED_STATEMENTS = "prepared_statements"
+    # tsvector/tsquery search with ranking and highlighting
+    FULL_TEXT_SEARCH = "full_text_search"
+    # Lists bound as one array parameter, ``= ANY(:values)``
+    ARRAY_PARAMETERS = "array_parameters"
+
+
+_CAPABILITIES = {
+    "postgresql": frozenset(Capability),
+    "sqlite": frozenset(),
+}
+
+
+def supports(dialect_name: str, capability: Capability) -> bool:
+    """
+    Check whether a database supports a feature.
+
+    :param dialect_name: SQLAlchemy dialect name, or ``settings.db_driver``.
+    :param capability: feature to check.
+    :return: whether the feature can be used.
+    """
+    return capability in _CAPABILITIES.get(dialect_name, frozenset())
@@ -3,6 +3,8 @@ from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.requests import Request
 
+from cooking_forum_backend.db.instrumentation import orm_stats
+
 
 async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
@@ -12,6 +14,7 @@ async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]
     :yield: database session.
     """
     session: AsyncSession = request.app.state.db_session_factory()
+    orm_stats.add_session(session.sync_session)
 
     try:  # noqa: WPS501
         yield session
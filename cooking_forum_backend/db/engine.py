@@ -0,0 +1,78 @@
+import uuid
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
+
+from cooking_forum_backend.settings import settings
+
+
+def _enable_foreign_keys(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def create_db_engine(
+    url: Optional[str] = None,
+    pooler_mode: Optional[bool] = None,
+    **kwargs: Any,
+) -> AsyncEngine:
+    """
+    Create an engine for the configured database driver.
+
+    On PostgreSQL, statements are run as prepared statements, kept per
+    connection up to ``db_prepared_statement_cache_size``.
+
+    Behind a transaction pooler (``pooler_mode``), every transaction may
+    run on another server connection. Prepared statements are not kept,
+    and get unique names so they never collide with one prepared by
+    another client on the same server connection. Connections are not
+    pooled either: the pooler does it, and idle clients would only hold
+    its slots.
+
+    SQLite connections are local and cheap, so pool sizing options are
+    dropped. An in-memory database only lives as long as its connection,
+    so it gets a single connection shared by the whole process.
+
+    :param url: database URL, defaults to the configured one.
+    :param pooler_mode: behind a transaction pooler, defaults to
+        ``db_pooler_mode``.
+    :param kwargs: options for ``create_async_engine``.
+    :return: new engine.
+    """
+    db_url = make_url(url or settings.db_url)
+    if db_url.get_backend_name() == "sqlite":
+        kwargs.pop("pool_size", None)
+        kwargs.pop("max_overflow", None)
+        if db_url.database in {None, "", ":memory:"}:
+            kwargs["poolclass"] = StaticPool
+
+        engine = create_async_engine(db_url, **kwargs)
+        event.listen(engine.sync_engine, "connect", _enable_foreign_keys)
+        return engine
+
+    statement_cache_size = settings.db_prepared_statement_cache_size
+    if settings.db_pooler_mode if pooler_mode is None else pooler_mode:
+        statement_cache_size = 0
+        kwargs.pop("pool_size", None)
+        kwargs.pop("max_overflow", None)
+        kwargs["poolclass"] = NullPool
+        kwargs["connect_args"] = {
+            **kwargs.get("connect_args", {}),
+            # asyncpg's own cache, used outside of SQLAlchemy's.
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+
+    if "prepared_statement_cache_size" not in db_url.query:
+        db_url = db_url.update_query_dict(
+            {"prepared_statement_cache_size": str(statement_cache_size)},
+        )
+    return create_async_engine(db_url, **kwargs)
@@ -0,0 +1,180 @@
+import time
+import weakref
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from cooking_forum_backend.db.base import Base
+
+from cooking_forum_backend.services.timing import record
+from cooking_forum_backend.services.tracing import KIND_CLIENT, begin_span, end_span
+
+# Longer statements are truncated in the db.statement attribute of spans.
+MAX_TRACED_STATEMENT = 2048
+
+
+class StatementCacheStats:
+    """Lookups of the compiled statement cache of the engines."""
+
+    def __init__(self) -> None:
+        self.counts: Counter[str] = Counter()
+
+    def add(self, cache_hit: Any) -> None:
+        """
+        Count a statement execution.
+
+        :param cache_hit: ``cache_hit`` of the execution context, a
+            ``CacheStats`` member.
+        """
+        self.counts[getattr(cache_hit, "name", str(cache_hit)).lower()] += 1
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """
+        Counts by lookup result, with the hit rate of cacheable statements.
+
+        :return: e.g. ``{"cache_hit": 98, "cache_miss": 2, "hit_rate": 0.98}``.
+        """
+        hits = self.counts["cache_hit"]
+        lookups = hits + self.counts["cache_miss"]
+        snapshot: Dict[str, Optional[float]] = dict(self.counts)
+        snapshot["hit_rate"] = hits / lookups if lookups else None
+        return snapshot
+
+
+statement_cache_stats = StatementCacheStats()
+
+
+class ORMStats:
+    """
+    Live ORM objects and sessions of the worker.
+
+    Objects and sessions are held in weak sets, so a count that keeps
+    growing is one that something keeps alive, e.g. a cache holding
+    models or a session that isn't closed.
+    """
+
+    def __init__(self) -> None:
+        self.live: Dict[str, "weakref.WeakSet[Any]"] = {}
+        self.created: Counter[str] = Counter()
+        self.loaded: Counter[str] = Counter()
+        self.sessions: "weakref.WeakSet[Session]" = weakref.WeakSet()
+        self.sessions_opened = 0
+
+    def add_object(self, instance: Any, loaded: bool) -> None:
+        """
+        Count a model instance.
+
+        :param instance: instance created or loaded.
+        :param loaded: whether it was loaded from the database.
+        """
+        name = type(instance).__name__
+        live = self.live.get(name)
+        if live is None:
+            live = self.live[name] = weakref.WeakSet()
+        live.add(instance)
+        if loaded:
+            self.loaded[name] += 1
+        else:
+            self.created[name] += 1
+
+    def add_session(self, session: Session) -> None:
+        """
+        Count a session.
+
+        :param session: the session, sync sessions of ``AsyncSession`` too.
+        """
+        self.sessions.add(session)
+        self.sessions_opened += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Counts of objects by model, and of sessions.
+
+        :return: e.g. ``{"objects": {"UserModel": {"live": 3, "created": 1,
+            "loaded": 9}}, "sessions": {"live": 1, "opened": 4,
+            "identity_map_objects": 3, "largest_identity_map": 3}}``.
+        """
+        names = set(self.live) | set(self.created) | set(self.loaded)
+        identity_maps = [len(session.identity_map) for session in list(self.sessions)]
+        return {
+            "objects": {
+                name: {
+                    "live": len(self.live.get(name, ())),
+                    "created": self.created[name],
+                    "loaded": self.loaded[name],
+                }
+                for name in sorted(names)
+            },
+            "sessions": {
+                "live": len(identity_maps),
+                "opened": self.sessions_opened,
+                "identity_map_objects": sum(identity_maps),
+                "largest_identity_map": max(identity_maps, default=0),
+            },
+        }
+
+
+orm_stats = ORMStats()
+
+
+@event.listens_for(Base, "init", propagate=True)
+def _init_instance(target: Any, args: Any, kwargs: Any) -> None:
+    orm_stats.add_object(target, loaded=False)
+
+
+@event.listens_for(Base, "load", propagate=True)
+def _load_instance(target: Any, context: Any) -> None:
+    orm_stats.add_object(target, loaded=True)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+    conn.info.setdefault("query_spans", []).append(
+        begin_span(
+            "db.query",
+            KIND_CLIENT,
+            {
+                "db.system": conn.dialect.name,
+                "db.statement": statement[:MAX_TRACED_STATEMENT],
+            },
+        ),
+    )
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    started = conn.info["query_started"].pop()
+    record("db", time.perf_counter() - started)
+    span = conn.info["query_spans"].pop()
+    if span is not None:
+        end_span(span)
+    if context is not None:
+        statement_cache_stats.add(context.cache_hit)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context: Any) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+        span = connection.info["query_spans"].pop()
+        if span is not None:
+            end_span(span, exception_context.original_exception)
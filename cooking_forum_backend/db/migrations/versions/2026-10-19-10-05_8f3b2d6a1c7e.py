@@ -0,0 +1,71 @@
+"""Add recipes.
+
+Revision ID: 8f3b2d6a1c7e
+Revises: 5c1e7a2f9d04
+Create Date: 2026-10-19 10:05:12.630941
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "8f3b2d6a1c7e"
+down_revision = "5c1e7a2f9d04"
+branch_labels = None
+depends_on = None
+
+SEARCH_DOCUMENT_POSTGRESQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(ingredients, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(instructions, '')), 'C')"
+)
+SEARCH_DOCUMENT_DEFAULT = "lower(title || ' ' || ingredients || ' ' || instructions)"
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == "postgresql"
+    op.create_table(
+        "recipes",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("author_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column("ingredients", sa.Text(), nullable=False),
+        sa.Column("instructions", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR().with_variant(sa.Text(), "sqlite"),
+            sa.Computed(
+                SEARCH_DOCUMENT_POSTGRESQL if is_postgresql else SEARCH_DOCUMENT_DEFAULT,
+                persisted=True,
+            ),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["author_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_recipes_author_id"),
+        "recipes",
+        ["author_id"],
+        unique=False,
+    )
+    if is_postgresql:
+        op.create_index(
+            "ix_recipes_search_vector",
+            "recipes",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_recipes_search_vector", table_name="recipes")
+    op.drop_index(op.f("ix_recipes_author_id"), table_name="recipes")
+    op.drop_table("recipes")
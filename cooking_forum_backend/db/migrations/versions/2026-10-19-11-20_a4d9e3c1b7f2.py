@@ -0,0 +1,69 @@
+"""Add threads and posts.
+
+Revision ID: a4d9e3c1b7f2
+Revises: 8f3b2d6a1c7e
+Create Date: 2026-10-19 11:20:47.118203
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a4d9e3c1b7f2"
+down_revision = "8f3b2d6a1c7e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "threads",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("author_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_activity_at", sa.DateTime(), nullable=False),
+        sa.Column("post_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["author_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_threads_feed",
+        "threads",
+        ["last_activity_at", "id"],
+        unique=False,
+        postgresql_include=["author_id", "title", "post_count", "created_at"],
+    )
+    op.create_table(
+        "posts",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("thread_id", sa.Integer(), nullable=False),
+        sa.Column("author_id", sa.Integer(), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["author_id"],
+            ["users.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["thread_id"],
+            ["threads.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_posts_thread_id_id",
+        "posts",
+        ["thread_id", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_thread_id_id", table_name="posts")
+    op.drop_table("posts")
+    op.drop_index("ix_threads_feed", table_name="threads")
+    op.drop_table("threads")
@@ -0,0 +1,49 @@
+"""Add a trigram index on usernames.
+
+Revision ID: d2e8b5f4a9c3
+Revises: a4d9e3c1b7f2
+Create Date: 2026-10-19 12:30:21.904117
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d2e8b5f4a9c3"
+down_revision = "a4d9e3c1b7f2"
+branch_labels = None
+depends_on = None
+
+
+def _trigram_available() -> bool:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return False
+    # pg_trgm ships with the contrib modules, which some servers lack.
+    # Autocomplete still works without the index, with a sequential scan.
+    return bool(
+        bind.scalar(
+            sa.text(
+                "SELECT count(*) FROM pg_available_extensions WHERE name = 'pg_trgm'",
+            ),
+        ),
+    )
+
+
+def upgrade() -> None:
+    if not _trigram_available():
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_users_username_trgm",
+        "users",
+        ["username"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"username": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_users_username_trgm", table_name="users", if_exists=True)
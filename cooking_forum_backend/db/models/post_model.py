@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.sqltypes import DateTime, Text
+
+from cooking_forum_backend.db.base import Base
+
+
+class PostModel(Base):
+    """Post in a forum thread."""
+
+    __tablename__ = "posts"
+    __table_args__ = (Index("ix_posts_thread_id_id", "thread_id", "id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    thread_id: Mapped[int] = mapped_column(ForeignKey("threads.id"))
+    author_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    body: Mapped[str] = mapped_column(Text())
+    created_at: Mapped[datetime] = mapped_column(DateTime(), default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"Post(id={self.id!r}, thread_id={self.thread_id!r}, author_id={self.author_id!r}, created_at={self.created_at!r})"
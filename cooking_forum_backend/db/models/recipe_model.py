@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Computed, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.sql.sqltypes import DateTime, String, Text
+
+from cooking_forum_backend.db.base import Base
+
+# Text search configuration of the search documents and queries.
+SEARCH_CONFIG = "english"
+
+
+class recipe_search_document(FunctionElement):  # noqa: N801
+    """
+    Expression of the generated search document of a recipe.
+
+    On PostgreSQL it's a tsvector weighting the title above the
+    ingredients, and those above the instructions. Other databases
+    get the lowercased text, searched with LIKE.
+    """
+
+    inherit_cache = True
+
+
+@compiles(recipe_search_document, "postgresql")
+def _search_document_postgresql(element: Any, compiler: Any, **kw: Any) -> str:
+    return (
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(ingredients, '')), 'B') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(instructions, '')), 'C')"
+    )
+
+
+@compiles(recipe_search_document)
+def _search_document_default(element: Any, compiler: Any, **kw: Any) -> str:
+    return "lower(title || ' ' || ingredients || ' ' || instructions)"
+
+
+class RecipeModel(Base):
+    """Recipe posted by a user."""
+
+    __tablename__ = "recipes"
+    __table_args__ = (
+        Index(
+            "ix_recipes_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    author_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    title: Mapped[str] = mapped_column(String(length=200))  # noqa: WPS432
+    ingredients: Mapped[str] = mapped_column(Text())
+    instructions: Mapped[str] = mapped_column(Text())
+    created_at: Mapped[datetime] = mapped_column(DateTime(), default=datetime.utcnow)
+    # Only used in queries, never loaded.
+    search_vector: Mapped[Any] = mapped_column(
+        TSVECTOR().with_variant(Text(), "sqlite"),
+        Computed(recipe_search_document(), persisted=True),
+        deferred=True,
+    )
+
+    def __repr__(self) -> str:
+        return f"Recipe(id={self.id!r}, author_id={self.author_id!r}, title={self.title!r}, created_at={self.created_at!r})"
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.sqltypes import DateTime, Integer, String
+
+from cooking_forum_backend.db.base import Base
+
+
+class ThreadModel(Base):
+    """
+    Forum thread.
+
+    ``last_activity_at`` and ``post_count`` are denormalized from the
+    posts, and updated in the transaction adding a post, so the feed
+    never has to aggregate the posts.
+    """
+
+    __tablename__ = "threads"
+    __table_args__ = (
+        # The feed is read from this index alone.
+        Index(
+            "ix_threads_feed",
+            "last_activity_at",
+            "id",
+            postgresql_include=["author_id", "title", "post_count", "created_at"],
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    author_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    title: Mapped[str] = mapped_column(String(length=200))  # noqa: WPS432
+    created_at: Mapped[datetime] = mapped_column(DateTime(), default=datetime.utcnow)
+    last_activity_at: Mapped[datetime] = mapped_column(DateTime())
+    post_count: Mapped[int] = mapped_column(Integer(), default=0)
+
+    def __repr__(self) -> str:
+        return f"Thread(id={self.id!r}, title={self.title!r}, post_count={self.post_count!r}, last_activity_at={self.last_activity_at!r})"
@@ -1,6 +1,7 @@
 from datetime import datetime
 
-from typing import List, Optional
+from typing import Any, List, Optional
+from sqlalchemy import DDL, Index, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql.sqltypes import Boolean, DateTime, String
 
@@ -8,8 +9,29 @@ from cooking_forum_backend.db.base import Base
 from cooking_forum_backend.db.models.otp_model import OTPModel
 
 
+def _trigram_available(ddl: Any, target: Any, bind: Any, **kw: Any) -> bool:
+    # pg_trgm ships with the contrib modules, which some servers lack.
+    # Without a connection, the DDL is only rendered.
+    if bind is None:
+        return True
+    return bool(
+        bind.scalar(
+            text("SELECT count(*) FROM pg_available_extensions WHERE name = 'pg_trgm'"),
+        ),
+    )
+
+
 class UserModel(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Serves username prefix searches, ILIKE 'prefix%'.
+        Index(
+            "ix_users_username_trgm",
+            "username",
+            postgresql_using="gin",
+            postgresql_ops={"username": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql", callable_=_trigram_available),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     username: Mapped[str] = mapped_column(String(length=200), unique=True, index=True)  # noqa: WPS432
@@ -20,3 +42,13 @@ class UserModel(Base):
 
     def __repr__(self) -> str:
         return f"User(id={self.id!r}, username={self.username!r}, email={self.email!r}), 2fa={self.two_fa_enabled!r}, created_at={self.created_at!r}"
+
+
+event.listen(
+    UserModel.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(
+        dialect="postgresql",
+        callable_=_trigram_available,
+    ),
+)
@@ -1,13 +1,56 @@
+import enum
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import Depends
-from sqlalchemy import select, update
+from sqlalchemy import lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.dml import ReturningUpdate
 
 from cooking_forum_backend.db.dependencies import get_db_session
 from cooking_forum_backend.db.models.otp_model import OTPModel
+from cooking_forum_backend.services.tracing import traced_methods
 
+
+class OTPConsumeResult(enum.Enum):
+    """Outcome of OTPRepository.consume."""
+
+    CONSUMED = "consumed"
+    # No OTP with this id for this user
+    NOT_FOUND = "not_found"
+    EXPIRED = "expired"
+    USED = "used"
+    INVALID_VALUE = "invalid_value"
+
+
+def consume_statement(
+    user_id: int,
+    otp_id: int,
+    value: int,
+    now: datetime,
+) -> ReturningUpdate[Tuple[int]]:
+    """
+    UPDATE of OTPRepository.consume, marking a matching OTP as used.
+
+    :param user_id: owner of the OTP.
+    :param otp_id: id of the OTP.
+    :param value: value sent to the user.
+    :param now: time of the check.
+    :return: the statement, returning the id of the consumed OTP.
+    """
+    return (
+        update(OTPModel)
+        .values(used_at=now)
+        .where(OTPModel.id == otp_id)
+        .where(OTPModel.user_id == user_id)
+        .where(OTPModel.value == value)
+        .where(OTPModel.used_at.is_(None))
+        .where(OTPModel.expires_at > now)
+        .returning(OTPModel.id)
+    )
+
+
+@traced_methods
 class OTPRepository:
     """Class for accessing otps table."""
 
@@ -35,16 +78,53 @@ class OTPRepository:
         return otp
     
     async def get_active_by_user_id(self, user_id: int) -> OTPModel:
+        # Lambda statement, built once. The lambda only runs on the first
+        # call, values must come from closure variables to be bound on
+        # every call: datetime.utcnow() is called outside of it.
+        now = datetime.utcnow()
         results = await self.session.execute(
-            select(OTPModel)
-                .where(OTPModel.user_id == user_id)
-                .where(OTPModel.expires_at > datetime.utcnow())
-                .where(OTPModel.used_at == None)
-                .order_by(OTPModel.expires_at.desc())
+            lambda_stmt(
+                lambda: select(OTPModel)
+                    .where(OTPModel.user_id == user_id)
+                    .where(OTPModel.expires_at > now)
+                    .where(OTPModel.used_at == None)
+                    .order_by(OTPModel.expires_at.desc())
+            )
         )
 
         return results.scalar_one_or_none()
     
+    async def consume(self, user_id: int, otp_id: int, value: int) -> OTPConsumeResult:
+        """
+        Mark an OTP as used if it matches, in a single statement.
+
+        The update only matches OTPs that are unused and not expired, so
+        two concurrent checks of the same code cannot both succeed. The
+        reason of a failure is looked up afterwards, off the happy path.
+
+        :param user_id: owner of the OTP.
+        :param otp_id: id of the OTP.
+        :param value: value sent to the user.
+        :return: CONSUMED, or the reason the OTP was refused.
+        """
+        now = datetime.utcnow()
+        results = await self.session.execute(
+            consume_statement(user_id, otp_id, value, now),
+        )
+        consumed = results.scalar_one_or_none()
+        await self.session.commit()
+        if consumed is not None:
+            return OTPConsumeResult.CONSUMED
+
+        otp = await self.session.get(OTPModel, otp_id, populate_existing=True)
+        if otp is None or otp.user_id != user_id:
+            return OTPConsumeResult.NOT_FOUND
+        if otp.used_at is not None:
+            return OTPConsumeResult.USED
+        if otp.expires_at <= now:
+            return OTPConsumeResult.EXPIRED
+        return OTPConsumeResult.INVALID_VALUE
+
     async def set_used_at(
         self,
         otp_id: int,
@@ -52,6 +132,6 @@ class OTPRepository:
     ) -> OTPModel:
         return await self.session.execute(
             update(OTPModel)
-                .values(used_at=used_at or datetime.now())
+                .values(used_at=used_at or datetime.utcnow())
                 .where(OTPModel.id == otp_id)
         )
\ No newline at end of file
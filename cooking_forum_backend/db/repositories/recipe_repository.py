@@ -0,0 +1,137 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import Depends
+from sqlalchemy import Float, cast, func, literal, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import TSQUERY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cooking_forum_backend.db.capabilities import Capability, supports
+from cooking_forum_backend.db.dependencies import get_db_session
+from cooking_forum_backend.db.models.recipe_model import SEARCH_CONFIG, RecipeModel
+from cooking_forum_backend.services.tracing import traced_methods
+
+# (recipe, rank, highlighted snippet)
+RecipeSearchHit = Tuple[RecipeModel, float, str]
+# (rank, id) of the last hit of the previous page
+RecipeSearchCursor = Tuple[float, int]
+
+HEADLINE_OPTIONS = (
+    "StartSel=<b>, StopSel=</b>, MaxWords=35, MinWords=15, "
+    "MaxFragments=2, FragmentDelimiter=\" ... \""
+)
+SNIPPET_LENGTH = 200
+
+
+@traced_methods
+class RecipeRepository:
+    """Class for accessing recipes table."""
+
+    def __init__(
+        self,
+        session: AsyncSession = Depends(get_db_session),
+    ):
+        self.session = session
+
+    async def create_recipe(
+        self,
+        author_id: int,
+        title: str,
+        ingredients: str,
+        instructions: str,
+    ) -> RecipeModel:
+        recipe = RecipeModel(
+            author_id=author_id,
+            title=title,
+            ingredients=ingredients,
+            instructions=instructions,
+            created_at=datetime.utcnow(),
+        )
+        self.session.add(recipe)
+        await self.session.commit()
+
+        return recipe
+
+    async def get_by_id(self, recipe_id: int) -> Optional[RecipeModel]:
+        return await self.session.get(RecipeModel, recipe_id)
+
+    async def search(
+        self,
+        query: str,
+        limit: int,
+        after: Optional[RecipeSearchCursor] = None,
+    ) -> List[RecipeSearchHit]:
+        """
+        Search recipes, best matches first.
+
+        On PostgreSQL the query uses the web search syntax (``"exact
+        phrase"``, ``or``, ``-excluded``), hits are ranked with ``ts_rank``
+        and snippets highlight the matches. Other databases match every
+        word with LIKE, without ranking.
+
+        Pages are fetched with a keyset on (rank, id), and snippets are
+        only built for the rows of the page.
+
+        :param query: search query.
+        :param limit: maximum number of hits.
+        :param after: cursor of the last hit of the previous page.
+        :return: hits of the page.
+        """
+        if supports(
+            self.session.get_bind().dialect.name,
+            Capability.FULL_TEXT_SEARCH,
+        ):
+            config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+            tsquery = func.websearch_to_tsquery(config, query)
+            # ts_rank scores about 0 as soon as the query negates a word,
+            # so hits are ranked on the positive part of the query only.
+            rank_query = cast(func.querytree(tsquery), TSQUERY)
+            ranked = select(
+                RecipeModel.id,
+                func.ts_rank(RecipeModel.search_vector, rank_query).label("rank"),
+            ).where(RecipeModel.search_vector.op("@@")(tsquery))
+            snippet = func.ts_headline(
+                config,
+                func.concat_ws(" ", RecipeModel.ingredients, RecipeModel.instructions),
+                tsquery,
+                HEADLINE_OPTIONS,
+            )
+        else:
+            words = [
+                word.strip('"')
+                for word in query.lower().split()
+                if word != "or" and not word.startswith("-")
+            ]
+            words = [word for word in words if word]
+            if not words:
+                return []
+            ranked = select(
+                RecipeModel.id,
+                literal(0.0, Float).label("rank"),
+            ).where(
+                *[
+                    RecipeModel.search_vector.contains(word, autoescape=True)
+                    for word in words
+                ],
+            )
+            snippet = func.substr(RecipeModel.instructions, 1, SNIPPET_LENGTH)
+
+        ranked_subquery = ranked.subquery("ranked")
+        page = select(ranked_subquery)
+        if after is not None:
+            page = page.where(
+                tuple_(ranked_subquery.c.rank, ranked_subquery.c.id)
+                < tuple_(*after),
+            )
+        page_subquery = (
+            page.order_by(ranked_subquery.c.rank.desc(), ranked_subquery.c.id.desc())
+            .limit(limit)
+            .subquery("page")
+        )
+
+        results = await self.session.execute(
+            select(RecipeModel, page_subquery.c.rank, snippet)
+            .join(page_subquery, page_subquery.c.id == RecipeModel.id)
+            .order_by(page_subquery.c.rank.desc(), page_subquery.c.id.desc()),
+        )
+        return [tuple(row) for row in results.all()]
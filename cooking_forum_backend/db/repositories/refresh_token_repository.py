@@ -0,0 +1,135 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import Depends
+from sqlalchemy import lambda_stmt, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cooking_forum_backend.db.dependencies import get_db_session
+from cooking_forum_backend.db.models.refresh_token_model import RefreshTokenModel
+from cooking_forum_backend.services.tracing import traced_methods
+
+# (access token jti, access token expiration)
+RevokedAccessToken = Tuple[str, datetime]
+
+
+@traced_methods
+class RefreshTokenRepository:
+    """Class for accessing refresh_tokens table."""
+
+    def __init__(
+        self,
+        session: AsyncSession = Depends(get_db_session),
+    ):
+        self.session = session
+
+    async def create_refresh_token(
+        self,
+        user_id: int,
+        token_hash: str,
+        access_jti: str,
+        access_expires_at: datetime,
+        expires_at: datetime,
+    ) -> RefreshTokenModel:
+        """
+        Store the hash of a newly issued refresh token.
+
+        :param user_id: owner of the token.
+        :param token_hash: hash of the refresh token.
+        :param access_jti: jti of the access token issued alongside.
+        :param access_expires_at: expiration of that access token.
+        :param expires_at: expiration of the refresh token.
+        :return: stored refresh token.
+        """
+        refresh_token = RefreshTokenModel(
+            user_id=user_id,
+            token_hash=token_hash,
+            access_jti=access_jti,
+            access_expires_at=access_expires_at,
+            expires_at=expires_at,
+            created_at=datetime.utcnow(),
+        )
+        self.session.add(refresh_token)
+        await self.session.commit()
+
+        return refresh_token
+
+    async def get_by_hash(self, token_hash: str) -> Optional[RefreshTokenModel]:
+        results = await self.session.execute(
+            lambda_stmt(
+                lambda: select(RefreshTokenModel).where(
+                    RefreshTokenModel.token_hash == token_hash,
+                ),
+            ),
+        )
+        return results.scalar_one_or_none()
+
+    async def revoke(self, token_id: int) -> Optional[RevokedAccessToken]:
+        """
+        Revoke a single refresh token.
+
+        The update only matches tokens that are still active, so two
+        concurrent rotations of the same token cannot both succeed.
+
+        :param token_id: id of the refresh token.
+        :return: the access token to revoke, None if it was already revoked.
+        """
+        results = await self.session.execute(
+            update(RefreshTokenModel)
+            .values(revoked_at=datetime.utcnow())
+            .where(RefreshTokenModel.id == token_id)
+            .where(RefreshTokenModel.revoked_at.is_(None))
+            .returning(
+                RefreshTokenModel.access_jti,
+                RefreshTokenModel.access_expires_at,
+            ),
+        )
+        revoked = results.one_or_none()
+        await self.session.commit()
+
+        return tuple(revoked) if revoked else None  # type: ignore
+
+    async def revoke_all_for_user(self, user_id: int) -> List[RevokedAccessToken]:
+        """
+        Revoke every active refresh token of a user.
+
+        :param user_id: owner of the tokens.
+        :return: access tokens to revoke.
+        """
+        results = await self.session.execute(
+            update(RefreshTokenModel)
+            .values(revoked_at=datetime.utcnow())
+            .where(RefreshTokenModel.user_id == user_id)
+            .where(RefreshTokenModel.revoked_at.is_(None))
+            .returning(
+                RefreshTokenModel.access_jti,
+                RefreshTokenModel.access_expires_at,
+            ),
+        )
+        revoked = [tuple(row) for row in results.all()]
+        await self.session.commit()
+
+        return revoked  # type: ignore
+
+    async def get_revoked_since(
+        self,
+        since: Optional[datetime],
+        now: datetime,
+    ) -> List[RevokedAccessToken]:
+        """
+        Get access tokens revoked after a point in time and not yet expired.
+
+        :param since: lower bound on revoked_at, None for every revocation.
+        :param now: current time, used to skip expired access tokens.
+        :return: revoked access tokens.
+        """
+        query = (
+            select(RefreshTokenModel.access_jti, RefreshTokenModel.access_expires_at)
+            .where(RefreshTokenModel.revoked_at.is_not(None))
+            .where(RefreshTokenModel.access_expires_at > now)
+        )
+        if since is not None:
+            query = query.where(RefreshTokenModel.revoked_at >= since)
+
+        results = await self.session.execute(query)
+        return [tuple(row) for row in results.all()]  # type: ignore
@@ -0,0 +1,159 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import Depends
+from sqlalchemy import case, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cooking_forum_backend.db.dependencies import get_db_session
+from cooking_forum_backend.db.models.post_model import PostModel
+from cooking_forum_backend.db.models.thread_model import ThreadModel
+from cooking_forum_backend.services.tracing import traced_methods
+
+# (last_activity_at, id) of the last thread of the previous page
+ThreadFeedCursor = Tuple[datetime, int]
+
+
+@traced_methods
+class ThreadRepository:
+    """Class for accessing threads and posts tables."""
+
+    def __init__(
+        self,
+        session: AsyncSession = Depends(get_db_session),
+    ):
+        self.session = session
+
+    async def create_thread(
+        self,
+        author_id: int,
+        title: str,
+        body: str,
+    ) -> ThreadModel:
+        """
+        Create a thread with its first post.
+
+        :param author_id: author of the thread.
+        :param title: title of the thread.
+        :param body: body of the first post.
+        :return: new thread.
+        """
+        now = datetime.utcnow()
+        thread = ThreadModel(
+            author_id=author_id,
+            title=title,
+            created_at=now,
+            last_activity_at=now,
+            post_count=1,
+        )
+        self.session.add(thread)
+        await self.session.flush()
+        self.session.add(
+            PostModel(
+                thread_id=thread.id,
+                author_id=author_id,
+                body=body,
+                created_at=now,
+            ),
+        )
+        await self.session.commit()
+
+        return thread
+
+    async def get_by_id(self, thread_id: int) -> Optional[ThreadModel]:
+        return await self.session.get(ThreadModel, thread_id)
+
+    async def create_post(
+        self,
+        thread_id: int,
+        author_id: int,
+        body: str,
+    ) -> Optional[PostModel]:
+        """
+        Add a post to a thread, and bump the thread in the feed.
+
+        The thread is updated first, in the same transaction: its row lock
+        serializes concurrent posts, so post_count stays exact.
+
+        :param thread_id: thread to post in.
+        :param author_id: author of the post.
+        :param body: body of the post.
+        :return: new post, None if the thread doesn't exist.
+        """
+        now = datetime.utcnow()
+        bumped = await self.session.execute(
+            update(ThreadModel)
+            .where(ThreadModel.id == thread_id)
+            .values(
+                post_count=ThreadModel.post_count + 1,
+                # Never move back, a slower transaction may commit last.
+                last_activity_at=case(
+                    (ThreadModel.last_activity_at > now, ThreadModel.last_activity_at),
+                    else_=now,
+                ),
+            )
+            .returning(ThreadModel.id),
+        )
+        if bumped.scalar_one_or_none() is None:
+            return None
+
+        post = PostModel(
+            thread_id=thread_id,
+            author_id=author_id,
+            body=body,
+            created_at=now,
+        )
+        self.session.add(post)
+        await self.session.commit()
+
+        return post
+
+    async def get_feed(
+        self,
+        limit: int,
+        after: Optional[ThreadFeedCursor] = None,
+    ) -> List[ThreadModel]:
+        """
+        Get threads by latest activity.
+
+        Pages are fetched with a keyset on (last_activity_at, id), an
+        index-only scan of ix_threads_feed on PostgreSQL.
+
+        :param limit: maximum number of threads.
+        :param after: cursor of the last thread of the previous page.
+        :return: threads of the page.
+        """
+        query = select(ThreadModel)
+        if after is not None:
+            query = query.where(
+                tuple_(ThreadModel.last_activity_at, ThreadModel.id) < tuple_(*after),
+            )
+        results = await self.session.execute(
+            query.order_by(
+                ThreadModel.last_activity_at.desc(),
+                ThreadModel.id.desc(),
+            ).limit(limit),
+        )
+        return list(results.scalars().fetchall())
+
+    async def get_posts(
+        self,
+        thread_id: int,
+        limit: int,
+        after_id: Optional[int] = None,
+    ) -> List[PostModel]:
+        """
+        Get the posts of a thread, oldest first.
+
+        :param thread_id: thread of the posts.
+        :param limit: maximum number of posts.
+        :param after_id: id of the last post of the previous page.
+        :return: posts of the page.
+        """
+        query = select(PostModel).where(PostModel.thread_id == thread_id)
+        if after_id is not None:
+            query = query.where(PostModel.id > after_id)
+        results = await self.session.execute(
+            query.order_by(PostModel.id).limit(limit),
+        )
+        return list(results.scalars().fetchall())
@@ -1,15 +1,29 @@
 from datetime import datetime
-from typing import List, Optional, Union
+from typing import List, Optional, Sequence, Tuple, Union
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import (
+    Integer,
+    String,
+    any_,
+    bindparam,
+    func,
+    lambda_stmt,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from cooking_forum_backend.db.capabilities import Capability, supports
 from cooking_forum_backend.db.dependencies import get_db_session
 from cooking_forum_backend.db.models.user_model import UserModel
 from cooking_forum_backend.services.crypto import CryptoService
+from cooking_forum_backend.services.response_cache import get_response_cache
+from cooking_forum_backend.services.tracing import traced_methods
 
 
+@traced_methods
 class UserRepository:
     """Class for accessing users table."""
 
@@ -40,12 +54,22 @@ class UserRepository:
         self.session.add(user)
         await self.session.commit()
         await self.session.refresh(user)
+        # A new user can appear in any cached page or completion.
+        get_response_cache("users").clear()
+        get_response_cache("user_autocomplete").clear()
 
         return user
 
+    async def get_by_id(self, user_id: int) -> Optional[UserModel]:
+        return await self.session.get(UserModel, user_id)
+
     async def get_by_username(self, username) -> UserModel:
+        # Run on every authenticated request: as a lambda statement, the
+        # query is built and its cache key computed only once.
         results = await self.session.execute(
-            select(UserModel).where(UserModel.username == username),
+            lambda_stmt(
+                lambda: select(UserModel).where(UserModel.username == username),
+            ),
         )
         return results.scalar_one_or_none()
     
@@ -58,11 +82,94 @@ class UserRepository:
         :return: stream of users.
         """
         raw_users = await self.session.execute(
-            select(UserModel).limit(limit).offset(offset),
+            select(UserModel).order_by(UserModel.id).limit(limit).offset(offset),
+        )
+
+        return list(raw_users.scalars().fetchall())
+
+    async def get_user_ids(self, limit: int, offset: int) -> List[int]:
+        """
+        Get the ids of a page of ``get_all_users``.
+
+        Users are never updated, so the ids identify the content of
+        the page. It only reads the primary key index.
+
+        :param limit: limit of users.
+        :param offset: offset of users.
+        :return: ids of the users.
+        """
+        raw_ids = await self.session.execute(
+            select(UserModel.id).order_by(UserModel.id).limit(limit).offset(offset),
         )
 
+        return list(raw_ids.scalars().fetchall())
+
+    async def get_by_ids_or_usernames(
+        self,
+        ids: Sequence[int],
+        usernames: Sequence[str],
+    ) -> List[UserModel]:
+        """
+        Get the users matching any of the ids or usernames, in one query.
+
+        On PostgreSQL each list is bound as a single array parameter, so
+        the statement is the same whatever the number of keys and stays
+        prepared. Other databases get an IN list.
+
+        :param ids: ids of users.
+        :param usernames: usernames of users.
+        :return: users found, in no particular order.
+        """
+        if not ids and not usernames:
+            return []
+
+        if supports(
+            self.session.get_bind().dialect.name,
+            Capability.ARRAY_PARAMETERS,
+        ):
+            condition = or_(
+                UserModel.id == any_(
+                    bindparam("ids", list(ids), type_=ARRAY(Integer())),
+                ),
+                UserModel.username == any_(
+                    bindparam("usernames", list(usernames), type_=ARRAY(String())),
+                ),
+            )
+        else:
+            condition = or_(
+                UserModel.id.in_(ids),
+                UserModel.username.in_(usernames),
+            )
+
+        raw_users = await self.session.execute(select(UserModel).where(condition))
+
         return list(raw_users.scalars().fetchall())
 
+    async def autocomplete(self, prefix: str, limit: int) -> List[Tuple[int, str]]:
+        """
+        Find the usernames starting with a prefix, ignoring case.
+
+        The shortest usernames come first, so an exact match is on top.
+        On PostgreSQL, ILIKE 'prefix%' is served by the trigram index
+        when pg_trgm is installed.
+
+        :param prefix: start of the usernames.
+        :param limit: maximum number of users.
+        :return: ids and usernames.
+        """
+        pattern = (
+            prefix.replace("/", "//").replace("%", "/%").replace("_", "/_") + "%"
+        )
+        results = await self.session.execute(
+            lambda_stmt(
+                lambda: select(UserModel.id, UserModel.username)
+                .where(UserModel.username.ilike(pattern, escape="/"))
+                .order_by(func.length(UserModel.username), UserModel.username)
+                .limit(limit),
+            ),
+        )
+        return [tuple(row) for row in results.all()]
+
     async def authenticate(self, username: str, password: str) -> Union[bool, UserModel]:
         user = await self.get_by_username(username)
         if not user:
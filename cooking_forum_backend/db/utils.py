@@ -1,44 +1,127 @@
-from sqlalchemy import text
-from sqlalchemy.engine import make_url
-from sqlalchemy.ext.asyncio import create_async_engine
+import hashlib
+from typing import Optional
+
+from sqlalchemy import MetaData, func, select, text
+from sqlalchemy.engine import Dialect, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 from cooking_forum_backend.settings import settings
 
+# Key of the advisory lock serializing template builds across test workers.
+TEMPLATE_LOCK_KEY = 0x636f6f6b  # noqa: WPS432
+
+
+def _admin_engine() -> AsyncEngine:
+    db_url = make_url(settings.db_url).set(database="postgres")
+    return create_async_engine(db_url, isolation_level="AUTOCOMMIT")
+
+
+def schema_fingerprint(metadata: MetaData, dialect: Dialect) -> str:
+    """
+    Hash the DDL of a schema.
 
-async def create_database() -> None:
-    """Create a database."""
-    db_url = make_url(str(settings.db_url.with_path("/postgres")))
-    engine = create_async_engine(db_url, isolation_level="AUTOCOMMIT")
+    :param metadata: tables of the schema.
+    :param dialect: dialect the DDL is compiled for.
+    :return: hex digest, changes whenever a table or index does.
+    """
+    digest = hashlib.sha256()
+    for table in metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda idx: str(idx.name)):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()
+
+
+async def create_database(
+    name: Optional[str] = None,
+    template: str = "template1",
+) -> None:
+    """
+    Create a database, dropping it first if it exists.
+
+    :param name: database name, defaults to the configured one.
+    :param template: database to copy.
+    """
+    name = name or settings.db_base
+    engine = _admin_engine()
 
     async with engine.connect() as conn:
         database_existance = await conn.execute(
             text(
-                f"SELECT 1 FROM pg_database WHERE datname='{settings.db_base}'",  # noqa: E501, S608
+                f"SELECT 1 FROM pg_database WHERE datname='{name}'",  # noqa: S608
             ),
         )
         database_exists = database_existance.scalar() == 1
 
     if database_exists:
-        await drop_database()
+        await drop_database(name)
 
     async with engine.connect() as conn:  # noqa: WPS440
         await conn.execute(
             text(
-                f'CREATE DATABASE "{settings.db_base}" ENCODING "utf8" TEMPLATE template1',  # noqa: E501
+                f'CREATE DATABASE "{name}" ENCODING "utf8" TEMPLATE "{template}"',  # noqa: E501
             ),
         )
+    await engine.dispose()
+
 
+async def drop_database(name: Optional[str] = None) -> None:
+    """
+    Drop a database.
 
-async def drop_database() -> None:
-    """Drop current database."""
-    db_url = make_url(str(settings.db_url.with_path("/postgres")))
-    engine = create_async_engine(db_url, isolation_level="AUTOCOMMIT")
+    :param name: database name, defaults to the configured one.
+    """
+    name = name or settings.db_base
+    engine = _admin_engine()
     async with engine.connect() as conn:
         disc_users = (
             "SELECT pg_terminate_backend(pg_stat_activity.pid) "  # noqa: S608
             "FROM pg_stat_activity "
-            f"WHERE pg_stat_activity.datname = '{settings.db_base}' "
+            f"WHERE pg_stat_activity.datname = '{name}' "
             "AND pid <> pg_backend_pid();"
         )
         await conn.execute(text(disc_users))
-        await conn.execute(text(f'DROP DATABASE "{settings.db_base}"'))
+        await conn.execute(text(f'DROP DATABASE "{name}"'))
+    await engine.dispose()
+
+
+async def create_template_database(name: str, metadata: MetaData) -> None:
+    """
+    Create a database with the schema, to be copied by ``create_database``.
+
+    The schema fingerprint is kept as the database comment, so the
+    template is only rebuilt when the models change. Concurrent callers,
+    such as parallel test workers, wait for the one building it.
+
+    :param name: template database name.
+    :param metadata: tables to create.
+    """
+    engine = _admin_engine()
+    fingerprint = schema_fingerprint(metadata, engine.dialect)
+
+    async with engine.connect() as conn:
+        await conn.execute(select(func.pg_advisory_lock(TEMPLATE_LOCK_KEY)))
+        try:
+            current = await conn.scalar(
+                text(
+                    "SELECT shobj_description(oid, 'pg_database') "
+                    "FROM pg_database WHERE datname = :name",
+                ),
+                {"name": name},
+            )
+            if current != fingerprint:
+                await create_database(name)
+
+                template_url = make_url(settings.db_url).set(database=name)
+                template_engine = create_async_engine(template_url)
+                async with template_engine.begin() as template_conn:
+                    await template_conn.run_sync(metadata.create_all)
+                await template_engine.dispose()
+
+                await conn.execute(
+                    text(f"COMMENT ON DATABASE \"{name}\" IS '{fingerprint}'"),
+                )
+        finally:
+            await conn.execute(select(func.pg_advisory_unlock(TEMPLATE_LOCK_KEY)))
+    await engine.dispose()
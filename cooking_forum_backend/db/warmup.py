@@ -0,0 +1,72 @@
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime
+from typing import Awaitable, Callable, List
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from cooking_forum_backend.db.repositories.otp_repository import consume_statement
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+
+HotQuery = Callable[[AsyncSession], Awaitable[object]]
+
+# SQLSTATE of the writes refused by a read-only server, e.g. a hot standby.
+READ_ONLY_SQL_TRANSACTION = "25006"
+
+
+async def _prepare_otp_consume(session: AsyncSession) -> None:
+    # The UPDATE of OTPRepository.consume, without its commit: it matches no
+    # OTP and is rolled back. A read-only server refuses to run it, once it's
+    # prepared.
+    try:
+        await session.execute(consume_statement(0, 0, 0, datetime.utcnow()))
+    except DBAPIError as error:
+        if getattr(error.orig, "sqlstate", None) != READ_ONLY_SQL_TRANSACTION:
+            raise
+    finally:
+        await session.rollback()
+
+
+# Statements run by most requests. Running them once per connection fills
+# SQLAlchemy's compiled cache and the driver's prepared statement cache.
+HOT_QUERIES: List[HotQuery] = [
+    lambda session: UserRepository(session).get_by_username(""),
+    _prepare_otp_consume,
+    lambda session: UserRepository(session).get_all_users(limit=10, offset=0),
+    lambda session: UserRepository(session).get_by_ids_or_usernames([0], [""]),
+]
+
+
+async def _prepare(connection: AsyncConnection) -> None:
+    session = AsyncSession(bind=connection)
+    try:
+        for query in HOT_QUERIES:
+            await query(session)
+    finally:
+        await session.close()
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int) -> float:
+    """
+    Open pooled connections and prepare the hot statements on each.
+
+    All the connections are held open at the same time, so the pool
+    creates that many distinct connections, then they're returned to it.
+
+    :param engine: engine to warm up.
+    :param connections: number of connections to open.
+    :return: seconds taken.
+    """
+    started = time.perf_counter()
+    async with AsyncExitStack() as stack:
+        opened = await asyncio.gather(
+            *[
+                stack.enter_async_context(engine.connect())
+                for _ in range(connections)
+            ],
+        )
+        await asyncio.gather(*[_prepare(connection) for connection in opened])
+
+    return time.perf_counter() - started
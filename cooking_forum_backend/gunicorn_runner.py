@@ -1,15 +1,60 @@
-from typing import Any
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Callable, List, Literal, Optional, Union
 
 from gunicorn.app.base import BaseApplication
+from gunicorn.arbiter import Arbiter
 from gunicorn.util import import_app
+from uvicorn import Server
 from uvicorn.workers import UvicornWorker as BaseUvicornWorker
 
+from cooking_forum_backend.services.system_resources import (
+    available_cpus,
+    cgroup_memory_limit,
+    current_rss_bytes,
+)
+from cooking_forum_backend.settings import settings
+
 try:
     import uvloop  # noqa: WPS433 (Found nested import)
 except ImportError:
     uvloop = None  # type: ignore  # noqa: WPS440 (variables overlap)
 
 
+class DrainingServer(Server):
+    """
+    Uvicorn server draining the application before it stops listening.
+
+    uvicorn closes its sockets and waits for the requests in flight
+    before the lifespan shutdown runs, so the application can't drain
+    from there. Here, on SIGTERM/SIGINT/SIGQUIT, the sockets stay open
+    for up to ``shutdown_drain_seconds`` while the requests in flight
+    complete: new requests, health checks included, get a 503 with
+    ``Connection: close`` from ``InFlightMiddleware``, which takes the
+    worker out of the load balancer's rotation.
+    """
+
+    async def shutdown(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        """
+        Drain the application, then stop the server.
+
+        :param sockets: sockets the server listens on.
+        """
+        in_flight = _find_in_flight(self.config.loaded_app)
+        if in_flight is not None and not self.force_exit:
+            in_flight.start_draining()
+            if not await in_flight.wait_idle(settings.shutdown_drain_seconds):
+                logging.getLogger("uvicorn.error").warning(
+                    "Drain deadline reached with %d requests in flight",
+                    in_flight.count,
+                )
+        await super().shutdown(sockets)
+
+
 class UvicornWorker(BaseUvicornWorker):
     """
     Configuration for uvicorn workers.
@@ -25,6 +70,57 @@ class UvicornWorker(BaseUvicornWorker):
         "lifespan": "on",
         "factory": True,
         "proxy_headers": False,
+        # Requests are logged by ServerTimingMiddleware, with their timings,
+        # through the log queue set up on startup.
+        "access_log": False,
+    }
+
+    async def _serve(self) -> None:
+        # The one of uvicorn, with a DrainingServer.
+        self.config.app = self.wsgi
+        server = DrainingServer(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
+
+    async def callback_notify(self) -> None:
+        """
+        Heartbeat sent to the arbiter.
+
+        It's called every half gunicorn timeout, and also checks the worker
+        memory: past ``worker_max_rss_mb`` the worker stops gracefully,
+        finishing its requests, and the arbiter replaces it.
+        """
+        await super().callback_notify()
+
+        max_rss = settings.worker_max_rss_mb * 2**20
+        if not max_rss or getattr(self, "rss_restart_requested", False):
+            return
+
+        rss = current_rss_bytes()
+        if rss > max_rss:
+            self.log.warning(
+                "Worker %s RSS is %.0f MB, over %d MB: restarting it",
+                self.pid,
+                rss / 2**20,
+                settings.worker_max_rss_mb,
+            )
+            self.rss_restart_requested = True
+            os.kill(self.pid, signal.SIGTERM)
+
+
+class PreloadedUvicornWorker(UvicornWorker):
+    """
+    Uvicorn worker for preloaded applications.
+
+    The application is already built in the arbiter,
+    so workers must not call it as a factory.
+    """
+
+    CONFIG_KWARGS = {  # noqa: WPS115 (upper-case constant in a class)
+        **UvicornWorker.CONFIG_KWARGS,
+        "factory": False,
     }
 
 
@@ -42,12 +138,15 @@ class GunicornApplication(BaseApplication):
         host: str,
         port: int,
         workers: int,
+        preload_app: bool = False,
         **kwargs: Any,
     ):
+        worker_class = "PreloadedUvicornWorker" if preload_app else "UvicornWorker"
         self.options = {
             "bind": f"{host}:{port}",
             "workers": workers,
-            "worker_class": "cooking_forum_backend.gunicorn_runner.UvicornWorker",
+            "preload_app": preload_app,
+            "worker_class": f"cooking_forum_backend.gunicorn_runner.{worker_class}",
             **kwargs,
         }
         self.app = app
@@ -66,14 +165,82 @@ class GunicornApplication(BaseApplication):
             if key in self.cfg.settings and value is not None:
                 self.cfg.set(key.lower(), value)
 
-    def load(self) -> str:
+    def load(self) -> Callable[..., Any]:
         """
         Load actual application.
 
         Gunicorn loads application based on this
-        function's returns. We return python's path to
-        the app's factory.
+        function's returns.
 
-        :returns: python path to app factory.
+        Without preload_app it runs in every worker and returns
+        the app's factory, called by uvicorn.
+        With preload_app it runs once in the arbiter and returns
+        the built application, shared copy-on-write by the forked workers.
+        Database engines are created on startup, after the fork.
+
+        :returns: app factory or application.
         """
-        return import_app(self.app)
+        started = time.perf_counter()
+        factory = import_app(self.app)
+        _log_phase("imports", started)
+
+        if not self.cfg.preload_app:
+            return lambda: _build_app(factory)
+
+        from cooking_forum_backend.db.models import load_all_models  # noqa: WPS433
+        from cooking_forum_backend.services.jwt_backends import (  # noqa: WPS433
+            get_jwt_backend,
+        )
+
+        started = time.perf_counter()
+        load_all_models()
+        get_jwt_backend()
+        _log_phase("models and keys", started)
+        return _build_app(factory)
+
+
+def resolve_workers_count(
+    workers_count: Union[int, Literal["auto"]],
+    worker_max_rss_mb: int = 0,
+) -> int:
+    """
+    Get the number of workers to start.
+
+    In "auto" mode it starts one worker per usable CPU, and no more
+    workers than the cgroup memory limit can hold at their RSS ceiling.
+
+    :param workers_count: configured number of workers or "auto".
+    :param worker_max_rss_mb: RSS ceiling of a worker, 0 if unlimited.
+    :return: number of workers.
+    """
+    if workers_count != "auto":
+        return workers_count
+
+    workers = available_cpus()
+    memory_limit = cgroup_memory_limit()
+    if memory_limit is not None and worker_max_rss_mb:
+        workers = min(workers, memory_limit // (worker_max_rss_mb * 2**20))
+
+    return max(workers, 1)
+
+
+def _find_in_flight(app: Any) -> Any:
+    # The application may be wrapped by uvicorn's middlewares.
+    while app is not None and not hasattr(app, "state"):
+        app = getattr(app, "app", None)
+    return getattr(getattr(app, "state", None), "in_flight", None)
+
+
+def _build_app(factory: Callable[[], Any]) -> Any:
+    started = time.perf_counter()
+    app = factory()
+    _log_phase("app build", started)
+    return app
+
+
+def _log_phase(phase: str, started: float) -> None:
+    logging.getLogger("gunicorn.error").info(
+        "Startup phase %s took %.1f ms",
+        phase,
+        (time.perf_counter() - started) * 1000,
+    )
@@ -0,0 +1,167 @@
+import logging
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+import ujson
+
+# Id of the request being handled, set by CorrelationIdMiddleware and
+# inherited by the tasks it spawns.
+correlation_id: ContextVar[Optional[str]] = ContextVar(
+    "correlation_id",
+    default=None,
+)
+
+# Loggers configured by uvicorn and gunicorn with their own synchronous
+# handlers, sent through the queue as well. uvicorn.access stays off, the
+# access log is written by ServerTimingMiddleware.
+SERVER_LOGGERS = ("uvicorn", "uvicorn.error", "gunicorn.error")
+
+# Attributes of every LogRecord, anything else was passed in ``extra``.
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__,
+) | {"message", "correlation_id"}
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(correlation_id)s] %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, with their extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:  # noqa: WPS125
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "correlation_id", None):
+            entry["correlation_id"] = record.correlation_id  # type: ignore
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return ujson.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Queues records for the listener thread, dropping them when it's full.
+
+    Logging never blocks the event loop: when the writer can't keep up,
+    new records are dropped and counted, and a warning with the count is
+    queued as soon as there's room again.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Render what depends on the calling thread before queueing.
+
+        The message is merged with its arguments and the traceback
+        rendered here, the JSON is written by the listener thread.
+
+        :param record: record to queue.
+        :return: copy of the record, safe to pass to another thread.
+        """
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.correlation_id = correlation_id.get()  # type: ignore
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Queue a record, or drop it if the queue is full.
+
+        :param record: prepared record.
+        """
+        try:
+            if self.dropped:
+                self.queue.put_nowait(self._dropped_record())
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _dropped_record(self) -> logging.LogRecord:
+        return logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Log queue full, dropped {self.dropped} records",
+                "dropped": self.dropped,
+                "correlation_id": None,
+            },
+        )
+
+
+def configure_logging(
+    level: str,
+    log_format: str = "json",
+    queue_size: int = 10000,
+) -> QueueListener:
+    """
+    Send the application and server logs through a queue to stdout.
+
+    Records are written by a listener thread, so a slow stdout pipe
+    never stalls the event loop. It runs in every worker, after the
+    fork: threads don't survive a fork.
+
+    :param level: level of the root logger.
+    :param log_format: "json" for one JSON object per line, or "text".
+    :param queue_size: records buffered before new ones are dropped.
+    :return: the started listener.
+    """
+    global _listener  # noqa: WPS420
+    if _listener is not None:
+        _listener.stop()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if log_format == "json":
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(
+            logging.Formatter(TEXT_FORMAT, defaults={"correlation_id": None}),
+        )
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(max(queue_size, 1))
+    root = logging.getLogger()
+    root.handlers = [DroppingQueueHandler(log_queue)]
+    root.setLevel(level)
+    for name in SERVER_LOGGERS:
+        server_logger = logging.getLogger(name)
+        server_logger.handlers = []
+        server_logger.propagate = True
+
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """
+    Write the records still queued and stop the listener thread.
+
+    The last records of the worker, after that, are written directly.
+    """
+    global _listener  # noqa: WPS420
+    if _listener is not None:
+        _listener.stop()
+        logging.getLogger().handlers = list(_listener.handlers)
+        _listener = None
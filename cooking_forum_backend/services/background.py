@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from typing import Any, Coroutine, Set
+
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTaskGroup:
+    """
+    Fire-and-forget tasks of a worker, such as sending emails.
+
+    Tasks are referenced until they complete, so they can't be garbage
+    collected mid-flight, and are awaited on shutdown before the
+    resources they use are released.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Set["asyncio.Task[Any]"] = set()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def spawn(self, coroutine: Coroutine[Any, Any, Any]) -> "asyncio.Task[Any]":
+        """
+        Run a coroutine in the background.
+
+        :param coroutine: coroutine to run.
+        :return: the task.
+        """
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._on_done)
+        return task
+
+    async def shutdown(self, timeout: float) -> None:
+        """
+        Wait for the running tasks, then cancel those still running.
+
+        :param timeout: maximum seconds to wait.
+        """
+        if not self._tasks:
+            return
+
+        _, pending = await asyncio.wait(set(self._tasks), timeout=max(timeout, 0))
+        if pending:
+            logger.warning("Cancelling %d background tasks", len(pending))
+            for task in pending:
+                task.cancel()
+            await asyncio.wait(pending)
+
+    def _on_done(self, task: "asyncio.Task[Any]") -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "Background task failed",
+                exc_info=task.exception(),
+            )
+
+
+def get_background_tasks(request: Request) -> BackgroundTaskGroup:
+    """
+    Get the background tasks of the current worker.
+
+    :param request: current request.
+    :return: background task group.
+    """
+    return request.app.state.background_tasks
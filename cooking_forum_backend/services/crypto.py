@@ -1,9 +1,12 @@
+import hashlib
+import secrets
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
-from jose import jwt
 from passlib.context import CryptContext
 
+from cooking_forum_backend.services.jwt_backends import get_jwt_backend
+from cooking_forum_backend.services.timing import timed
 from cooking_forum_backend.settings import settings
 
 
@@ -12,19 +15,24 @@ class CryptoService:
 
     def __init__(self):
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        self.jwt_secret = settings.jwt_secret
-        self.jwt_algorithm = settings.jwt_algorithm
+        self.jwt_backend = get_jwt_backend()
         self.jwt_expires_delta = timedelta(minutes=settings.jwt_expires_minutes)
+        self.jwt_refresh_expires_delta = timedelta(
+            days=settings.jwt_refresh_expires_days,
+        )
 
+    @timed("crypto")
     def hash_password(self, password: str) -> str:
         return self.pwd_context.hash(password)
 
+    @timed("crypto")
     def check_password(self, password: str, hashed_password: str):
         return self.pwd_context.verify(
             password,
             hashed_password,
         )
 
+    @timed("crypto")
     def create_access_token(
         self,
         data: dict,
@@ -34,16 +42,15 @@ class CryptoService:
         expire = datetime.utcnow() + (expires_delta or self.jwt_expires_delta)
 
         to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(
-            to_encode,
-            key=self.jwt_secret,
-            algorithm=self.jwt_algorithm,
-        )
-        return encoded_jwt
+        return self.jwt_backend.encode(to_encode)
 
+    @timed("crypto")
     def decode_access_token(self, token: str) -> dict[str, Any]:
-        return jwt.decode(
-            token,
-            key=self.jwt_secret,
-            algorithms=[self.jwt_algorithm],
-        )
+        return self.jwt_backend.decode(token)
+
+    def create_refresh_token(self) -> str:
+        return secrets.token_urlsafe(32)
+
+    def hash_refresh_token(self, token: str) -> str:
+        # Refresh tokens are random and long, a fast hash is enough here.
+        return hashlib.sha256(token.encode()).hexdigest()
@@ -1,3 +1,12 @@
+import logging
+
+from cooking_forum_backend.services.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+
 class EmailService:
+    @traced()
     async def sendEmail(self, email, content):
-        print(f"To: {email}, content: {content}")
+        # Stand-in for an email provider: the message goes to the logs.
+        logger.info("Email to %s: %s", email, content, extra={"to": email})
@@ -0,0 +1,379 @@
+import abc
+import base64
+import binascii
+import calendar
+import hashlib
+import hmac
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import ujson
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.asymmetric.utils import (
+    decode_dss_signature,
+    encode_dss_signature,
+)
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
+
+from cooking_forum_backend.settings import settings
+
+TIME_CLAIMS = ("exp", "iat", "nbf")
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _encode_segment(data: Dict[str, Any]) -> bytes:
+    return _b64encode(ujson.dumps(data, separators=(",", ":")).encode())
+
+
+class JWTBackend(abc.ABC):
+    """Signs and verifies JWTs."""
+
+    algorithm: str
+
+    @abc.abstractmethod
+    def encode(self, claims: Dict[str, Any]) -> str:
+        """
+        Serialize and sign claims.
+
+        :param claims: claims of the token, datetimes are converted.
+        """
+
+    @abc.abstractmethod
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token and return its claims.
+
+        :param token: compact JWT.
+        """
+
+    def jwks(self) -> Dict[str, Any]:
+        """
+        Public keys that verify tokens of this backend.
+
+        :return: JSON Web Key Set.
+        """
+        return {"keys": []}
+
+
+class CompactJWSBackend(JWTBackend):
+    """
+    Base for backends implementing the JWS compact serialization directly.
+
+    Subclasses only deal with signatures, the serialization and the
+    validation of time claims are shared.
+    """
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        """
+        Serialize and sign claims.
+
+        :param claims: claims of the token, datetimes are converted.
+        :return: compact JWT.
+        """
+        payload = {
+            key: calendar.timegm(value.utctimetuple())
+            if isinstance(value, datetime)
+            else value
+            for key, value in claims.items()
+        }
+        signing_input = b".".join(
+            (self._header_segment(), _encode_segment(payload)),
+        )
+        signature = self._sign(signing_input)
+        return b".".join((signing_input, _b64encode(signature))).decode()
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token and return its claims.
+
+        :param token: compact JWT.
+        :raises JWTError: if the token is malformed or invalid.
+        :raises ExpiredSignatureError: if the token expired.
+        :return: claims of the token.
+        """
+        try:
+            signing_input, signature = token.encode().rsplit(b".", 1)
+            header_segment, payload_segment = signing_input.split(b".", 1)
+            header = ujson.loads(_b64decode(header_segment))
+            raw_signature = _b64decode(signature)
+        except (ValueError, binascii.Error):
+            raise JWTError("Malformed token")
+
+        if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+            raise JWTError("The specified alg value is not allowed")
+        if not self._verify(header, signing_input, raw_signature):
+            raise JWTError("Signature verification failed")
+
+        try:
+            claims = ujson.loads(_b64decode(payload_segment))
+        except (ValueError, binascii.Error):
+            raise JWTError("Invalid payload")
+        if not isinstance(claims, dict):
+            raise JWTError("Invalid payload")
+
+        _validate_time_claims(claims)
+        return claims
+
+    @abc.abstractmethod
+    def _header_segment(self) -> bytes:
+        """Encoded header used for new tokens."""
+
+    @abc.abstractmethod
+    def _sign(self, signing_input: bytes) -> bytes:
+        """Signature of the first two segments."""
+
+    @abc.abstractmethod
+    def _verify(
+        self,
+        header: Dict[str, Any],
+        signing_input: bytes,
+        signature: bytes,
+    ) -> bool:
+        """Check a signature."""
+
+
+class HS256Backend(CompactJWSBackend):
+    """
+    HMAC-SHA256 backend.
+
+    The HMAC object is keyed once, every token only copies its
+    precomputed inner and outer states.
+    """
+
+    algorithm = "HS256"
+
+    def __init__(self, secret: str):
+        self._hmac = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+        self._header = _encode_segment({"alg": self.algorithm, "typ": "JWT"})
+
+    def _header_segment(self) -> bytes:
+        return self._header
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._hmac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def _verify(
+        self,
+        header: Dict[str, Any],
+        signing_input: bytes,
+        signature: bytes,
+    ) -> bool:
+        return hmac.compare_digest(self._sign(signing_input), signature)
+
+
+class AsymmetricBackend(CompactJWSBackend):
+    """
+    EdDSA (Ed25519) or ES256 backend with key rotation.
+
+    Every key is identified by a ``kid``. New tokens are signed with the
+    active private key, while any known public key is accepted, so retired
+    keys keep verifying tokens until they expire.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        private_keys: Dict[str, Any],
+        active_kid: str,
+        public_keys: Optional[Dict[str, Any]] = None,
+    ):
+        if algorithm not in {"EdDSA", "ES256"}:
+            raise ValueError(f"Unsupported algorithm {algorithm}")
+        if active_kid not in private_keys:
+            raise ValueError(f"No private key for kid {active_kid}")
+        for kid, key in {**(public_keys or {}), **private_keys}.items():
+            if not _key_matches(algorithm, key):
+                raise ValueError(f"Key {kid} can't be used with {algorithm}")
+
+        self.algorithm = algorithm
+        self.active_kid = active_kid
+        self._private_key = private_keys[active_kid]
+        self._public_keys = {
+            **(public_keys or {}),
+            **{kid: key.public_key() for kid, key in private_keys.items()},
+        }
+        self._header = _encode_segment(
+            {"alg": algorithm, "kid": active_kid, "typ": "JWT"},
+        )
+        self._jwks = {
+            "keys": [
+                self._public_jwk(kid, key) for kid, key in self._public_keys.items()
+            ],
+        }
+
+    @classmethod
+    def load(
+        cls,
+        algorithm: str,
+        keys_dir: Path,
+        active_kid: Optional[str] = None,
+    ) -> "AsymmetricBackend":
+        """
+        Load PEM keys from a directory.
+
+        Every ``<kid>.pem`` file holds a private or a public key. Without
+        an explicit ``active_kid``, the last private key in name order signs.
+
+        :param algorithm: EdDSA or ES256.
+        :param keys_dir: directory with the keys.
+        :param active_kid: kid of the signing key.
+        :return: backend.
+        """
+        private_keys = {}
+        public_keys = {}
+        for pem_path in sorted(keys_dir.glob("*.pem")):
+            pem = pem_path.read_bytes()
+            if b"PRIVATE KEY" in pem:
+                private_keys[pem_path.stem] = serialization.load_pem_private_key(
+                    pem,
+                    password=None,
+                )
+            else:
+                public_keys[pem_path.stem] = serialization.load_pem_public_key(pem)
+
+        if not private_keys:
+            raise ValueError(f"No private keys found in {keys_dir}")
+
+        return cls(
+            algorithm=algorithm,
+            private_keys=private_keys,
+            active_kid=active_kid or list(private_keys)[-1],
+            public_keys=public_keys,
+        )
+
+    def jwks(self) -> Dict[str, Any]:
+        return self._jwks
+
+    def _header_segment(self) -> bytes:
+        return self._header
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        if self.algorithm == "EdDSA":
+            return self._private_key.sign(signing_input)
+
+        der_signature = self._private_key.sign(
+            signing_input,
+            ec.ECDSA(hashes.SHA256()),
+        )
+        r, s = decode_dss_signature(der_signature)
+        return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+    def _verify(
+        self,
+        header: Dict[str, Any],
+        signing_input: bytes,
+        signature: bytes,
+    ) -> bool:
+        public_key = self._public_keys.get(header.get("kid"))
+        if public_key is None:
+            return False
+
+        try:
+            if self.algorithm == "EdDSA":
+                public_key.verify(signature, signing_input)
+            else:
+                if len(signature) != 64:
+                    return False
+                public_key.verify(
+                    encode_dss_signature(
+                        int.from_bytes(signature[:32], "big"),
+                        int.from_bytes(signature[32:], "big"),
+                    ),
+                    signing_input,
+                    ec.ECDSA(hashes.SHA256()),
+                )
+        except InvalidSignature:
+            return False
+        return True
+
+    def _public_jwk(self, kid: str, public_key: Any) -> Dict[str, Any]:
+        jwk: Dict[str, Any] = {"kid": kid, "alg": self.algorithm, "use": "sig"}
+        if isinstance(public_key, ed25519.Ed25519PublicKey):
+            raw = public_key.public_bytes(
+                serialization.Encoding.Raw,
+                serialization.PublicFormat.Raw,
+            )
+            jwk.update(kty="OKP", crv="Ed25519", x=_b64encode(raw).decode())
+        else:
+            numbers = public_key.public_numbers()
+            jwk.update(
+                kty="EC",
+                crv="P-256",
+                x=_b64encode(numbers.x.to_bytes(32, "big")).decode(),
+                y=_b64encode(numbers.y.to_bytes(32, "big")).decode(),
+            )
+        return jwk
+
+
+class JoseBackend(JWTBackend):
+    """Fallback through python-jose for any other algorithm it supports."""
+
+    def __init__(self, secret: str, algorithm: str):
+        self.algorithm = algorithm
+        self._secret = secret
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return jwt.encode(claims, key=self._secret, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        return jwt.decode(token, key=self._secret, algorithms=[self.algorithm])
+
+
+def _key_matches(algorithm: str, key: Any) -> bool:
+    if algorithm == "EdDSA":
+        return isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey))
+    return isinstance(
+        key,
+        (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey),
+    ) and isinstance(key.curve, ec.SECP256R1)
+
+
+def _validate_time_claims(claims: Dict[str, Any]) -> None:
+    now = time.time()
+    for claim in TIME_CLAIMS:
+        if claim in claims and not isinstance(claims[claim], (int, float)):
+            raise JWTClaimsError(f"Invalid {claim} claim")
+
+    if "exp" in claims and claims["exp"] <= now:
+        raise ExpiredSignatureError("Signature has expired.")
+    if "nbf" in claims and claims["nbf"] > now:
+        raise JWTClaimsError("The token is not yet valid (nbf)")
+
+
+@lru_cache(maxsize=None)
+def get_jwt_backend() -> JWTBackend:
+    """
+    Build the backend configured in settings.
+
+    It's built once per process, so keys are parsed only once.
+
+    :return: JWT backend.
+    """
+    if settings.jwt_algorithm == "HS256":
+        return HS256Backend(settings.jwt_secret)
+
+    if settings.jwt_algorithm in {"EdDSA", "ES256"}:
+        if settings.jwt_keys_dir is None:
+            raise ValueError(f"{settings.jwt_algorithm} requires jwt_keys_dir")
+        return AsymmetricBackend.load(
+            algorithm=settings.jwt_algorithm,
+            keys_dir=settings.jwt_keys_dir,
+            active_kid=settings.jwt_active_kid,
+        )
+
+    return JoseBackend(settings.jwt_secret, settings.jwt_algorithm)
@@ -0,0 +1,146 @@
+import gc
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from cooking_forum_backend.services.system_resources import current_rss_bytes
+
+# Allocations of tracemalloc itself and of the import machinery are noise.
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class NoSnapshotError(RuntimeError):
+    """No baseline snapshot was taken yet."""
+
+
+def memory_gauges() -> Dict[str, Any]:
+    """
+    Memory of the current worker.
+
+    The heap is measured by the blocks allocated by Python's allocator,
+    which is cheap, rather than by walking the objects of the garbage
+    collector.
+
+    :return: gauges by name.
+    """
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    gc_stats = gc.get_stats()
+    gauges: Dict[str, Any] = {
+        "rss_bytes": current_rss_bytes(),
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+        "max_rss_bytes": max_rss if sys.platform == "darwin" else max_rss * 1024,
+        "python_allocated_blocks": sys.getallocatedblocks(),
+        "gc_pending": list(gc.get_count()),
+        "gc_collections": [stats["collections"] for stats in gc_stats],
+        "gc_uncollectable": sum(stats["uncollectable"] for stats in gc_stats),
+        "tracemalloc": tracemalloc.is_tracing(),
+    }
+    if tracemalloc.is_tracing():
+        traced, peak = tracemalloc.get_traced_memory()
+        gauges["tracemalloc_traced_bytes"] = traced
+        gauges["tracemalloc_peak_bytes"] = peak
+    return gauges
+
+
+class TracemallocSnapshots:
+    """
+    ``tracemalloc`` baseline of a worker, and its diffs by module.
+
+    Tracing is started with the first snapshot and slows allocations
+    down, so it runs only between ``take_baseline`` and ``stop``.
+    """
+
+    def __init__(self) -> None:
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.taken_at: Optional[float] = None
+
+    def take_baseline(self, frames: int) -> Dict[str, Any]:
+        """
+        Start tracing if needed, and take the snapshot diffs compare to.
+
+        :param frames: frames kept per allocation when tracing starts.
+        :return: tracing gauges.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.baseline = _snapshot()
+        self.taken_at = time.monotonic()
+        traced, peak = tracemalloc.get_traced_memory()
+        return {
+            "traceback_limit": tracemalloc.get_traceback_limit(),
+            "traced_bytes": traced,
+            "peak_bytes": peak,
+        }
+
+    def diff(self, limit: int, cumulative: bool = False) -> Dict[str, Any]:
+        """
+        Allocations grown, or shrunk, since the baseline, by module.
+
+        :param limit: number of modules returned, largest changes first.
+        :param cumulative: count an allocation in every module of its
+            traceback, not only the one allocating, so that the modules
+            calling into libraries show up too.
+        :raises NoSnapshotError: if no baseline was taken.
+        :return: the modules and totals.
+        """
+        if self.baseline is None or self.taken_at is None:
+            raise NoSnapshotError()
+        snapshot = _snapshot()
+        modules: Dict[str, Counter[str]] = defaultdict(Counter)
+        for stat in snapshot.compare_to(self.baseline, "filename", cumulative):
+            module = modules[module_name(stat.traceback[0].filename)]
+            module["size_bytes"] += stat.size
+            module["size_diff_bytes"] += stat.size_diff
+            module["count"] += stat.count
+            module["count_diff"] += stat.count_diff
+
+        ranked: List[Dict[str, Any]] = sorted(
+            ({"module": name, **sizes} for name, sizes in modules.items()),
+            key=lambda module: abs(module["size_diff_bytes"]),
+            reverse=True,
+        )
+        return {
+            "seconds_since_baseline": time.monotonic() - self.taken_at,
+            "traced_bytes": tracemalloc.get_traced_memory()[0],
+            "modules": ranked[:limit],
+        }
+
+    def stop(self) -> None:
+        """Stop tracing and drop the baseline."""
+        self.baseline = None
+        self.taken_at = None
+        tracemalloc.stop()
+
+
+def module_name(filename: str) -> str:
+    """
+    Dotted name of the module in a file.
+
+    :param filename: file of the module.
+    :return: e.g. ``sqlalchemy.orm.session``, the file name itself when
+        it's not under ``sys.path``.
+    """
+    prefixes = [path for path in sys.path if path and filename.startswith(path)]
+    if not prefixes or not filename.endswith(".py"):
+        return filename
+    relative = filename[len(max(prefixes, key=len)) : -len(".py")].strip(os.sep)
+    parts = relative.split(os.sep)
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+
+
+tracemalloc_snapshots = TracemallocSnapshots()
@@ -0,0 +1,372 @@
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from types import FrameType
+from typing import Any, Collection, Dict, List, Optional, Set
+
+import ujson
+
+logger = logging.getLogger(__name__)
+
+# Ignored by default, unlike SIGUSR1/SIGUSR2/SIGPROF: the gunicorn arbiter
+# and workers still booting survive it when it's sent to them by mistake.
+PROFILE_SIGNAL = signal.SIGURG
+# Stacks deeper than this are cut at their root end.
+MAX_DEPTH = 128
+# Profile requests older than this are ignored by signalled workers.
+REQUEST_MAX_AGE_SECONDS = 10
+REQUEST_FILE = "request.json"
+# Limits of the duration and interval of a profile, in seconds.
+MAX_SECONDS = 60
+MIN_INTERVAL = 0.001
+MAX_INTERVAL = 1
+# Profiles and requests are only for the user running the workers.
+DIRECTORY_MODE = 0o700
+# Roots of the collapsed stacks.
+RUNNING = "[running]"
+AWAITING = "[awaiting]"
+
+_busy = threading.Lock()
+_signal_tasks: Set["asyncio.Future[None]"] = set()
+
+
+class ProfilerBusyError(RuntimeError):
+    """A profile is already running in this worker."""
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler of the event loop of a worker.
+
+    A thread wakes up every ``interval`` seconds and records the stack of
+    the event loop thread, under ``[running]``, and the await chain of
+    every suspended task, under ``[awaiting]``. Await chains start at the
+    task's coroutine, e.g. the request handling of uvicorn, so waits on
+    the database or a lock are found under the route that waits.
+
+    Stacks are counted in the collapsed format of flamegraph.pl and
+    speedscope: frames from the root, separated by ``;``, then the count.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.01,
+        exclude: Collection["asyncio.Task[Any]"] = (),
+    ) -> None:
+        self.interval = interval
+        self.stacks: "Counter[str]" = Counter()
+        self.samples = 0
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._exclude = set(exclude)
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling, it must be called from the event loop."""
+        self._thread = threading.Thread(
+            target=self._run,
+            name="sampling-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self, prefix: str = "") -> str:
+        """
+        Stacks in the collapsed format, one per line.
+
+        :param prefix: frame added at the root of every stack.
+        :return: the profile.
+        """
+        return "".join(
+            f"{prefix}{stack} {count}\n" for stack, count in sorted(self.stacks.items())
+        )
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        self.samples += 1
+        frame = sys._current_frames().get(self._thread_id)  # noqa: WPS437
+        if frame is not None:
+            frames = []
+            while frame is not None and len(frames) < MAX_DEPTH:
+                frames.append(frame)
+                frame = frame.f_back
+            frames.reverse()
+            self.stacks[_collapse(RUNNING, frames)] += 1
+
+        for task in asyncio.all_tasks(self._loop):
+            if task in self._exclude:
+                continue
+            frames = _await_chain(task.get_coro())
+            if frames:
+                self.stacks[_collapse(AWAITING, frames)] += 1
+
+
+async def profile(seconds: float, interval: float) -> str:
+    """
+    Profile the worker for a while.
+
+    The task profiling is left out of the awaiting stacks.
+
+    :param seconds: duration of the profile.
+    :param interval: seconds between two samples.
+    :raises ProfilerBusyError: if a profile is already running.
+    :return: the collapsed stacks.
+    """
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusyError()
+    try:
+        current = asyncio.current_task()
+        profiler = SamplingProfiler(interval, exclude=[current] if current else [])
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+    finally:
+        _busy.release()
+    return profiler.collapsed()
+
+
+async def profile_workers(
+    directory: Path,
+    seconds: float,
+    interval: float,
+) -> Dict[int, str]:
+    """
+    Profile this worker and, through ``PROFILE_SIGNAL``, its siblings.
+
+    The duration and interval are passed to the signalled workers in a
+    request file, and their profiles are read back from the directory.
+    Workers that don't answer in time are left out.
+
+    :param directory: directory shared by the workers.
+    :param seconds: duration of the profile.
+    :param interval: seconds between two samples.
+    :raises PermissionError: if the directory belongs to another user.
+    :return: collapsed stacks by worker pid.
+    """
+    request_id = uuid.uuid4().hex
+    _private_directory(directory)
+    _write_atomic(
+        directory / REQUEST_FILE,
+        ujson.dumps(
+            {
+                "id": request_id,
+                "seconds": seconds,
+                "interval": interval,
+                "created": time.time(),
+            },
+        ),
+    )
+    siblings = []
+    for pid in sibling_workers():
+        try:
+            os.kill(pid, PROFILE_SIGNAL)
+        except ProcessLookupError:
+            continue
+        siblings.append(pid)
+
+    profiles = {os.getpid(): await profile(seconds, interval)}
+
+    deadline = time.monotonic() + REQUEST_MAX_AGE_SECONDS
+    pending = {pid: directory / f"{request_id}.{pid}.folded" for pid in siblings}
+    while pending and time.monotonic() < deadline:
+        for pid, path in list(pending.items()):
+            if path.exists():
+                profiles[pid] = path.read_text()
+                path.unlink()
+                del pending[pid]  # noqa: WPS420
+        if pending:
+            await asyncio.sleep(0.1)
+    if pending:
+        logger.warning("No profile from workers %s", sorted(pending))
+    (directory / REQUEST_FILE).unlink(missing_ok=True)
+    return profiles
+
+
+def sibling_workers() -> List[int]:
+    """
+    Pids of the other workers of the gunicorn arbiter.
+
+    They're the processes with the same parent and command line as this
+    one, found in /proc. Outside of Linux it's always empty.
+
+    :return: the pids.
+    """
+    pid = os.getpid()
+    parent = os.getppid()
+    proc = Path("/proc")
+    try:
+        cmdline = (proc / str(pid) / "cmdline").read_bytes()
+    except OSError:
+        return []
+
+    siblings = []
+    for entry in proc.iterdir():
+        if not entry.name.isdigit() or int(entry.name) == pid:
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            # The command name in parentheses may hold spaces.
+            fields = stat[stat.rindex(")") + 2 :].split()
+            if int(fields[1]) == parent and (entry / "cmdline").read_bytes() == cmdline:
+                siblings.append(int(entry.name))
+        except (OSError, ValueError, IndexError):
+            continue
+    return siblings
+
+
+def install_profile_signal(directory: Path, seconds: float, interval: float) -> None:
+    """
+    Profile the worker when it receives ``PROFILE_SIGNAL``.
+
+    The profile is written to ``<directory>/<id>.<pid>.folded``, with the
+    id, duration and interval of a recent request file, or a
+    ``signal-<timestamp>`` id and the defaults given here. Requests out of
+    the limits of the duration and interval are ignored, and so is the
+    signal if the directory belongs to another user.
+
+    :param directory: directory of the profiles.
+    :param seconds: default duration of the profiles.
+    :param interval: default seconds between two samples.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(
+            PROFILE_SIGNAL,
+            _on_signal,
+            directory,
+            seconds,
+            interval,
+        )
+    except (NotImplementedError, RuntimeError, ValueError):
+        # Not in the main thread of the process, e.g. in a TestClient.
+        logger.info("Profiling on %s is unavailable", PROFILE_SIGNAL.name)
+
+
+def remove_profile_signal() -> None:
+    """Stop profiling on ``PROFILE_SIGNAL``."""
+    try:
+        asyncio.get_running_loop().remove_signal_handler(PROFILE_SIGNAL)
+    except (NotImplementedError, RuntimeError, ValueError):
+        logger.debug("No handler of %s to remove", PROFILE_SIGNAL.name)
+
+
+def _on_signal(directory: Path, seconds: float, interval: float) -> None:
+    try:
+        _private_directory(directory)
+    except PermissionError as error:
+        logger.warning("Profile on %s ignored: %s", PROFILE_SIGNAL.name, error)
+        return
+
+    request: Dict[str, Any] = {}
+    try:
+        request = ujson.loads((directory / REQUEST_FILE).read_text())
+    except (OSError, ValueError):
+        logger.debug("No profile request file in %s", directory)
+    if time.time() - request.get("created", 0) > REQUEST_MAX_AGE_SECONDS:
+        request = {"id": f"signal-{int(time.time())}"}
+    path = directory / f"{request['id']}.{os.getpid()}.folded"
+    seconds = request.get("seconds", seconds)
+    interval = request.get("interval", interval)
+    if not _within_limits(seconds, interval):
+        logger.warning(
+            "Profile %s ignored, %r seconds every %r out of the limits",
+            path.name,
+            seconds,
+            interval,
+        )
+        return
+
+    async def run() -> None:  # noqa: WPS430
+        try:
+            profiled = await profile(seconds, interval)
+        except ProfilerBusyError:
+            logger.warning("A profile is already running, %s ignored", path.name)
+            return
+        _write_atomic(path, profiled)
+        logger.info("Profile written to %s", path)
+
+    task = asyncio.ensure_future(run())
+    # The loop only keeps a weak reference to its tasks.
+    _signal_tasks.add(task)
+    task.add_done_callback(_signal_tasks.discard)
+
+
+def _within_limits(seconds: Any, interval: Any) -> bool:
+    numbers = all(
+        isinstance(number, (int, float)) and not isinstance(number, bool)
+        for number in (seconds, interval)
+    )
+    return (
+        numbers
+        and 0 < seconds <= MAX_SECONDS
+        and MIN_INTERVAL <= interval <= MAX_INTERVAL
+    )
+
+
+def _private_directory(directory: Path) -> None:
+    # The default directory is under the shared /tmp: another user could
+    # create it first, to send requests or read the profiles.
+    directory.mkdir(mode=DIRECTORY_MODE, parents=True, exist_ok=True)
+    if directory.is_symlink() or directory.stat().st_uid != os.getuid():
+        raise PermissionError(f"{directory} isn't a directory of this user")
+    if directory.stat().st_mode & 0o777 != DIRECTORY_MODE:  # noqa: WPS432
+        directory.chmod(DIRECTORY_MODE)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    temporary = path.with_name(f".{path.name}.{os.getpid()}")
+    temporary.write_text(text)
+    temporary.replace(path)
+
+
+def _await_chain(coro: Any) -> List[FrameType]:
+    frames: List[FrameType] = []
+    while coro is not None and len(frames) < MAX_DEPTH:
+        if getattr(coro, "cr_running", False):
+            # The running stack has it.
+            return []
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            # Done, or a future at the end of the chain.
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+
+def _collapse(root: str, frames: List[FrameType]) -> str:
+    return ";".join([root, *(_label(frame.f_code) for frame in frames)])
+
+
+@lru_cache(maxsize=4096)
+def _label(code: Any) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+@lru_cache(maxsize=1024)
+def _short_path(filename: str) -> str:
+    # Relative to the longest sys.path entry holding it, like a module path.
+    prefixes = [path for path in sys.path if path and filename.startswith(path)]
+    if not prefixes:
+        return filename
+    return filename[len(max(prefixes, key=len)) :].lstrip(os.sep)
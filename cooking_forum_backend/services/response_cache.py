@@ -0,0 +1,151 @@
+import asyncio
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from cooking_forum_backend.settings import settings
+
+
+class CachedResponse(NamedTuple):
+    """Encoded response body and its ETag."""
+
+    body: bytes
+    etag: str
+
+
+class ResponseCache:
+    """
+    Per-worker cache of encoded responses, bounded LRU with a TTL.
+
+    Concurrent misses of a key are coalesced: the first caller builds the
+    response, the others wait for it. ``clear`` is called on writes; a
+    response built from data read before the write is returned to the
+    callers already waiting for it, but never stored.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, CachedResponse]]" = (
+            OrderedDict()
+        )
+        self._inflight: Dict[Hashable, "asyncio.Future[CachedResponse]"] = {}
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def generation(self) -> int:
+        """Number of times the cache was cleared, to pass to ``set``."""
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """
+        Get a fresh cached response.
+
+        :param key: cache key.
+        :return: the response, None if missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]  # noqa: WPS420
+            return None
+
+        self._entries.move_to_end(key)
+        return response
+
+    async def get_or_create(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[CachedResponse]],
+    ) -> CachedResponse:
+        """
+        Get a cached response, building it on a miss.
+
+        :param key: cache key.
+        :param factory: builds the response.
+        :return: the response.
+        """
+        while True:  # noqa: WPS457
+            response = self.get(key)
+            if response is not None:
+                return response
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # The caller building it was cancelled, take over.
+                if not inflight.cancelled():
+                    raise
+
+        generation = self._generation
+        inflight = asyncio.get_running_loop().create_future()
+        self._inflight[key] = inflight
+        try:
+            response = await factory()
+        except asyncio.CancelledError:
+            inflight.cancel()
+            raise
+        except Exception as exc:
+            inflight.set_exception(exc)
+            inflight.exception()  # retrieved, even without waiters
+            raise
+        finally:
+            if self._inflight.get(key) is inflight:
+                del self._inflight[key]  # noqa: WPS420
+
+        self.set(key, response, generation)
+        inflight.set_result(response)
+        return response
+
+    def set(self, key: Hashable, response: CachedResponse, generation: int) -> None:
+        """
+        Store a response built outside ``get_or_create``.
+
+        :param key: cache key.
+        :param response: the response.
+        :param generation: ``generation`` read before loading the data it
+            was built from; the response is dropped if it changed since.
+        """
+        if generation == self._generation:
+            self._store(key, response)
+
+    def clear(self) -> None:
+        """Drop every response, and the ones being built."""
+        self._entries.clear()
+        self._inflight.clear()
+        self._generation += 1
+
+    def _store(self, key: Hashable, response: CachedResponse) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+@lru_cache(maxsize=None)
+def get_response_cache(name: str) -> ResponseCache:
+    """
+    Get the response cache of a resource, such as "users".
+
+    Caches are per worker: a write only clears the cache of the worker
+    handling it, the others serve their copy until it expires.
+
+    :param name: name of the resource.
+    :return: response cache.
+    """
+    return ResponseCache(
+        max_entries=settings.response_cache_max_entries,
+        ttl=settings.response_cache_ttl_seconds,
+    )
@@ -0,0 +1,95 @@
+import math
+import os
+import resource
+import sys
+from pathlib import Path
+from typing import Optional
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def available_cpus() -> int:
+    """
+    Count the CPUs this process can actually use.
+
+    It honours the CPU affinity mask and cgroup (v1 or v2) CPU quotas,
+    so it returns the container limit rather than the host's CPU count.
+
+    :return: number of usable CPUs, at least 1.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+
+    quota = cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+
+    return max(cpus, 1)
+
+
+def cgroup_cpu_quota() -> Optional[float]:
+    """
+    CPU quota of the current cgroup, in CPUs.
+
+    :return: quota, None if unlimited or unknown.
+    """
+    cpu_max = _read(CGROUP_ROOT / "cpu.max")
+    if cpu_max is not None:
+        quota, _, period = cpu_max.partition(" ")
+        if quota == "max":
+            return None
+        return _ratio(quota, period)
+
+    quota = _read(CGROUP_ROOT / "cpu" / "cpu.cfs_quota_us")
+    period = _read(CGROUP_ROOT / "cpu" / "cpu.cfs_period_us")
+    if quota is None or period is None or quota.startswith("-"):
+        return None
+    return _ratio(quota, period)
+
+
+def cgroup_memory_limit() -> Optional[int]:
+    """
+    Memory limit of the current cgroup.
+
+    :return: limit in bytes, None if unlimited or unknown.
+    """
+    limit = _read(CGROUP_ROOT / "memory.max")
+    if limit is None:
+        limit = _read(CGROUP_ROOT / "memory" / "memory.limit_in_bytes")
+    if limit is None or not limit.isdigit():
+        return None
+
+    # cgroup v1 reports "no limit" as a huge page-aligned number.
+    limit_bytes = int(limit)
+    return limit_bytes if limit_bytes < 2**62 else None
+
+
+def current_rss_bytes() -> int:
+    """
+    Resident set size of the current process.
+
+    :return: RSS in bytes, the peak RSS where /proc is not available.
+    """
+    statm = _read(Path("/proc/self/statm"))
+    if statm is not None:
+        return int(statm.split()[1]) * resource.getpagesize()
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def _ratio(quota: str, period: str) -> Optional[float]:
+    try:
+        return int(quota) / int(period)
+    except (ValueError, ZeroDivisionError):
+        return None
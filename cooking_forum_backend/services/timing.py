@@ -0,0 +1,115 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+from cooking_forum_backend.services.tracing import current_span, start_span
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class RequestTimings:
+    """Time spent by the current request, by category (db, crypto...)."""
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def header(self, total: float) -> str:
+        """
+        Render a Server-Timing header value.
+
+        :param total: seconds spent in the app so far.
+        :return: header value, durations are in milliseconds.
+        """
+        metrics = [
+            f'{name};dur={seconds * 1000:.1f};desc="{self.counts[name]}x"'
+            for name, seconds in self.durations.items()
+        ]
+        metrics.append(f"app;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def milliseconds(self) -> Dict[str, float]:
+        """
+        Get the durations for structured logs.
+
+        :return: milliseconds by category.
+        """
+        return {
+            name: round(seconds * 1000, 1) for name, seconds in self.durations.items()
+        }
+
+    def summary(self) -> str:
+        """
+        Render the timings for the access log.
+
+        :return: e.g. ``db=3.1ms/2 crypto=250.3ms/1``.
+        """
+        return " ".join(
+            f"{name}={seconds * 1000:.1f}ms/{self.counts[name]}"
+            for name, seconds in self.durations.items()
+        )
+
+
+request_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings",
+    default=None,
+)
+
+
+def record(name: str, seconds: float) -> None:
+    """
+    Add a duration to the current request, if any.
+
+    :param name: category of the span.
+    :param seconds: duration of the span.
+    """
+    timings = request_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def measure(name: str, span_name: Optional[str] = None) -> Iterator[None]:
+    """
+    Time a block of code for the current request.
+
+    In a sampled trace, the block is also recorded as a tracing span.
+
+    :param name: category of the span.
+    :param span_name: name of the tracing span, defaults to the category.
+    :yield: nothing.
+    """
+    started = time.perf_counter()
+    try:
+        if current_span.get() is None:
+            yield
+        else:
+            with start_span(span_name or name, attributes={"category": name}):
+                yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """
+    Time every call of a function for the current request.
+
+    :param name: category of the span.
+    :return: decorator.
+    """
+
+    def decorator(func: F) -> F:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with measure(name, func.__qualname__):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
@@ -0,0 +1,99 @@
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from starlette.requests import Request
+
+from cooking_forum_backend.db.repositories.refresh_token_repository import (
+    RefreshTokenRepository,
+)
+
+# Revocations are re-read with this overlap, so rows committed slightly after
+# their revoked_at timestamp by a concurrent transaction are never missed.
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class TokenRevocationSet:
+    """
+    Per-worker set of revoked access token ids.
+
+    Lookups are pure in-memory operations. The set is refreshed from the
+    refresh_tokens table at most once per ``sync_interval`` seconds, reading
+    only the revocations made since the previous sync. Entries are dropped
+    as soon as the access token they refer to expires, so the set only
+    ever holds tokens that could still be presented.
+    """
+
+    def __init__(self, sync_interval: float):
+        self.sync_interval = sync_interval
+        # jti (16 raw bytes) -> expiration of the access token
+        self._revoked: Dict[bytes, datetime] = {}
+        self._cursor: Optional[datetime] = None
+        self._next_sync = 0.0
+
+    def __contains__(self, jti: str) -> bool:
+        key = _compact(jti)
+        if key is None:
+            return False
+        expires_at = self._revoked.get(key)
+        return expires_at is not None and expires_at > datetime.utcnow()
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        """
+        Mark an access token as revoked in this worker.
+
+        :param jti: id of the access token.
+        :param expires_at: expiration of the access token.
+        """
+        key = _compact(jti)
+        if key is not None:
+            self._revoked[key] = expires_at
+
+    def is_stale(self) -> bool:
+        """
+        Check whether the set should be synchronised with the database.
+
+        :return: True if the sync interval elapsed.
+        """
+        return time.monotonic() >= self._next_sync
+
+    async def sync(self, repository: RefreshTokenRepository) -> None:
+        """
+        Pull revocations made since the last sync and prune expired ones.
+
+        :param repository: repository used to read revocations.
+        """
+        # Move the deadline first so concurrent requests don't sync as well.
+        self._next_sync = time.monotonic() + self.sync_interval
+        now = datetime.utcnow()
+        since = self._cursor - SYNC_OVERLAP if self._cursor else None
+
+        for jti, expires_at in await repository.get_revoked_since(since, now):
+            self.add(jti, expires_at)
+
+        self._cursor = now
+        self._revoked = {
+            key: expires_at
+            for key, expires_at in self._revoked.items()
+            if expires_at > now
+        }
+
+
+def _compact(jti: str) -> Optional[bytes]:
+    try:
+        return bytes.fromhex(jti)
+    except ValueError:
+        return None
+
+
+def get_token_revocations(request: Request) -> TokenRevocationSet:
+    """
+    Get the revocation set of the current worker.
+
+    :param request: current request.
+    :return: revocation set.
+    """
+    return request.app.state.token_revocations
@@ -0,0 +1,515 @@
+import abc
+import inspect
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+import ujson
+
+F = TypeVar("F", bound=Callable[..., Any])
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# W3C trace context, version 00: traceparent of an incoming request.
+TRACEPARENT = re.compile(r"00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})")
+
+
+class Span:
+    """A timed operation of a trace, exported in the OTLP/JSON format."""
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        kind: int = KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """
+        Render the span as in an OTLP/JSON export request.
+
+        :return: span object.
+        """
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": STATUS_OK},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.error is not None:
+            span["status"] = {"code": STATUS_ERROR, "message": self.error}
+        return span
+
+
+class SpanExporter(abc.ABC):
+    """Sends finished spans somewhere."""
+
+    # Exporters doing I/O run in a background thread, the others inline.
+    blocking = True
+
+    @abc.abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        """
+        Send a batch of finished spans.
+
+        :param spans: the spans.
+        """
+
+    def shutdown(self) -> None:
+        """Release the resources of the exporter."""
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps the spans in a list, for tests."""
+
+    blocking = False
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]) -> None:
+        self.spans.extend(spans)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Appends every batch to a file, one OTLP/JSON export request per line.
+
+    Every line is a single write to a file opened in append mode, so the
+    workers sharing the file don't interleave their lines.
+    """
+
+    def __init__(self, path: Path, service_name: str) -> None:
+        self.path = path
+        self.service_name = service_name
+
+    def export(self, spans: List[Span]) -> None:
+        line = f"{export_request(spans, self.service_name)}\n".encode()
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+
+class OTLPSpanExporter(SpanExporter):
+    """Posts every batch to an OTLP/HTTP collector, JSON encoded."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5) -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]) -> None:
+        request = urllib.request.Request(  # noqa: S310
+            self.endpoint,
+            data=export_request(spans, self.service_name).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):  # noqa: S310
+            pass  # noqa: WPS420
+
+
+class Tracer:
+    """
+    Creates spans of the sampled requests and hands them to an exporter.
+
+    Sampling is decided once per trace, at its root: spans are only
+    created under a sampled root, anything else costs one context
+    variable lookup. Exporters doing I/O run in a background thread fed
+    by a bounded queue, spans are dropped when it's full.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        sample_rate: float = 1,
+        queue_size: int = 2048,
+        batch_size: int = 256,
+        flush_interval: float = 1,
+    ) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(max(queue_size, 1))
+        self._thread: Optional[threading.Thread] = None
+        if exporter.blocking:
+            self._thread = threading.Thread(
+                target=self._run,
+                name="span-exporter",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def sampled(self, traceparent: Optional[str] = None) -> Optional[Span]:
+        """
+        Decide whether a new trace is recorded.
+
+        :param traceparent: traceparent header of the request, its sampled
+            flag is followed when valid.
+        :return: remote parent span to continue, or an empty span starting
+            a new trace; None if the trace isn't sampled.
+        """
+        match = TRACEPARENT.fullmatch(traceparent or "")
+        if match is not None:
+            if not int(match.group(3), 16) & 1:
+                return None
+            parent = Span("", trace_id=match.group(1))
+            parent.span_id = match.group(2)
+            return parent
+        if random.random() >= self.sample_rate:  # noqa: S311
+            return None
+        root = Span("", trace_id=os.urandom(16).hex())
+        root.span_id = ""
+        return root
+
+    def finish(self, span: Span) -> None:
+        """
+        Hand a finished span to the exporter.
+
+        :param span: finished span.
+        """
+        if self._thread is None:
+            self.exporter.export([span])
+            return
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self, timeout: float = 5) -> None:
+        """
+        Export the queued spans and stop the exporter thread.
+
+        :param timeout: maximum seconds to wait for the export.
+        """
+        if self._thread is not None:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass  # noqa: WPS420
+            self._thread.join(timeout)
+        self.exporter.shutdown()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    span = self._queue.get(
+                        timeout=max(deadline - time.monotonic(), 0),
+                    )
+                except queue.Empty:
+                    break
+                if span is None:
+                    stopping = True
+                    break
+                batch.append(span)
+            if batch:
+                self._export(batch)
+
+    def _export(self, batch: List[Span]) -> None:
+        try:
+            self.exporter.export(batch)
+        except Exception:
+            logger.warning("Failed to export %d spans", len(batch), exc_info=True)
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Optional[Tracer]:
+    """
+    Get the tracer of the process.
+
+    :return: the tracer, None when tracing is off.
+    """
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> Optional[Tracer]:
+    """
+    Replace the tracer of the process, without stopping the previous one.
+
+    :param tracer: new tracer, None turns tracing off.
+    :return: the previous tracer.
+    """
+    global _tracer  # noqa: WPS420
+    previous, _tracer = _tracer, tracer
+    return previous
+
+
+def configure_tracing(
+    exporter: str,
+    sample_rate: float,
+    service_name: str = "cooking_forum_backend",
+    file_path: Optional[Path] = None,
+    otlp_endpoint: str = "",
+    queue_size: int = 2048,
+) -> Optional[Tracer]:
+    """
+    Set up the tracer of the process, in every worker after the fork.
+
+    :param exporter: "none", "memory", "file" or "otlp".
+    :param sample_rate: share of the requests traced, from 0 to 1.
+    :param service_name: service.name of the exported spans.
+    :param file_path: file of the "file" exporter.
+    :param otlp_endpoint: traces URL of the OTLP/HTTP collector.
+    :param queue_size: spans buffered for the exporter thread.
+    :return: the tracer, None when tracing is off.
+    """
+    span_exporter: SpanExporter
+    if exporter == "memory":
+        span_exporter = InMemorySpanExporter()
+    elif exporter == "file" and file_path is not None:
+        span_exporter = FileSpanExporter(file_path, service_name)
+    elif exporter == "otlp":
+        span_exporter = OTLPSpanExporter(otlp_endpoint, service_name)
+    else:
+        shutdown_tracing()
+        return None
+
+    previous = set_tracer(
+        Tracer(span_exporter, sample_rate=sample_rate, queue_size=queue_size),
+    )
+    if previous is not None:
+        previous.shutdown()
+    return _tracer
+
+
+def shutdown_tracing() -> None:
+    """Export the spans still queued and turn tracing off."""
+    previous = set_tracer(None)
+    if previous is not None:
+        previous.shutdown()
+
+
+def export_request(spans: List[Span], service_name: str) -> str:
+    """
+    Render spans as an OTLP/JSON ExportTraceServiceRequest.
+
+    :param spans: spans to export.
+    :param service_name: service.name resource attribute.
+    :return: JSON document.
+    """
+    return ujson.dumps(
+        {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes({"service.name": service_name}),
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "cooking_forum_backend"},
+                            "spans": [span.to_otlp() for span in spans],
+                        },
+                    ],
+                },
+            ],
+        },
+    )
+
+
+def begin_span(
+    name: str,
+    kind: int = KIND_INTERNAL,
+    attributes: Optional[Dict[str, Any]] = None,
+) -> Optional[Span]:
+    """
+    Open a span under the current one, closed by ``end_span``.
+
+    For callbacks that can't wrap a block of code, such as SQLAlchemy
+    events. The span doesn't become the current span.
+
+    :param name: name of the span.
+    :param kind: OTLP span kind.
+    :param attributes: attributes of the span.
+    :return: the span, None when the current trace isn't sampled.
+    """
+    parent = current_span.get()
+    if parent is None or _tracer is None:
+        return None
+    return Span(
+        name,
+        trace_id=parent.trace_id,
+        parent_id=parent.span_id or None,
+        kind=kind,
+        attributes=attributes,
+    )
+
+
+def end_span(span: Span, error: Optional[BaseException] = None) -> None:
+    """
+    Close a span opened by ``begin_span`` and export it.
+
+    :param span: span to close.
+    :param error: exception raised by the operation, if any.
+    """
+    span.end_ns = time.time_ns()
+    if error is not None:
+        span.error = repr(error)
+    if _tracer is not None:
+        _tracer.finish(span)
+
+
+@contextmanager
+def start_span(
+    name: str,
+    kind: int = KIND_INTERNAL,
+    attributes: Optional[Dict[str, Any]] = None,
+    parent: Optional[Span] = None,
+) -> Iterator[Optional[Span]]:
+    """
+    Record a block of code as a span of the current trace.
+
+    :param name: name of the span.
+    :param kind: OTLP span kind.
+    :param attributes: attributes of the span.
+    :param parent: parent span, defaults to the current span.
+    :yield: the span, None when the current trace isn't sampled.
+    """
+    token = None
+    if parent is not None:
+        token = current_span.set(parent)
+    span = begin_span(name, kind, attributes)
+    if token is not None:
+        current_span.reset(token)
+    if span is None:
+        yield None
+        return
+
+    token = current_span.set(span)
+    error: Optional[BaseException] = None
+    try:
+        yield span
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        current_span.reset(token)
+        end_span(span, error)
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """
+    Record every call of a function, or coroutine function, as a span.
+
+    :param name: name of the spans, defaults to the qualified name.
+    :return: decorator.
+    """
+
+    def decorator(func: F) -> F:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with start_span(span_name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if current_span.get() is None:
+                return func(*args, **kwargs)
+            with start_span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+def traced_methods(cls: T) -> T:
+    """
+    Record the calls of every public coroutine method of a class as spans.
+
+    :param cls: class to instrument, such as a repository.
+    :return: the class.
+    """
+    for attribute, method in list(vars(cls).items()):
+        if not attribute.startswith("_") and inspect.iscoroutinefunction(method):
+            setattr(cls, attribute, traced()(method))
+    return cls
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rendered = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        rendered.append({"key": key, "value": typed})
+    return rendered
@@ -0,0 +1,120 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from fastapi import Depends
+
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+
+UserKey = Union[int, str]
+
+
+class UserLoader:
+    """
+    Request-scoped loader of users, by id or by username.
+
+    Lookups issued in the same event loop iteration, such as the authors
+    of a page of posts resolved with ``asyncio.gather``, are sent as one
+    query. Results, missing users included, are kept for the rest of the
+    request, so the same user is never loaded twice.
+
+    FastAPI caches dependencies per request: every ``Depends(UserLoader)``
+    of one request gets the same loader.
+    """
+
+    def __init__(self, user_repository: UserRepository = Depends()):
+        self.user_repository = user_repository
+        # Queries sent by this loader
+        self.queries = 0
+        # Loaded or in-flight users, by id and by username
+        self._futures: Dict[UserKey, "asyncio.Future[Optional[UserModel]]"] = {}
+        # Keys waiting for the next batch
+        self._pending: List[UserKey] = []
+        self._fetches: Set["asyncio.Task[None]"] = set()
+        # The session can't run two queries at once.
+        self._lock = asyncio.Lock()
+
+    async def load(self, user_id: int) -> Optional[UserModel]:
+        """
+        Load a user by id.
+
+        :param user_id: id of the user.
+        :return: the user, None if it doesn't exist.
+        """
+        return await self._load(user_id)
+
+    async def load_by_username(self, username: str) -> Optional[UserModel]:
+        """
+        Load a user by username.
+
+        :param username: username of the user.
+        :return: the user, None if it doesn't exist.
+        """
+        return await self._load(username)
+
+    async def load_many(self, user_ids: Iterable[int]) -> List[Optional[UserModel]]:
+        """
+        Load users by id, in one query for those not loaded yet.
+
+        :param user_ids: ids of the users.
+        :return: the users in the same order, None for those missing.
+        """
+        users = await asyncio.gather(*[self._load(user_id) for user_id in user_ids])
+        return list(users)
+
+    async def _load(self, key: UserKey) -> Optional[UserModel]:
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            if not self._pending:
+                # Runs after the coroutines already scheduled in this
+                # iteration had a chance to enqueue their own lookups.
+                loop.call_soon(self._dispatch)
+            self._pending.append(key)
+        # A cancelled caller must not cancel the lookup shared with others.
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        batch, self._pending = self._pending, []
+        fetch = asyncio.ensure_future(self._fetch(batch))
+        self._fetches.add(fetch)
+        fetch.add_done_callback(self._fetches.discard)
+
+    async def _fetch(self, batch: List[UserKey]) -> None:
+        ids = [key for key in batch if isinstance(key, int)]
+        usernames = [key for key in batch if isinstance(key, str)]
+        try:
+            async with self._lock:
+                users = await self._query(ids, usernames)
+        except Exception as exc:
+            for key in batch:
+                # Forgotten, the next lookup of these keys tries again.
+                self._futures.pop(key).set_exception(exc)
+            return
+
+        for user in users:
+            self._resolve(user.id, user)
+            self._resolve(user.username, user)
+        for key in batch:
+            self._resolve(key, None)
+
+    def _resolve(self, key: UserKey, user: Optional[UserModel]) -> None:
+        future = self._futures.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._futures[key] = future
+        if not future.done():
+            future.set_result(user)
+
+    async def _query(self, ids: List[int], usernames: List[str]) -> List[UserModel]:
+        self.queries += 1
+        # A lone lookup keeps the cached single-row statements.
+        if len(ids) + len(usernames) > 1:
+            return await self.user_repository.get_by_ids_or_usernames(ids, usernames)
+        if ids:
+            user = await self.user_repository.get_by_id(ids[0])
+        else:
+            user = await self.user_repository.get_by_username(usernames[0])
+        return [user] if user is not None else []
@@ -1,5 +1,6 @@
 import enum
 from pathlib import Path
+from typing import List, Literal, Optional, Union
 from tempfile import gettempdir
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -29,36 +30,135 @@ class Settings(BaseSettings):
 
     host: str = "127.0.0.1"
     port: int = 8000
-    # quantity of workers for uvicorn
-    workers_count: int = 1
+    # quantity of workers for uvicorn, "auto" uses the available CPUs
+    workers_count: Union[int, Literal["auto"]] = 1
+    # Recycle a worker after max_requests (+ random jitter) requests, 0 disables
+    max_requests: int = 0
+    max_requests_jitter: int = 0
+    # Gracefully restart a worker above this resident memory, 0 disables
+    worker_max_rss_mb: int = 0
+    # Seconds before a silent worker is killed and restarted
+    worker_timeout: int = 30
+    # Seconds workers have to finish requests on restart or shutdown
+    graceful_timeout: int = 30
+    # Seconds to wait for requests on keep-alive connections
+    keepalive: int = 5
+    # Seconds given on shutdown to the requests in flight, while new ones
+    # get a 503, then as much to the background tasks: keep twice of it
+    # below graceful_timeout
+    shutdown_drain_seconds: float = 10
     # Enable uvicorn reloading
     reload: bool = False
+    # Build the app once in the gunicorn arbiter and fork workers from it
+    preload_app: bool = False
 
     # Current environment
     environment: str = "dev"
 
     log_level: LogLevel = LogLevel.INFO
+    # "json" writes one JSON object per line, "text" a line of text
+    log_format: Literal["json", "text"] = "json"
+    # Records buffered for the log writer thread, newer ones are dropped
+    # when it's full, so a slow stdout never blocks a worker
+    log_queue_size: int = 10000
+    # Share of the 2xx responses written in the access log, from 0 to 1,
+    # other statuses are always written
+    access_log_sample_rate: float = 1
+    # Header carrying the correlation id of a request, taken from the
+    # request when valid, generated otherwise, and sent in the response
+    request_id_header: str = "X-Request-ID"
+    # Spans of the sampled requests go to "file" (one OTLP/JSON export
+    # request per line), "otlp" (an OTLP/HTTP collector) or "memory"
+    tracing_exporter: Literal["none", "memory", "file", "otlp"] = "none"
+    # Share of the requests traced, a traceparent header's sampled flag wins
+    tracing_sample_rate: float = 0.1
+    tracing_file: Path = TEMP_DIR / "cooking_forum_backend_spans.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    # Spans buffered for the exporter thread, newer ones are dropped
+    tracing_queue_size: int = 2048
+    # Admin endpoints, such as GET /api/profile, take this token in an
+    # X-Admin-Token header. They're disabled while it's unset.
+    admin_token: Optional[str] = None
+    # Profiles of the workers signalled with SIGURG are written there, with
+    # these defaults when no profile request came with the signal
+    profiler_dir: Path = TEMP_DIR / "cooking_forum_backend_profiles"
+    profiler_signal_seconds: float = 30
+    profiler_interval_ms: float = 10
+    # Frames kept per allocation once POST /api/memory/snapshot starts
+    # tracemalloc, more frames cost more memory while it's tracing
+    tracemalloc_frames: int = 5
+    # Send the DB/crypto/serialization breakdown in a Server-Timing header
+    server_timing_header: bool = True
+    # Dynamic responses of at least compression_min_size bytes, with a
+    # content type starting with one of compression_content_types, are
+    # compressed with brotli or gzip. Static files are precompressed.
+    compression_min_size: int = 1024
+    compression_content_types: List[str] = ["application/json", "text/"]
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    # Serve /api/openapi.json, /api/docs and /api/redoc, built on startup
+    docs_enabled: bool = True
+    docs_cache_control: str = "public, no-cache"
+    # Cache-Control of static files requested with a versioned URL
+    static_cache_control: str = "public, max-age=31536000, immutable"
+    # Cache-Control of GET /api/users/me and GET /api/users/, both send ETags
+    users_me_cache_control: str = "private, no-cache"
+    users_cache_control: str = "public, max-age=5"
+    # Per-worker cache of public GET responses, 0 seconds disables it
+    response_cache_ttl_seconds: float = 5
+    response_cache_max_entries: int = 1024
+    # Completions of prefixes up to this length are kept in the response
+    # cache, the shortest prefixes are the most requested
+    autocomplete_cache_max_prefix_length: int = 3
+    # Maximum number of ids plus usernames looked up by POST /api/users/batch
+    users_batch_max_size: int = 100
 
     jwt_secret: str = "fake_secret_abcd1234"
+    # HS256 uses jwt_secret, EdDSA and ES256 use the keys in jwt_keys_dir
     jwt_algorithm: str = "HS256"
-    jwt_expires_minutes: int = 15
+    # Directory with one <kid>.pem key per file, used by EdDSA and ES256
+    jwt_keys_dir: Optional[Path] = None
+    # kid of the signing key, defaults to the last private key by name
+    jwt_active_kid: Optional[str] = None
+    jwt_expires_minutes: int = 5
+    # Lifetime of rotating refresh tokens
+    jwt_refresh_expires_days: int = 30
+    # How often each worker pulls newly revoked tokens from the database
+    jwt_revocation_sync_seconds: float = 5
 
     # Variables for the database
+    # "sqlite" needs no server, it runs in memory unless db_file is set
+    db_driver: Literal["postgresql", "sqlite"] = "postgresql"
+    db_file: Optional[Path] = None
     db_host: str = "localhost"
     db_port: int = 5432
     db_user: str = "cooking_forum_backend"
     db_pass: str = "cooking_forum_backend"
     db_base: str = "cooking_forum_backend"
     db_echo: bool = False
+    # Connections kept open by each worker, and extra ones opened under load
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    # Connections opened and prepared on worker startup, at most db_pool_size
+    db_warmup_connections: int = 0
+    # Prepared statements kept by each PostgreSQL connection, 0 prepares
+    # statements again on every execution
+    db_prepared_statement_cache_size: int = 100
+    # Connect through a transaction-mode pooler such as PgBouncer: no
+    # connection pool, no prepared statement cache, no warm-up
+    db_pooler_mode: bool = False
 
     @property
-    def db_url(self) -> URL:
+    def db_url(self) -> str:
         """
         Assemble database URL from settings.
 
         :return: database URL.
         """
-        return URL.build(
+        if self.db_driver == "sqlite":
+            return f"sqlite+aiosqlite:///{self.db_file or ':memory:'}"
+
+        url = URL.build(
             scheme="postgresql+asyncpg",
             host=self.db_host,
             port=self.db_port,
@@ -66,6 +166,7 @@ class Settings(BaseSettings):
             password=self.db_pass,
             path=f"/{self.db_base}",
         )
+        return str(url)
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,225 @@
+"""
+Stand-in for a transaction-mode pooler, such as PgBouncer.
+
+It speaks just enough of the PostgreSQL protocol to hand every client
+transaction to the next idle server connection: consecutive transactions
+of one client land on different backends, as behind a busy pooler.
+"""
+import asyncio
+import hashlib
+import struct
+from typing import List, Optional, Tuple
+
+SSL_REQUEST = 80877103
+GSSENC_REQUEST = 80877104
+CANCEL_REQUEST = 80877102
+PROTOCOL_VERSION = 196608
+
+AUTH_OK = 0
+AUTH_CLEARTEXT = 3
+AUTH_MD5 = 5
+
+# Client messages answered by a ReadyForQuery.
+SYNCING_MESSAGES = frozenset(b"QSF")
+
+
+def _message(msg_type: bytes, payload: bytes) -> bytes:
+    return msg_type + struct.pack("!i", len(payload) + 4) + payload
+
+
+async def _read_message(reader: asyncio.StreamReader) -> Tuple[bytes, bytes]:
+    header = await reader.readexactly(5)
+    length = struct.unpack("!i", header[1:])[0]
+    return header[:1], await reader.readexactly(length - 4)
+
+
+class _ServerConnection:
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        parameters: List[bytes],
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.parameters = parameters
+
+
+class TransactionPooler:
+    """Transaction pooler over a few server connections, md5 auth only."""
+
+    def __init__(  # noqa: WPS211
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        database: str,
+        server_connections: int = 2,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.database = database
+        self.server_connections = server_connections
+        self.listen_port = 0
+        self._idle: "asyncio.Queue[_ServerConnection]" = asyncio.Queue()
+        self._opened = 0
+        self._parameters: List[bytes] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: "set[asyncio.StreamWriter]" = set()
+
+    async def start(self) -> None:
+        """Listen on a free local port, ``listen_port``."""
+        self._server = await asyncio.start_server(
+            self._serve_client,
+            "127.0.0.1",
+            0,
+        )
+        self.listen_port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """Stop listening and close every connection."""
+        if self._server is not None:
+            self._server.close()
+        for client in list(self._clients):
+            client.close()
+        if self._server is not None:
+            await self._server.wait_closed()
+        while not self._idle.empty():
+            server = self._idle.get_nowait()
+            server.writer.close()
+
+    async def _connect_server(self) -> _ServerConnection:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        startup = struct.pack("!i", PROTOCOL_VERSION) + b"".join(
+            f"{key}\0{value}\0".encode()
+            for key, value in (("user", self.user), ("database", self.database))
+        ) + b"\0"
+        writer.write(struct.pack("!i", len(startup) + 4) + startup)
+
+        parameters = []
+        while True:
+            msg_type, payload = await _read_message(reader)
+            if msg_type == b"R":
+                await self._authenticate(writer, payload)
+            elif msg_type == b"S":
+                parameters.append(_message(msg_type, payload))
+            elif msg_type == b"E":
+                raise ConnectionError(payload.decode(errors="replace"))
+            elif msg_type == b"Z":
+                return _ServerConnection(reader, writer, parameters)
+
+    async def _authenticate(self, writer: asyncio.StreamWriter, payload: bytes) -> None:
+        code = struct.unpack("!i", payload[:4])[0]
+        if code == AUTH_OK:
+            return
+        if code == AUTH_CLEARTEXT:
+            password = self.password
+        elif code == AUTH_MD5:
+            inner = hashlib.md5((self.password + self.user).encode()).hexdigest()
+            outer = hashlib.md5(inner.encode() + payload[4:8]).hexdigest()
+            password = f"md5{outer}"
+        else:
+            raise ConnectionError(f"Unsupported authentication method {code}")
+        writer.write(_message(b"p", password.encode() + b"\0"))
+        await writer.drain()
+
+    async def _acquire(self) -> _ServerConnection:
+        if self._idle.empty() and self._opened < self.server_connections:
+            self._opened += 1
+            try:
+                server = await self._connect_server()
+            except BaseException:
+                self._opened -= 1
+                raise
+            self._parameters = server.parameters
+            return server
+        return await self._idle.get()
+
+    async def _client_startup(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> bool:
+        while True:
+            length = struct.unpack("!i", await reader.readexactly(4))[0]
+            packet = await reader.readexactly(length - 4)
+            code = struct.unpack("!i", packet[:4])[0]
+            if code in {SSL_REQUEST, GSSENC_REQUEST}:
+                writer.write(b"N")
+                continue
+            if code == CANCEL_REQUEST:
+                return False
+            break
+
+        if not self._parameters:
+            self._idle.put_nowait(await self._acquire())
+        writer.write(_message(b"R", struct.pack("!i", AUTH_OK)))
+        writer.write(b"".join(self._parameters))
+        writer.write(_message(b"K", struct.pack("!ii", 0, 0)))
+        writer.write(_message(b"Z", b"I"))
+        await writer.drain()
+        return True
+
+    async def _serve_client(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self._clients.add(writer)
+        session = _ClientSession(self, writer)
+        try:
+            if await self._client_startup(reader, writer):
+                await session.run(reader)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # noqa: WPS420
+        finally:
+            session.discard()
+            writer.close()
+            self._clients.discard(writer)
+
+
+class _ClientSession:
+    def __init__(self, pooler: TransactionPooler, writer: asyncio.StreamWriter) -> None:
+        self.pooler = pooler
+        self.writer = writer
+        self.server: Optional[_ServerConnection] = None
+        self.relay: Optional["asyncio.Task[None]"] = None
+        self.pending = 0
+
+    async def run(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            msg_type, payload = await _read_message(reader)
+            if msg_type == b"X":
+                return
+            if self.server is None:
+                self.server = await self.pooler._acquire()  # noqa: WPS437
+                self.relay = asyncio.create_task(self._relay(self.server))
+            if msg_type[0] in SYNCING_MESSAGES:
+                self.pending += 1
+            self.server.writer.write(_message(msg_type, payload))
+            await self.server.writer.drain()
+
+    async def _relay(self, server: _ServerConnection) -> None:
+        while True:
+            msg_type, payload = await _read_message(server.reader)
+            self.writer.write(_message(msg_type, payload))
+            await self.writer.drain()
+            if msg_type == b"Z":
+                self.pending -= 1
+                if self.pending == 0 and payload == b"I":
+                    # Transaction over, the connection goes to the next client.
+                    self.server = None
+                    self.pooler._idle.put_nowait(server)  # noqa: WPS437
+                    return
+
+    def discard(self) -> None:
+        if self.relay is not None:
+            self.relay.cancel()
+        if self.server is not None:
+            # Left in the middle of a transaction, it can't be reused.
+            self.server.writer.close()
+            self.pooler._opened -= 1  # noqa: WPS437
+            self.server = None
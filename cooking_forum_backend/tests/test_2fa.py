@@ -1,13 +1,19 @@
+import asyncio
 import uuid
+from datetime import datetime, timedelta
 
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from starlette import status
 from cooking_forum_backend.db.models.otp_model import OTPModel
-from cooking_forum_backend.db.repositories.otp_repository import OTPRepository
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.db.repositories.otp_repository import (
+    OTPConsumeResult,
+    OTPRepository,
+)
 
 from cooking_forum_backend.db.repositories.user_repository import UserRepository
 from cooking_forum_backend.services.crypto import CryptoService
@@ -240,4 +246,69 @@ async def test_otp_usable_only_once(
     assert verify_response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+@pytest.mark.anyio
+async def test_otp_consume_reasons(dbsession: AsyncSession) -> None:
+    """Tests consume accepts a matching OTP once, and says why it refuses."""
+    user_repository = UserRepository(dbsession, CryptoService())
+    otp_repository = OTPRepository(dbsession)
+    users = [
+        await user_repository.create_user_model(
+            username=name,
+            email=name + "@email.com",
+            password=uuid.uuid4().hex,
+            two_fa_enabled=True,
+        )
+        for name in (uuid.uuid4().hex, uuid.uuid4().hex)
+    ]
+    user, other_user = users
+    otp = await otp_repository.create_otp(
+        user_id=user.id,
+        value=123456,
+        expires_at=datetime.utcnow() + timedelta(minutes=15),
+    )
+    expired = await otp_repository.create_otp(
+        user_id=user.id,
+        value=654321,
+        expires_at=datetime.utcnow() - timedelta(seconds=1),
+    )
+
+    consume = otp_repository.consume
+    assert await consume(user.id, otp.id, 111111) is OTPConsumeResult.INVALID_VALUE
+    assert await consume(user.id, otp.id + 1000, 123456) is OTPConsumeResult.NOT_FOUND
+    assert await consume(other_user.id, otp.id, 123456) is OTPConsumeResult.NOT_FOUND
+    assert await consume(user.id, expired.id, 654321) is OTPConsumeResult.EXPIRED
+    assert await consume(user.id, otp.id, 123456) is OTPConsumeResult.CONSUMED
+    assert await consume(user.id, otp.id, 123456) is OTPConsumeResult.USED
 
+
+@pytest.mark.anyio
+async def test_otp_consume_concurrent(_engine: AsyncEngine) -> None:
+    """Tests two concurrent checks of the same OTP can't both succeed."""
+    name = uuid.uuid4().hex
+    async with AsyncSession(_engine, expire_on_commit=False) as session:
+        user = await UserRepository(session, CryptoService()).create_user_model(
+            username=name,
+            email=name + "@email.com",
+            password=uuid.uuid4().hex,
+            two_fa_enabled=True,
+        )
+        otp = await OTPRepository(session).create_otp(
+            user_id=user.id,
+            value=123456,
+            expires_at=datetime.utcnow() + timedelta(minutes=15),
+        )
+
+    async def check() -> OTPConsumeResult:  # noqa: WPS430
+        async with AsyncSession(_engine) as session:  # noqa: WPS442
+            return await OTPRepository(session).consume(user.id, otp.id, 123456)
+
+    try:
+        results = await asyncio.gather(check(), check())
+        assert sorted(results, key=lambda result: result.value) == [
+            OTPConsumeResult.CONSUMED,
+            OTPConsumeResult.USED,
+        ]
+    finally:
+        async with _engine.begin() as conn:
+            await conn.execute(delete(OTPModel).where(OTPModel.user_id == user.id))
+            await conn.execute(delete(UserModel).where(UserModel.id == user.id))
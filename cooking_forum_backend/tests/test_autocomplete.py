@@ -0,0 +1,95 @@
+import uuid
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.crypto import CryptoService
+from cooking_forum_backend.services.response_cache import get_response_cache
+
+
+async def create_users(dbsession: AsyncSession, usernames: List[str]) -> None:
+    for username in usernames:
+        dbsession.add(
+            UserModel(
+                username=username,
+                email=username + "@email.com",
+                password="!",
+                two_fa_enabled=False,
+            ),
+        )
+    await dbsession.commit()
+
+
+@pytest.mark.anyio
+async def test_autocomplete(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests completions match the prefix, ignoring case, shortest first."""
+    prefix = uuid.uuid4().hex[:8]
+    await create_users(
+        dbsession,
+        [f"{prefix}_longer", prefix.upper(), f"{prefix}x", f"z{prefix}"],
+    )
+
+    response = await client.get(
+        fastapi_app.url_path_for("autocomplete_users"),
+        params={"prefix": prefix, "limit": 5},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [user["username"] for user in response.json()] == [
+        prefix.upper(),
+        f"{prefix}x",
+        f"{prefix}_longer",
+    ]
+
+
+@pytest.mark.anyio
+async def test_autocomplete_escapes_wildcards(dbsession: AsyncSession) -> None:
+    """Tests % and _ in the prefix are matched literally."""
+    prefix = uuid.uuid4().hex[:8]
+    await create_users(dbsession, [f"{prefix}_a", f"{prefix}ba", f"{prefix}%c"])
+    repository = UserRepository(dbsession, CryptoService())
+
+    assert [name for _, name in await repository.autocomplete(f"{prefix}_", 5)] == [
+        f"{prefix}_a",
+    ]
+    assert [name for _, name in await repository.autocomplete(f"{prefix}%", 5)] == [
+        f"{prefix}%c",
+    ]
+
+
+@pytest.mark.anyio
+async def test_short_prefixes_cached_until_registration(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests completions of short prefixes are cached until a user registers."""
+    url = fastapi_app.url_path_for("autocomplete_users")
+    params = {"prefix": "zq~", "limit": 20}
+    assert (await client.get(url, params=params)).json() == []
+    assert len(get_response_cache("user_autocomplete")) == 1
+
+    await create_users(dbsession, ["zq~direct"])
+    assert (await client.get(url, params=params)).json() == []
+
+    await UserRepository(dbsession, CryptoService()).create_user_model(
+        username="zq~registered",
+        email="zq@email.com",
+        password="zq",
+        two_fa_enabled=False,
+    )
+    response = await client.get(url, params=params)
+    assert [user["username"] for user in response.json()] == [
+        "zq~direct",
+        "zq~registered",
+    ]
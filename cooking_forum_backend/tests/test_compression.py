@@ -0,0 +1,123 @@
+import gzip
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+import ujson
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Mount
+
+from cooking_forum_backend.web.middleware.compression import (
+    CompressionMiddleware,
+    accepted_encodings,
+)
+from cooking_forum_backend.web.static_files import PrecompressedStaticFiles, precompress
+
+
+def test_accepted_encodings() -> None:
+    """Tests Accept-Encoding negotiation."""
+    assert accepted_encodings("gzip, deflate, br") == ["br", "gzip"]
+    assert accepted_encodings("gzip;q=1.0, br;q=0.5") == ["gzip", "br"]
+    assert accepted_encodings("br;q=0, gzip") == ["gzip"]
+    assert accepted_encodings("*") == ["br", "gzip"]
+    assert accepted_encodings("identity") == []
+    assert accepted_encodings("") == []
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+async def test_large_json_compressed(encoding: str) -> None:
+    """Tests large JSON responses are compressed with the accepted encoding."""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    rows = [{"id": number, "username": f"user{number}"} for number in range(100)]
+
+    @app.get("/rows")
+    async def get_rows() -> List[Dict[str, Any]]:  # noqa: WPS430
+        return rows
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:  # noqa: WPS430
+        chunks = (ujson.dumps(row) + "\n" for row in rows)
+        return StreamingResponse(chunks, media_type="text/plain")
+
+    async with AsyncClient(app=app, base_url="http://test") as app_client:
+        response = await app_client.get(
+            "/rows",
+            headers={"Accept-Encoding": encoding},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["Content-Encoding"] == encoding
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert int(response.headers["Content-Length"]) < len(response.content)
+        assert response.json() == rows
+
+        response = await app_client.get(
+            "/stream",
+            headers={"Accept-Encoding": encoding},
+        )
+        assert response.headers["Content-Encoding"] == encoding
+        assert "Content-Length" not in response.headers
+        assert response.text.splitlines() == [ujson.dumps(row) for row in rows]
+
+
+@pytest.mark.anyio
+async def test_small_response_not_compressed(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """Tests responses under the size threshold are sent as they are."""
+    response = await client.get(
+        fastapi_app.url_path_for("health_check"),
+        headers={"Accept-Encoding": "br, gzip"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "Content-Encoding" not in response.headers
+
+
+@pytest.mark.anyio
+async def test_precompressed_static_files(tmp_path: Path) -> None:
+    """Tests static files are sent as their precompressed siblings."""
+    content = b"console.log('hello');\n" * 100
+    (tmp_path / "app.js").write_bytes(content)
+    (tmp_path / "image.png").write_bytes(b"\x89PNG")
+    assert precompress(tmp_path) == 2
+    assert precompress(tmp_path) == 0
+    assert not (tmp_path / "image.png.gz").exists()
+
+    app = Starlette(
+        routes=[
+            Mount(
+                "/static",
+                PrecompressedStaticFiles(
+                    directory=tmp_path,
+                    versioned_cache_control="immutable",
+                ),
+            ),
+        ],
+    )
+    async with AsyncClient(app=app, base_url="http://test") as static_client:
+        response = await static_client.get(
+            "/static/app.js?v=1",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Cache-Control"] == "immutable"
+        assert "javascript" in response.headers["Content-Type"]
+        assert response.content == content
+        assert int(response.headers["Content-Length"]) == len(
+            gzip.compress(content, compresslevel=9, mtime=0),
+        )
+
+        response = await static_client.get(
+            "/static/app.js",
+            headers={"Accept-Encoding": "identity"},
+        )
+        assert "Content-Encoding" not in response.headers
+        assert "Cache-Control" not in response.headers
+        assert response.content == content
@@ -0,0 +1,85 @@
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.crypto import CryptoService
+from cooking_forum_backend.settings import settings
+from cooking_forum_backend.web.conditional import etag_matches
+
+
+async def create_user(dbsession: AsyncSession) -> str:
+    name = uuid.uuid4().hex
+    await UserRepository(dbsession, CryptoService()).create_user_model(
+        username=name,
+        email=name + "@email.com",
+        password=name,
+        two_fa_enabled=False,
+    )
+    return name
+
+
+def test_etag_matches() -> None:
+    """Tests the weak comparison of If-None-Match."""
+    assert etag_matches('W/"abc"', 'W/"abc"')
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches('W/"x", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('W/"x"', 'W/"abc"')
+    assert not etag_matches(None, 'W/"abc"')
+
+
+@pytest.mark.anyio
+async def test_users_me_not_modified(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests /users/me answers 304 to a matching If-None-Match."""
+    name = await create_user(dbsession)
+    token_response = await client.post(
+        fastapi_app.url_path_for("login"),
+        data={"username": name, "password": name},
+    )
+    headers = {"Authorization": "Bearer " + token_response.json()["access_token"]}
+    url = fastapi_app.url_path_for("me")
+
+    response = await client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Cache-Control"] == settings.users_me_cache_control
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = await client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+@pytest.mark.anyio
+async def test_users_etag_changes_with_users(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests the users page ETag changes when a user joins the page."""
+    await create_user(dbsession)
+    url = fastapi_app.url_path_for("get_users")
+
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Cache-Control"] == settings.users_cache_control
+    etag = response.headers["ETag"]
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    await create_user(dbsession)
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == 2
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from cooking_forum_backend.db.bulk import bulk_insert
+from cooking_forum_backend.db.engine import create_db_engine
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.settings import Settings
+
+
+def test_sqlite_url() -> None:
+    """Tests the SQLite URLs, in memory and on file."""
+    assert Settings(db_driver="sqlite").db_url == "sqlite+aiosqlite:///:memory:"
+    assert (
+        Settings(db_driver="sqlite", db_file="/tmp/forum.db").db_url
+        == "sqlite+aiosqlite:////tmp/forum.db"
+    )
+
+
+@pytest.mark.anyio
+async def test_sqlite_in_memory_is_shared() -> None:
+    """Tests every connection of an in-memory engine sees the same database."""
+    engine = create_db_engine("sqlite+aiosqlite://", pool_size=5)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE shared (id INTEGER)"))
+        async with engine.connect() as conn:
+            assert await conn.scalar(text("SELECT count(*) FROM shared")) == 0
+            foreign_keys = await conn.scalar(text("PRAGMA foreign_keys"))
+            assert foreign_keys == 1
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_bulk_insert(_engine: AsyncEngine) -> None:
+    """Tests rows are committed by bulk_insert on the configured driver."""
+    rows = [
+        {
+            "username": f"bulk_{number}",
+            "email": f"bulk_{number}@example.com",
+            "password": "hash",
+            "two_fa_enabled": False,
+            "created_at": datetime.utcnow(),
+        }
+        for number in range(50)
+    ]
+    try:
+        await bulk_insert(_engine, UserModel.__table__, rows)
+
+        async with _engine.connect() as conn:
+            inserted = await conn.scalar(
+                select(func.count())
+                .select_from(UserModel)
+                .where(UserModel.username.like("bulk_%")),
+            )
+        assert inserted == len(rows)
+    finally:
+        async with _engine.begin() as conn:
+            await conn.execute(
+                delete(UserModel).where(UserModel.username.like("bulk_%")),
+            )
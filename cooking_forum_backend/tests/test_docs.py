@@ -0,0 +1,44 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+
+@pytest.mark.anyio
+async def test_openapi_prebuilt(fastapi_app: FastAPI, client: AsyncClient) -> None:
+    """Tests the OpenAPI document is sent precompressed, with an ETag."""
+    url = fastapi_app.url_path_for("openapi")
+
+    response = await client.get(url, headers={"Accept-Encoding": "br"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.json()["paths"]
+    etag = response.headers["ETag"]
+
+    response = await client.get(
+        url,
+        headers={"Accept-Encoding": "identity", "If-None-Match": etag},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = await client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["ETag"] == etag
+    assert response.json() == fastapi_app.openapi()
+
+
+@pytest.mark.anyio
+async def test_docs_pages_built_once(fastapi_app: FastAPI, client: AsyncClient) -> None:
+    """Tests the docs pages are rendered once and link versioned bundles."""
+    url = fastapi_app.url_path_for("swagger_ui_html")
+
+    first = await client.get(url)
+    second = await client.get(url)
+
+    assert first.status_code == status.HTTP_200_OK
+    assert first.headers["Content-Type"].startswith("text/html")
+    assert "/static/docs/swagger-ui-bundle.js?v=" in first.text
+    assert fastapi_app.url_path_for("openapi") in first.text
+    assert first.headers["ETag"] == second.headers["ETag"]
+    pages = fastapi_app.state.docs
+    assert pages.get("swagger") is pages.get("swagger")
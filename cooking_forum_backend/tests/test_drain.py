@@ -0,0 +1,95 @@
+import asyncio
+import signal
+import time
+from typing import Callable
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+from uvicorn import Config
+
+from cooking_forum_backend.gunicorn_runner import DrainingServer
+from cooking_forum_backend.services.background import BackgroundTaskGroup
+from cooking_forum_backend.web.middleware.drain import InFlightTracker
+
+
+async def _until(condition: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.anyio
+async def test_server_drains_before_closing(
+    fastapi_app: FastAPI,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests a stopping server answers 503 until its requests complete."""
+    release = asyncio.Event()
+
+    @fastapi_app.get("/slow")
+    async def slow() -> None:  # noqa: WPS430
+        await release.wait()
+
+    config = Config(
+        fastapi_app,
+        host="127.0.0.1",
+        port=0,
+        lifespan="off",
+        log_level="error",
+    )
+    server = DrainingServer(config)
+    # The test process keeps its own SIGINT/SIGTERM handlers.
+    monkeypatch.setattr(server, "install_signal_handlers", lambda: None)
+    serving = asyncio.create_task(server.serve())
+    await _until(lambda: server.started)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    in_flight = fastapi_app.state.in_flight
+
+    async with AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        slow_request = asyncio.create_task(client.get("/slow"))
+        await _until(lambda: in_flight.count == 1)
+
+        server.handle_exit(signal.SIGTERM, None)
+        await _until(lambda: in_flight.draining)
+        response = await client.get(fastapi_app.url_path_for("health_check"))
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["Connection"] == "close"
+        assert not serving.done()
+
+        release.set()
+        response = await slow_request
+        assert response.status_code == status.HTTP_200_OK
+
+    await asyncio.wait_for(serving, timeout=5)
+    assert in_flight.count == 0
+
+
+@pytest.mark.anyio
+async def test_wait_idle() -> None:
+    """Tests draining waits for requests in flight, up to the deadline."""
+    tracker = InFlightTracker()
+    tracker.enter()
+
+    assert not await tracker.wait_idle(timeout=0.01)
+
+    asyncio.get_running_loop().call_later(0.01, tracker.exit)
+    assert await tracker.wait_idle(timeout=1)
+
+
+@pytest.mark.anyio
+async def test_background_tasks_shutdown() -> None:
+    """Tests running tasks complete and overdue ones are cancelled."""
+    background_tasks = BackgroundTaskGroup()
+    quick = background_tasks.spawn(asyncio.sleep(0.01))
+    assert len(background_tasks) == 1
+
+    await background_tasks.shutdown(timeout=1)
+    assert quick.done() and not quick.cancelled()
+    assert len(background_tasks) == 0
+
+    slow = background_tasks.spawn(asyncio.sleep(10))
+    await background_tasks.shutdown(timeout=0.01)
+    assert slow.cancelled()
@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+
+from cooking_forum_backend import gunicorn_runner
+from cooking_forum_backend.gunicorn_runner import (
+    GunicornApplication,
+    resolve_workers_count,
+)
+from cooking_forum_backend.services import system_resources
+
+APP_FACTORY = "cooking_forum_backend.web.application:get_app"
+
+
+def test_load_returns_factory() -> None:
+    """Tests workers build the application themselves by default."""
+    application = GunicornApplication(APP_FACTORY, host="127.0.0.1", port=0, workers=1)
+
+    assert application.cfg.worker_class_str.endswith(".UvicornWorker")
+    assert isinstance(application.load()(), FastAPI)
+
+
+def test_load_preloaded_app() -> None:
+    """Tests the application is built once in the arbiter with preload_app."""
+    application = GunicornApplication(
+        APP_FACTORY,
+        host="127.0.0.1",
+        port=0,
+        workers=1,
+        preload_app=True,
+    )
+
+    assert application.cfg.preload_app
+    assert application.cfg.worker_class_str.endswith(".PreloadedUvicornWorker")
+    assert isinstance(application.load(), FastAPI)
+
+
+def test_resolve_workers_count(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests "auto" workers follow the CPU and memory limits."""
+    monkeypatch.setattr(gunicorn_runner, "available_cpus", lambda: 8)
+    monkeypatch.setattr(gunicorn_runner, "cgroup_memory_limit", lambda: 2 * 2**30)
+
+    assert resolve_workers_count(3) == 3
+    assert resolve_workers_count("auto") == 8
+    assert resolve_workers_count("auto", worker_max_rss_mb=512) == 4
+    assert resolve_workers_count("auto", worker_max_rss_mb=4096) == 1
+
+
+def test_cgroup_limits(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Tests cgroup v2 and v1 CPU and memory limits are parsed."""
+    monkeypatch.setattr(system_resources, "CGROUP_ROOT", tmp_path)
+    assert system_resources.cgroup_cpu_quota() is None
+    assert system_resources.cgroup_memory_limit() is None
+
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("150000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert system_resources.cgroup_cpu_quota() == 1.5
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    (tmp_path / "memory.max").write_text("max\n")
+    assert system_resources.cgroup_cpu_quota() is None
+    assert system_resources.cgroup_memory_limit() is None
+
+    (tmp_path / "cpu.max").write_text("250000 100000\n")
+    (tmp_path / "memory.max").write_text("1073741824\n")
+    assert system_resources.cgroup_cpu_quota() == 2.5
+    assert system_resources.cgroup_memory_limit() == 2**30
+    assert 1 <= system_resources.available_cpus() <= 3
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from fastapi import FastAPI
+from httpx import AsyncClient
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
+from starlette import status
+
+from cooking_forum_backend.services.jwt_backends import (
+    AsymmetricBackend,
+    HS256Backend,
+)
+
+
+def _claims(minutes: int = 5) -> dict:
+    return {"sub": "user", "exp": datetime.utcnow() + timedelta(minutes=minutes)}
+
+
+def test_hs256_compatible_with_jose() -> None:
+    """Tests HS256 tokens are interchangeable with python-jose ones."""
+    backend = HS256Backend("secret")
+
+    token = backend.encode(_claims())
+    assert jwt.decode(token, "secret", algorithms=["HS256"])["sub"] == "user"
+
+    jose_token = jwt.encode(_claims(), "secret", algorithm="HS256")
+    assert backend.decode(jose_token)["sub"] == "user"
+
+
+def test_hs256_rejects_invalid_tokens() -> None:
+    """Tests tampered, foreign and expired tokens are rejected."""
+    backend = HS256Backend("secret")
+    token = backend.encode(_claims())
+
+    with pytest.raises(JWTError):
+        backend.decode(token[:-2] + "xx")
+    with pytest.raises(JWTError):
+        HS256Backend("other_secret").decode(token)
+    with pytest.raises(JWTError):
+        backend.decode("not.a-token")
+    with pytest.raises(ExpiredSignatureError):
+        backend.decode(backend.encode(_claims(minutes=-1)))
+
+
+def test_eddsa_key_rotation() -> None:
+    """Tests tokens signed with a retired key still verify."""
+    old_key = ed25519.Ed25519PrivateKey.generate()
+    new_key = ed25519.Ed25519PrivateKey.generate()
+
+    old_backend = AsymmetricBackend("EdDSA", {"2026-01": old_key}, "2026-01")
+    old_token = old_backend.encode(_claims())
+
+    backend = AsymmetricBackend(
+        "EdDSA",
+        {"2026-10": new_key},
+        "2026-10",
+        public_keys={"2026-01": old_key.public_key()},
+    )
+    assert jwt.get_unverified_header(backend.encode(_claims()))["kid"] == "2026-10"
+    assert backend.decode(old_token)["sub"] == "user"
+    assert {key["kid"] for key in backend.jwks()["keys"]} == {"2026-01", "2026-10"}
+
+    with pytest.raises(JWTError):
+        AsymmetricBackend("EdDSA", {"2026-10": new_key}, "2026-10").decode(old_token)
+
+
+def test_es256_verifiable_from_jwks() -> None:
+    """Tests other services can verify ES256 tokens with the published JWKS."""
+    backend = AsymmetricBackend(
+        "ES256",
+        {"key-1": ec.generate_private_key(ec.SECP256R1())},
+        "key-1",
+    )
+    token = backend.encode(_claims())
+
+    assert backend.decode(token)["sub"] == "user"
+    [public_jwk] = backend.jwks()["keys"]
+    assert jwt.decode(token, public_jwk, algorithms=["ES256"])["sub"] == "user"
+
+
+def test_key_must_match_algorithm() -> None:
+    """Tests keys of another type or curve are refused when the backend is built."""
+    p256_key = ec.generate_private_key(ec.SECP256R1())
+    ed25519_key = ed25519.Ed25519PrivateKey.generate()
+
+    with pytest.raises(ValueError, match="key-1"):
+        AsymmetricBackend("EdDSA", {"key-1": p256_key}, "key-1")
+    with pytest.raises(ValueError, match="key-1"):
+        AsymmetricBackend("ES256", {"key-1": ed25519_key}, "key-1")
+    with pytest.raises(ValueError, match="key-1"):
+        AsymmetricBackend(
+            "ES256",
+            {"key-1": ec.generate_private_key(ec.SECP384R1())},
+            "key-1",
+        )
+    with pytest.raises(ValueError, match="old"):
+        AsymmetricBackend(
+            "ES256",
+            {"key-1": p256_key},
+            "key-1",
+            public_keys={"old": ed25519_key.public_key()},
+        )
+
+
+@pytest.mark.anyio
+async def test_jwks_endpoint(client: AsyncClient, fastapi_app: FastAPI) -> None:
+    """Tests the JWKS document is served, empty for HS256 tokens."""
+    response = await client.get(fastapi_app.url_path_for("jwks"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"keys": []}
+    assert "max-age" in response.headers["Cache-Control"]
@@ -0,0 +1,120 @@
+import logging
+import queue
+import sys
+
+import pytest
+import ujson
+from fastapi import FastAPI, HTTPException
+from httpx import AsyncClient
+from starlette import status
+
+from cooking_forum_backend.log import (
+    DroppingQueueHandler,
+    JSONFormatter,
+    correlation_id,
+)
+from cooking_forum_backend.web.middleware.server_timing import ServerTimingMiddleware
+
+
+def _record(message: str, *args: object) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, args, None)
+
+
+def test_json_formatter() -> None:
+    """Tests records are rendered as JSON, with their extra fields."""
+    record = _record("Hello %s", "world")
+    record.status = 200
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record.exc_info = sys.exc_info()
+
+    entry = ujson.loads(JSONFormatter().format(record))
+
+    assert entry["message"] == "Hello world"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "test"
+    assert entry["status"] == 200
+    assert "ValueError: boom" in entry["exc_info"]
+
+
+def test_queue_handler_drops_when_full() -> None:
+    """Tests a full queue drops records, then reports how many."""
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(2)
+    handler = DroppingQueueHandler(log_queue)
+
+    token = correlation_id.set("request-1")
+    try:
+        for number in range(5):
+            handler.handle(_record("record %d", number))
+    finally:
+        correlation_id.reset(token)
+
+    assert handler.dropped == 3
+    queued = [log_queue.get_nowait(), log_queue.get_nowait()]
+    assert [record.getMessage() for record in queued] == ["record 0", "record 1"]
+    assert queued[0].correlation_id == "request-1"
+
+    handler.handle(_record("record 5"))
+    dropped, last = log_queue.get_nowait(), log_queue.get_nowait()
+    assert dropped.levelno == logging.WARNING
+    assert dropped.dropped == 3
+    assert last.getMessage() == "record 5"
+    assert handler.dropped == 0
+
+
+@pytest.mark.anyio
+async def test_correlation_id(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Tests requests get a correlation id, found in their access log."""
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+    access_logger = logging.getLogger("cooking_forum_backend.access")
+    handler = DroppingQueueHandler(log_queue)
+    access_logger.addHandler(handler)
+    caplog.set_level(logging.INFO, logger="cooking_forum_backend.access")
+    try:
+        url = fastapi_app.url_path_for("health_check")
+        generated = await client.get(url)
+        forwarded = await client.get(url, headers={"X-Request-ID": "lb-1234"})
+        invalid = await client.get(url, headers={"X-Request-ID": "a b\nc"})
+    finally:
+        access_logger.removeHandler(handler)
+
+    assert forwarded.headers["X-Request-ID"] == "lb-1234"
+    assert len(generated.headers["X-Request-ID"]) == 32
+    assert invalid.headers["X-Request-ID"] not in {"", "a b\nc"}
+
+    records = [log_queue.get_nowait() for _ in range(3)]
+    assert [record.correlation_id for record in records] == [
+        generated.headers["X-Request-ID"],
+        "lb-1234",
+        invalid.headers["X-Request-ID"],
+    ]
+    assert records[0].status == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_access_log_sampling(caplog: pytest.LogCaptureFixture) -> None:
+    """Tests 2xx access logs are sampled, other statuses always logged."""
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware, access_log_sample_rate=0)
+
+    @app.get("/ok")
+    async def ok() -> str:  # noqa: WPS430
+        return "ok"
+
+    @app.get("/missing")
+    async def missing() -> str:  # noqa: WPS430
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    with caplog.at_level(logging.INFO, logger="cooking_forum_backend.access"):
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            await client.get("/ok")
+            await client.get("/missing")
+
+    assert [record.status for record in caplog.records] == [
+        status.HTTP_404_NOT_FOUND,
+    ]
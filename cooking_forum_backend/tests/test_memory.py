@@ -0,0 +1,134 @@
+import gc
+import tracemalloc
+import uuid
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from cooking_forum_backend.db.instrumentation import ORMStats, orm_stats
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.crypto import CryptoService
+from cooking_forum_backend.services.memory import module_name, tracemalloc_snapshots
+from cooking_forum_backend.settings import settings
+
+ADMIN_TOKEN = "admin-secret"
+
+leaked: List[bytearray] = []
+
+
+@pytest.mark.anyio
+async def test_metrics_memory_and_orm(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests the metrics report the memory, the ORM objects and the sessions."""
+    name = uuid.uuid4().hex
+    await UserRepository(dbsession, CryptoService()).create_user_model(
+        username=name,
+        email=name + "@email.com",
+        password=name,
+        two_fa_enabled=False,
+    )
+    before = orm_stats.snapshot()
+
+    response = await client.post(
+        fastapi_app.url_path_for("get_users_batch"),
+        json={"usernames": [name]},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = await client.get(fastapi_app.url_path_for("metrics"))
+
+    metrics = response.json()
+    assert metrics["memory"]["rss_bytes"] > 0
+    assert metrics["memory"]["max_rss_bytes"] > 0
+    assert metrics["memory"]["python_allocated_blocks"] > 0
+    users = metrics["orm"]["objects"]["UserModel"]
+    assert users["created"] >= 1
+    assert users["loaded"] > before["objects"]["UserModel"]["loaded"]
+    # Sessions are counted in get_db_session, overridden by the tests.
+    assert set(metrics["orm"]["sessions"]) == {
+        "live",
+        "opened",
+        "identity_map_objects",
+        "largest_identity_map",
+    }
+
+
+@pytest.mark.anyio
+async def test_orm_stats(dbsession: AsyncSession) -> None:
+    """Tests live objects and identity maps are counted until released."""
+    stats = ORMStats()
+    stats.add_session(dbsession.sync_session)
+    user = UserModel(
+        username="live",
+        email="live@email.com",
+        password="x",
+        two_fa_enabled=False,
+    )
+    stats.add_object(user, loaded=False)
+    dbsession.add(user)
+    await dbsession.flush()
+
+    snapshot = stats.snapshot()
+    assert snapshot["objects"]["UserModel"] == {"live": 1, "created": 1, "loaded": 0}
+    assert snapshot["sessions"]["live"] == 1
+    assert snapshot["sessions"]["identity_map_objects"] >= 1
+
+    dbsession.expunge(user)
+    del user  # noqa: WPS420
+    gc.collect()
+    snapshot = stats.snapshot()
+    assert snapshot["objects"]["UserModel"]["live"] == 0
+    assert snapshot["sessions"]["identity_map_objects"] == 0
+
+
+@pytest.mark.anyio
+async def test_memory_diff(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests allocations made after the snapshot are found in their module."""
+    monkeypatch.setattr(settings, "admin_token", ADMIN_TOKEN)
+    headers = {"X-Admin-Token": ADMIN_TOKEN}
+    snapshot_url = fastapi_app.url_path_for("take_memory_snapshot")
+    diff_url = fastapi_app.url_path_for("diff_memory_snapshot")
+
+    response = await client.get(diff_url)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    response = await client.get(diff_url, headers=headers)
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    try:
+        response = await client.post(snapshot_url, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["traceback_limit"] == settings.tracemalloc_frames
+        leaked.extend(bytearray(2**16) for _ in range(64))  # noqa: WPS432
+
+        response = await client.get(diff_url, params={"limit": 5}, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        [top, *_] = response.json()["modules"]
+        assert top["module"] == __name__
+        assert top["size_diff_bytes"] >= 64 * 2**16
+        assert top["count_diff"] >= 64
+
+        response = await client.delete(snapshot_url, headers=headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not tracemalloc.is_tracing()
+    finally:
+        leaked.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc_snapshots.stop()
+
+
+def test_module_name() -> None:
+    """Tests files are named after their module."""
+    assert module_name(__file__) == __name__
+    assert module_name(tracemalloc.__file__) == "tracemalloc"
+    assert module_name("<frozen runpy>") == "<frozen runpy>"
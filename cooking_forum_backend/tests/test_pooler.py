@@ -0,0 +1,82 @@
+import asyncio
+from typing import AsyncGenerator
+
+import asyncpg
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from cooking_forum_backend.db.capabilities import Capability, supports
+from cooking_forum_backend.db.engine import create_db_engine
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.settings import settings
+from cooking_forum_backend.tests.pooler import TransactionPooler
+
+pytestmark = pytest.mark.skipif(
+    not supports(settings.db_driver, Capability.PREPARED_STATEMENTS),
+    reason="Poolers are for PostgreSQL",
+)
+
+
+@pytest.fixture
+async def pooler_url(_engine: AsyncEngine) -> AsyncGenerator[str, None]:
+    """
+    Start a transaction pooler in front of the test database.
+
+    :param _engine: current engine, the database is created with it.
+    :yield: URL of the database through the pooler.
+    """
+    pooler = TransactionPooler(
+        host=settings.db_host,
+        port=settings.db_port,
+        user=settings.db_user,
+        password=settings.db_pass,
+        database=settings.db_base,
+    )
+    await pooler.start()
+    try:
+        yield make_url(settings.db_url).set(
+            host="127.0.0.1",
+            port=pooler.listen_port,
+        ).render_as_string(hide_password=False)
+    finally:
+        await pooler.close()
+
+
+async def _hot_queries(engine: AsyncEngine) -> set:
+    backends = set()
+    for _ in range(5):
+        async with AsyncSession(engine) as session:
+            await UserRepository(session).get_by_username("nobody")
+            await UserRepository(session).get_by_ids_or_usernames([0], ["nobody"])
+            backends.add(await session.scalar(select(func.pg_backend_pid())))
+            await session.commit()
+    return backends
+
+
+@pytest.mark.anyio
+async def test_pooler_mode(pooler_url: str) -> None:
+    """Tests concurrent clients in pooler mode, across server connections."""
+    engine = create_db_engine(pooler_url, pooler_mode=True)
+    try:
+        results = await asyncio.gather(*[_hot_queries(engine) for _ in range(4)])
+    finally:
+        await engine.dispose()
+
+    assert len(set().union(*results)) > 1
+
+
+@pytest.mark.anyio
+async def test_cached_statements_break_behind_pooler(pooler_url: str) -> None:
+    """Tests the stand-in pooler breaks cached prepared statements."""
+    engine = create_db_engine(pooler_url, pooler_mode=False)
+    try:
+        with pytest.raises(
+            (DBAPIError, asyncpg.PostgresError),
+            match="prepared statement",
+        ):
+            await asyncio.gather(*[_hot_queries(engine) for _ in range(4)])
+    finally:
+        await engine.dispose()
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict
+
+import pytest
+import ujson
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from cooking_forum_backend.services.profiler import (
+    DIRECTORY_MODE,
+    PROFILE_SIGNAL,
+    REQUEST_FILE,
+    install_profile_signal,
+    profile_workers,
+    remove_profile_signal,
+)
+from cooking_forum_backend.settings import settings
+
+ADMIN_TOKEN = "admin-secret"
+
+
+async def _waiting_for_the_database() -> None:
+    await asyncio.sleep(10)
+
+
+def _stacks(collapsed: str) -> Dict[str, int]:
+    stacks = {}
+    for line in collapsed.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        stacks[stack] = int(count)
+    return stacks
+
+
+@pytest.mark.anyio
+async def test_profile_admin_token(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests the profiler is hidden without an admin token, forbidden without it."""
+    url = fastapi_app.url_path_for("profile_worker")
+    params = {"seconds": 0.05}
+
+    monkeypatch.setattr(settings, "admin_token", None)
+    response = await client.get(url, params=params)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    monkeypatch.setattr(settings, "admin_token", ADMIN_TOKEN)
+    response = await client.get(url, params=params)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    response = await client.get(
+        url,
+        params=params,
+        headers={"X-Admin-Token": "wrong"},
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.anyio
+async def test_profile(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests suspended tasks are sampled with their await chain."""
+    monkeypatch.setattr(settings, "admin_token", ADMIN_TOKEN)
+    url = fastapi_app.url_path_for("profile_worker")
+    waiting = asyncio.create_task(_waiting_for_the_database())
+    try:
+        response, busy = await asyncio.gather(
+            client.get(
+                url,
+                params={"seconds": 0.3, "interval_ms": 5},
+                headers={"X-Admin-Token": ADMIN_TOKEN},
+            ),
+            client.get(
+                url,
+                params={"seconds": 0.05},
+                headers={"X-Admin-Token": ADMIN_TOKEN},
+            ),
+        )
+    finally:
+        waiting.cancel()
+
+    statuses = {response.status_code, busy.status_code}
+    assert statuses == {status.HTTP_200_OK, status.HTTP_409_CONFLICT}
+    if response.status_code != status.HTTP_200_OK:
+        response = busy
+    assert response.headers["content-type"].startswith("text/plain")
+    stacks = _stacks(response.text)
+    assert any(stack.startswith("[running];") for stack in stacks)
+    [awaiting] = [
+        stack
+        for stack in stacks
+        if stack.startswith("[awaiting];_waiting_for_the_database (")
+    ]
+    lineno = _waiting_for_the_database.__code__.co_firstlineno
+    assert f"test_profiler.py:{lineno});sleep (asyncio/tasks.py:" in awaiting
+    # The request profiling isn't part of its own profile.
+    assert not any("profile_worker" in stack for stack in stacks)
+
+
+@pytest.mark.anyio
+async def test_profile_signal(tmp_path: Path) -> None:
+    """Tests a worker writes a profile to the directory when it's signalled."""
+    install_profile_signal(tmp_path, seconds=0.1, interval=0.01)
+    waiting = asyncio.create_task(_waiting_for_the_database())
+    try:
+        os.kill(os.getpid(), PROFILE_SIGNAL)
+        for _ in range(50):  # noqa: WPS122
+            profiles = list(tmp_path.glob(f"signal-*.{os.getpid()}.folded"))
+            if profiles:
+                break
+            await asyncio.sleep(0.05)
+    finally:
+        waiting.cancel()
+        remove_profile_signal()
+
+    [path] = profiles
+    assert "_waiting_for_the_database" in path.read_text()
+
+
+@pytest.mark.anyio
+async def test_profile_signal_limits(
+    tmp_path: Path,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Tests a signalled worker ignores requests out of the limits."""
+    (tmp_path / REQUEST_FILE).write_text(
+        ujson.dumps(
+            {"id": "long", "seconds": 3600, "interval": 0, "created": time.time()},
+        ),
+    )
+    install_profile_signal(tmp_path, seconds=0.1, interval=0.01)
+    try:
+        with caplog.at_level(logging.WARNING):
+            os.kill(os.getpid(), PROFILE_SIGNAL)
+            await asyncio.sleep(0.2)
+    finally:
+        remove_profile_signal()
+
+    assert "out of the limits" in caplog.text
+    assert not list(tmp_path.glob("*.folded"))
+
+
+@pytest.mark.anyio
+async def test_profile_directory(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests the profiles directory is private, and refused if it isn't ours."""
+    directory = tmp_path / "profiles"
+    profiles = await profile_workers(directory, seconds=0.05, interval=0.01)
+    assert list(profiles) == [os.getpid()]
+    assert directory.stat().st_mode & 0o777 == DIRECTORY_MODE
+
+    uid = os.getuid()
+    monkeypatch.setattr(os, "getuid", lambda: uid + 1)
+    with pytest.raises(PermissionError):
+        await profile_workers(directory, seconds=0.05, interval=0.01)
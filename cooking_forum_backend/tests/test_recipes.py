@@ -0,0 +1,150 @@
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from cooking_forum_backend.db.capabilities import Capability, supports
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.db.repositories.recipe_repository import RecipeRepository
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.crypto import CryptoService
+from cooking_forum_backend.settings import settings
+
+full_text_search = pytest.mark.skipif(
+    not supports(settings.db_driver, Capability.FULL_TEXT_SEARCH),
+    reason="no full-text search",
+)
+
+
+async def create_author(dbsession: AsyncSession) -> UserModel:
+    name = uuid.uuid4().hex
+    return await UserRepository(dbsession, CryptoService()).create_user_model(
+        username=name,
+        email=name + "@email.com",
+        password=name,
+        two_fa_enabled=False,
+    )
+
+
+@pytest.mark.anyio
+async def test_create_and_get_recipe(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests authenticated users can post recipes, anyone can read them."""
+    author = await create_author(dbsession)
+    token_response = await client.post(
+        fastapi_app.url_path_for("login"),
+        data={"username": author.username, "password": author.username},
+    )
+    auth_header = "Bearer " + token_response.json()["access_token"]
+    new_recipe = {
+        "title": "Lemon risotto",
+        "ingredients": "rice, lemon, parmesan",
+        "instructions": "Toast the rice, add stock slowly.",
+    }
+
+    response = await client.post(
+        fastapi_app.url_path_for("create_recipe"),
+        json=new_recipe,
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = await client.post(
+        fastapi_app.url_path_for("create_recipe"),
+        json=new_recipe,
+        headers={"Authorization": auth_header},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    recipe = response.json()
+    assert recipe["author_id"] == author.id
+
+    response = await client.get(
+        fastapi_app.url_path_for("get_recipe", recipe_id=recipe["id"]),
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == recipe
+
+    response = await client.get(
+        fastapi_app.url_path_for("get_recipe", recipe_id=recipe["id"] + 1),
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_search_pagination(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests following the cursors returns every hit once."""
+    author = await create_author(dbsession)
+    repository = RecipeRepository(dbsession)
+    for number in range(7):
+        await repository.create_recipe(
+            author_id=author.id,
+            title=f"Saffron stew {number}",
+            ingredients="saffron, onion" + ", saffron" * number,
+            instructions="Simmer for an hour.",
+        )
+    await repository.create_recipe(
+        author_id=author.id,
+        title="Pancakes",
+        ingredients="flour, eggs, milk",
+        instructions="Whisk and fry.",
+    )
+
+    url = fastapi_app.url_path_for("search_recipes")
+    seen = []
+    cursor = None
+    for _ in range(3):
+        params = {"q": "saffron", "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(url, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        seen.extend(hit["id"] for hit in page["results"])
+        cursor = page["next_cursor"]
+
+    assert len(seen) == len(set(seen)) == 7
+    assert cursor is None
+
+    response = await client.get(url, params={"q": "saffron", "cursor": "nope"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.anyio
+@full_text_search
+async def test_search_ranking_and_snippets(dbsession: AsyncSession) -> None:
+    """Tests title matches rank first, and snippets highlight the matches."""
+    author = await create_author(dbsession)
+    repository = RecipeRepository(dbsession)
+    in_instructions = await repository.create_recipe(
+        author_id=author.id,
+        title="Roast vegetables",
+        ingredients="carrots, parsnips",
+        instructions="Roast, then drizzle with maple syrup and serve.",
+    )
+    in_title = await repository.create_recipe(
+        author_id=author.id,
+        title="Maple glazed salmon",
+        ingredients="salmon, soy sauce",
+        instructions="Glaze and bake.",
+    )
+    await repository.create_recipe(
+        author_id=author.id,
+        title="Maple pork chops",
+        ingredients="pork, maple syrup",
+        instructions="Grill.",
+    )
+
+    hits = await repository.search("maple -pork", limit=10)
+
+    assert [recipe.id for recipe, _, _ in hits] == [in_title.id, in_instructions.id]
+    assert hits[0][1] > hits[1][1]
+    assert "<b>maple</b>" in hits[1][2]
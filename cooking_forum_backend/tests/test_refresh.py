@@ -0,0 +1,146 @@
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from cooking_forum_backend.db.repositories.refresh_token_repository import (
+    RefreshTokenRepository,
+)
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.crypto import CryptoService
+from cooking_forum_backend.services.token_revocation import TokenRevocationSet
+
+
+async def _login(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> dict:
+    test_name = uuid.uuid4().hex
+    test_password = uuid.uuid4().hex
+    await UserRepository(dbsession, CryptoService()).create_user_model(
+        username=test_name,
+        email=test_name + "@email.com",
+        password=test_password,
+        two_fa_enabled=False,
+    )
+
+    response = await client.post(
+        fastapi_app.url_path_for("login"),
+        data={
+            "username": test_name,
+            "password": test_password,
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+@pytest.mark.anyio
+async def test_refresh_rotates_token(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests a refresh token can be exchanged exactly once."""
+    tokens = await _login(fastapi_app, client, dbsession)
+    assert tokens["refresh_token"]
+
+    response = await client.post(
+        fastapi_app.url_path_for("refresh_token"),
+        data={"refresh_token": tokens["refresh_token"]},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+
+    me_response = await client.get(
+        fastapi_app.url_path_for("me"),
+        headers={"Authorization": "Bearer " + refreshed["access_token"]},
+    )
+    assert me_response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_refresh_token_reuse_revokes_all(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests reusing a rotated refresh token revokes the whole session."""
+    tokens = await _login(fastapi_app, client, dbsession)
+    url = fastapi_app.url_path_for("refresh_token")
+
+    response = await client.post(url, data={"refresh_token": tokens["refresh_token"]})
+    refreshed = response.json()
+
+    reuse_response = await client.post(
+        url,
+        data={"refresh_token": tokens["refresh_token"]},
+    )
+    assert reuse_response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = await client.post(url, data={"refresh_token": refreshed["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    me_response = await client.get(
+        fastapi_app.url_path_for("me"),
+        headers={"Authorization": "Bearer " + refreshed["access_token"]},
+    )
+    assert me_response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.anyio
+async def test_revoke_token(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests revoking a refresh token also revokes its access token."""
+    tokens = await _login(fastapi_app, client, dbsession)
+    auth_header = {"Authorization": "Bearer " + tokens["access_token"]}
+
+    me_response = await client.get(fastapi_app.url_path_for("me"), headers=auth_header)
+    assert me_response.status_code == status.HTTP_200_OK
+
+    response = await client.post(
+        fastapi_app.url_path_for("revoke_token"),
+        data={"refresh_token": tokens["refresh_token"]},
+    )
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    me_response = await client.get(fastapi_app.url_path_for("me"), headers=auth_header)
+    assert me_response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = await client.post(
+        fastapi_app.url_path_for("refresh_token"),
+        data={"refresh_token": tokens["refresh_token"]},
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.anyio
+async def test_revocation_set_sync(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests revocations made by another worker are picked up on sync."""
+    tokens = await _login(fastapi_app, client, dbsession)
+    jti = CryptoService().decode_access_token(tokens["access_token"])["jti"]
+
+    repository = RefreshTokenRepository(dbsession)
+    stored = await repository.get_by_hash(
+        CryptoService().hash_refresh_token(tokens["refresh_token"]),
+    )
+    revocations = TokenRevocationSet(sync_interval=60)
+    await revocations.sync(repository)
+    assert jti not in revocations
+    assert not revocations.is_stale()
+
+    await repository.revoke(stored.id)
+    await revocations.sync(repository)
+    assert jti in revocations
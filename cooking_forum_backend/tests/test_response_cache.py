@@ -0,0 +1,118 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.crypto import CryptoService
+from cooking_forum_backend.services.response_cache import (
+    CachedResponse,
+    ResponseCache,
+)
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_build_once() -> None:
+    """Tests concurrent misses of a key share one build."""
+    cache = ResponseCache(max_entries=10, ttl=60)
+    calls = 0
+
+    async def factory() -> CachedResponse:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return CachedResponse(body=b"[]", etag='W/"a"')
+
+    responses = await asyncio.gather(
+        *[cache.get_or_create("key", factory) for _ in range(10)],
+    )
+
+    assert calls == 1
+    assert {response.etag for response in responses} == {'W/"a"'}
+    assert cache.get("key") == responses[0]
+
+
+@pytest.mark.anyio
+async def test_eviction_and_expiry() -> None:
+    """Tests the least recently used entry is evicted, and entries expire."""
+    cache = ResponseCache(max_entries=2, ttl=60)
+    for key in ("a", "b"):
+        await cache.get_or_create(key, _response_factory(key))
+    cache.get("a")
+    await cache.get_or_create("c", _response_factory("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert len(cache) == 2
+
+    expiring = ResponseCache(max_entries=2, ttl=0.01)
+    await expiring.get_or_create("a", _response_factory("a"))
+    await asyncio.sleep(0.02)
+    assert expiring.get("a") is None
+
+
+@pytest.mark.anyio
+async def test_clear_during_build_is_not_stored() -> None:
+    """Tests a response built before a write is returned but not cached."""
+    cache = ResponseCache(max_entries=10, ttl=60)
+
+    async def factory() -> CachedResponse:
+        cache.clear()
+        return CachedResponse(body=b"[]", etag='W/"stale"')
+
+    response = await cache.get_or_create("key", factory)
+
+    assert response.etag == 'W/"stale"'
+    assert cache.get("key") is None
+
+
+@pytest.mark.anyio
+async def test_users_page_cached_until_registration(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests the users page is served from cache until a user registers."""
+    url = fastapi_app.url_path_for("get_users")
+    params = {"limit": 1000}
+    response = await client.get(url, params=params)
+    assert response.status_code == status.HTTP_200_OK
+    before = response.json()
+
+    name = uuid.uuid4().hex
+    dbsession.add(
+        UserModel(
+            username=name,
+            email=name + "@email.com",
+            password=name,
+            two_fa_enabled=False,
+        ),
+    )
+    await dbsession.commit()
+
+    response = await client.get(url, params=params)
+    assert response.json() == before
+
+    registered = uuid.uuid4().hex
+    await UserRepository(dbsession, CryptoService()).create_user_model(
+        username=registered,
+        email=registered + "@email.com",
+        password=registered,
+        two_fa_enabled=False,
+    )
+
+    response = await client.get(url, params=params)
+    usernames = {user["username"] for user in response.json()}
+    assert {name, registered} <= usernames
+
+
+def _response_factory(key: str):
+    async def factory() -> CachedResponse:  # noqa: WPS430
+        return CachedResponse(body=key.encode(), etag=f'W/"{key}"')
+
+    return factory
@@ -0,0 +1,49 @@
+import logging
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.crypto import CryptoService
+
+
+@pytest.mark.anyio
+async def test_server_timing_breakdown(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Tests login reports DB, crypto and serialization time."""
+    test_name = uuid.uuid4().hex
+    test_password = uuid.uuid4().hex
+    await UserRepository(dbsession, CryptoService()).create_user_model(
+        username=test_name,
+        email=test_name + "@email.com",
+        password=test_password,
+        two_fa_enabled=False,
+    )
+
+    with caplog.at_level(logging.INFO, logger="cooking_forum_backend.access"):
+        response = await client.post(
+            fastapi_app.url_path_for("login"),
+            data={
+                "username": test_name,
+                "password": test_password,
+            },
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    metrics = {
+        metric.split(";")[0]
+        for metric in response.headers["Server-Timing"].split(", ")
+    }
+    assert {"db", "crypto", "serialize", "app"} <= metrics
+
+    [access_log] = caplog.records
+    assert "POST /api/token" in access_log.getMessage()
+    assert "crypto=" in access_log.getMessage()
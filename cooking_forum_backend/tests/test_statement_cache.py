@@ -0,0 +1,41 @@
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from cooking_forum_backend.db.instrumentation import statement_cache_stats
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.crypto import CryptoService
+
+
+@pytest.mark.anyio
+async def test_lambda_statement_cached_and_rebound(dbsession: AsyncSession) -> None:
+    """Tests hot queries hit the compiled cache and bind each call's values."""
+    repository = UserRepository(dbsession, CryptoService())
+    names = [uuid.uuid4().hex for _ in range(2)]
+    for name in names:
+        await repository.create_user_model(
+            username=name,
+            email=name + "@email.com",
+            password=name,
+            two_fa_enabled=False,
+        )
+
+    await repository.get_by_username(names[0])
+    hits = statement_cache_stats.counts["cache_hit"]
+    found = [await repository.get_by_username(name) for name in names]
+
+    assert [user.username for user in found] == names
+    assert statement_cache_stats.counts["cache_hit"] == hits + len(names)
+
+
+@pytest.mark.anyio
+async def test_metrics(fastapi_app: FastAPI, client: AsyncClient) -> None:
+    """Tests the metrics report the statement cache hit rate."""
+    response = await client.get(fastapi_app.url_path_for("metrics"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "hit_rate" in response.json()["statement_cache"]
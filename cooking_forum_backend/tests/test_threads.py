@@ -0,0 +1,116 @@
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from cooking_forum_backend.db.repositories.thread_repository import ThreadRepository
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.crypto import CryptoService
+
+
+async def login(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> dict:
+    name = uuid.uuid4().hex
+    await UserRepository(dbsession, CryptoService()).create_user_model(
+        username=name,
+        email=name + "@email.com",
+        password=name,
+        two_fa_enabled=False,
+    )
+    response = await client.post(
+        fastapi_app.url_path_for("login"),
+        data={"username": name, "password": name},
+    )
+    return {"Authorization": "Bearer " + response.json()["access_token"]}
+
+
+@pytest.mark.anyio
+async def test_posts_bump_thread(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests replies update the post count and move the thread up the feed."""
+    headers = await login(fastapi_app, client, dbsession)
+    threads = []
+    for title in ("First", "Second"):
+        response = await client.post(
+            fastapi_app.url_path_for("create_thread"),
+            json={"title": title, "body": "Hello"},
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        threads.append(response.json())
+    first, second = threads
+    assert first["post_count"] == 1
+
+    feed_url = fastapi_app.url_path_for("get_feed")
+    feed = (await client.get(feed_url)).json()["results"]
+    assert [thread["id"] for thread in feed[:2]] == [second["id"], first["id"]]
+
+    response = await client.post(
+        fastapi_app.url_path_for("create_post", thread_id=first["id"]),
+        json={"body": "Reply"},
+        headers=headers,
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    feed = (await client.get(feed_url)).json()["results"]
+    assert [thread["id"] for thread in feed[:2]] == [first["id"], second["id"]]
+    assert feed[0]["post_count"] == 2
+    assert feed[0]["last_activity_at"] == response.json()["created_at"]
+
+    posts = (
+        await client.get(fastapi_app.url_path_for("get_posts", thread_id=first["id"]))
+    ).json()["results"]
+    assert [post["body"] for post in posts] == ["Hello", "Reply"]
+
+    response = await client.post(
+        fastapi_app.url_path_for("create_post", thread_id=second["id"] + 1),
+        json={"body": "Nowhere"},
+        headers=headers,
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_feed_pagination(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests following the feed cursors returns every thread once, in order."""
+    author = await UserRepository(dbsession, CryptoService()).create_user_model(
+        username=uuid.uuid4().hex,
+        email="feed@email.com",
+        password="password",
+        two_fa_enabled=False,
+    )
+    repository = ThreadRepository(dbsession)
+    created = [
+        await repository.create_thread(author.id, f"Thread {number}", "Body")
+        for number in range(7)
+    ]
+    await repository.create_post(created[0].id, author.id, "Bump")
+
+    url = fastapi_app.url_path_for("get_feed")
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await client.get(url, params=params)).json()
+        seen.extend(thread["id"] for thread in page["results"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    expected = [created[0].id] + [thread.id for thread in reversed(created[1:])]
+    assert seen == expected
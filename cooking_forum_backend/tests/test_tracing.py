@@ -0,0 +1,198 @@
+import multiprocessing
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+import pytest
+import ujson
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.crypto import CryptoService
+from cooking_forum_backend.services.tracing import (
+    KIND_SERVER,
+    FileSpanExporter,
+    InMemorySpanExporter,
+    Span,
+    SpanExporter,
+    Tracer,
+    set_tracer,
+    start_span,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+EXPORTS = 200
+
+
+@pytest.fixture
+def tracer() -> Iterator[Tracer]:
+    """
+    Trace every request to memory while the test runs.
+
+    :yield: the tracer.
+    """
+    tracer = Tracer(InMemorySpanExporter(), sample_rate=1)
+    previous = set_tracer(tracer)
+    try:
+        yield tracer
+    finally:
+        set_tracer(previous)
+
+
+async def _login(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    headers: Dict[str, str],
+) -> None:
+    name = uuid.uuid4().hex
+    await UserRepository(dbsession, CryptoService()).create_user_model(
+        username=name,
+        email=name + "@email.com",
+        password=name,
+        two_fa_enabled=False,
+    )
+    response = await client.post(
+        fastapi_app.url_path_for("login"),
+        data={"username": name, "password": name},
+        headers=headers,
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_login_trace(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    tracer: Tracer,
+) -> None:
+    """Tests a login is traced from the route to bcrypt and the database."""
+    await _login(fastapi_app, client, dbsession, headers={})
+
+    spans = tracer.exporter.spans  # type: ignore
+    by_name = {span.name: span for span in spans}
+    root = by_name["POST /api/token"]
+    assert root.kind == KIND_SERVER
+    assert root.parent_id is None
+    assert root.attributes["http.response.status_code"] == status.HTTP_200_OK
+    assert {span.trace_id for span in spans} == {root.trace_id}
+
+    credentials = by_name["get_user_by_credentials"]
+    authenticate = by_name["UserRepository.authenticate"]
+    check_password = by_name["CryptoService.check_password"]
+    assert credentials.parent_id == root.span_id
+    assert authenticate.parent_id == credentials.span_id
+    assert check_password.parent_id == authenticate.span_id
+    assert check_password.attributes["category"] == "crypto"
+
+    queries = [span for span in spans if span.name == "db.query"]
+    assert any(
+        "FROM users" in query.attributes["db.statement"] for query in queries
+    )
+    for span in spans:
+        assert span.start_ns <= span.end_ns
+
+
+@pytest.mark.anyio
+async def test_head_sampling(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    tracer: Tracer,
+) -> None:
+    """Tests the sample rate and the traceparent sampled flag."""
+    exporter: InMemorySpanExporter = tracer.exporter  # type: ignore
+
+    tracer.sample_rate = 0
+    await _login(fastapi_app, client, dbsession, headers={})
+    assert not exporter.spans
+
+    await _login(
+        fastapi_app,
+        client,
+        dbsession,
+        headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"},
+    )
+    root = next(span for span in exporter.spans if span.kind == KIND_SERVER)
+    assert root.trace_id == TRACE_ID
+    assert root.parent_id == PARENT_ID
+    exporter.clear()
+
+    tracer.sample_rate = 1
+    await _login(
+        fastapi_app,
+        client,
+        dbsession,
+        headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00"},
+    )
+    assert not exporter.spans
+
+
+def test_file_exporter(tmp_path: Path) -> None:
+    """Tests spans are written as OTLP/JSON export requests."""
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(FileSpanExporter(path, "forum"), sample_rate=1)
+    previous = set_tracer(tracer)
+    try:
+        with start_span("request", parent=tracer.sampled()) as root:
+            root.set_attribute("http.response.status_code", 200)  # type: ignore
+            with pytest.raises(ValueError):
+                with start_span("child"):
+                    raise ValueError("boom")
+    finally:
+        set_tracer(previous)
+        tracer.shutdown()
+
+    [request] = [ujson.loads(line) for line in path.read_text().splitlines()]
+    [resource_spans] = request["resourceSpans"]
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "forum"}},
+    ]
+    child, parent = resource_spans["scopeSpans"][0]["spans"]
+    assert child["parentSpanId"] == parent["spanId"]
+    assert child["status"]["code"] == 2
+    assert "parentSpanId" not in parent
+    assert parent["attributes"] == [
+        {"key": "http.response.status_code", "value": {"intValue": "200"}},
+    ]
+
+
+def _export_batches(path: Path, service_name: str, started: Any) -> None:
+    exporter = FileSpanExporter(path, service_name)
+    spans = [Span(f"span {index}", TRACE_ID) for index in range(200)]
+    started.wait()
+    for _ in range(EXPORTS):
+        exporter.export(spans)
+
+
+def test_file_exporters_share_file(tmp_path: Path) -> None:
+    """Tests workers exporting to the same file don't interleave their lines."""
+    path = tmp_path / "spans.jsonl"
+    context = multiprocessing.get_context("fork")
+    started = context.Barrier(2)
+    workers = [
+        context.Process(target=_export_batches, args=(path, service_name, started))
+        for service_name in ("first", "second")
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    requests = [ujson.loads(line) for line in path.read_text().splitlines()]
+    assert len(requests) == EXPORTS * len(workers)
+
+
+def test_exporter_requires_export() -> None:
+    """Tests an exporter without export fails when it's built."""
+
+    class IncompleteExporter(SpanExporter):  # noqa: WPS431
+        """Exporter missing its export method."""
+
+    with pytest.raises(TypeError):
+        IncompleteExporter()  # type: ignore
@@ -0,0 +1,58 @@
+import asyncio
+import uuid
+from typing import Any, List
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.crypto import CryptoService
+from cooking_forum_backend.services.user_loader import UserLoader
+
+
+@pytest.mark.anyio
+async def test_user_loader_batches_and_memoizes(dbsession: AsyncSession) -> None:
+    """Tests lookups of one iteration share a query, and are not repeated."""
+    repository = UserRepository(dbsession, CryptoService())
+    users = []
+    for _ in range(3):
+        name = uuid.uuid4().hex
+        users.append(
+            await repository.create_user_model(
+                username=name,
+                email=name + "@email.com",
+                password=name,
+                two_fa_enabled=False,
+            ),
+        )
+
+    statements: List[str] = []
+
+    def capture(*args: Any) -> None:  # noqa: WPS430
+        statements.append(args[2])
+
+    connection = await dbsession.connection()
+    event.listen(connection.sync_connection, "before_cursor_execute", capture)
+    try:
+        loader = UserLoader(repository)
+        loaded = await asyncio.gather(
+            loader.load(users[0].id),
+            loader.load(users[1].id),
+            loader.load(users[1].id),
+            loader.load_by_username(users[2].username),
+            loader.load(-1),
+        )
+        assert loaded == [users[0], users[1], users[1], users[2], None]
+        assert loader.queries == 1
+        assert len(statements) == 1
+
+        assert await loader.load_by_username(users[0].username) is users[0]
+        assert await loader.load(users[2].id) is users[2]
+        assert await loader.load_many([users[1].id, -1]) == [users[1], None]
+        assert loader.queries == 1
+
+        assert await loader.load_by_username(uuid.uuid4().hex) is None
+        assert loader.queries == 2
+    finally:
+        event.remove(connection.sync_connection, "before_cursor_execute", capture)
@@ -0,0 +1,94 @@
+import uuid
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.crypto import CryptoService
+from cooking_forum_backend.services.response_cache import get_response_cache
+from cooking_forum_backend.settings import settings
+
+
+async def create_users(dbsession: AsyncSession, count: int) -> List[UserModel]:
+    users = []
+    for _ in range(count):
+        name = uuid.uuid4().hex
+        users.append(
+            await UserRepository(dbsession, CryptoService()).create_user_model(
+                username=name,
+                email=name + "@email.com",
+                password=name,
+                two_fa_enabled=False,
+            ),
+        )
+    return users
+
+
+@pytest.mark.anyio
+async def test_users_batch_in_request_order(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests ids and usernames are resolved in request order, null if missing."""
+    first, second, third = await create_users(dbsession, 3)
+    missing_id = third.id + 1000
+
+    response = await client.post(
+        fastapi_app.url_path_for("get_users_batch"),
+        json={
+            "ids": [third.id, missing_id, first.id, third.id],
+            "usernames": ["nobody", second.username],
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert [user and user["id"] for user in body["ids"]] == [
+        third.id,
+        None,
+        first.id,
+        third.id,
+    ]
+    assert body["usernames"][0] is None
+    assert body["usernames"][1]["username"] == second.username
+    assert "password" not in body["usernames"][1]
+
+
+@pytest.mark.anyio
+async def test_users_batch_shares_cache(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+) -> None:
+    """Tests looked up users are cached under both their id and username."""
+    (user,) = await create_users(dbsession, 1)
+    url = fastapi_app.url_path_for("get_users_batch")
+
+    await client.post(url, json={"ids": [user.id]})
+
+    cache = get_response_cache("users")
+    assert cache.get(("user", user.id)) is not None
+    assert cache.get(("user_by_username", user.username)) is not None
+
+    response = await client.post(url, json={"usernames": [user.username]})
+    assert response.json()["usernames"][0]["id"] == user.id
+
+
+@pytest.mark.anyio
+async def test_users_batch_too_large(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """Tests lookups over users_batch_max_size are rejected."""
+    response = await client.post(
+        fastapi_app.url_path_for("get_users_batch"),
+        json={"ids": list(range(settings.users_batch_max_size + 1))},
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from cooking_forum_backend.db.capabilities import Capability, supports
+from cooking_forum_backend.db.engine import create_db_engine
+from cooking_forum_backend.db.warmup import HOT_QUERIES, warm_up_pool
+from cooking_forum_backend.settings import settings
+
+
+@pytest.mark.anyio
+@pytest.mark.skipif(
+    not supports(settings.db_driver, Capability.PREPARED_STATEMENTS),
+    reason="no prepared statement cache",
+)
+async def test_warm_up_pool(_engine: AsyncEngine) -> None:
+    """Tests the pool holds prepared connections after warm-up."""
+    engine = create_db_engine(pool_size=3)
+    try:
+        await warm_up_pool(engine, connections=3)
+        assert engine.sync_engine.pool.checkedin() == 3
+
+        async with engine.connect() as connection:
+            raw_connection = await connection.get_raw_connection()
+            prepared = raw_connection.dbapi_connection._prepared_statement_cache
+            assert len(prepared) == len(HOT_QUERIES)
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+@pytest.mark.skipif(
+    not supports(settings.db_driver, Capability.PREPARED_STATEMENTS),
+    reason="no prepared statement cache",
+)
+async def test_warm_up_read_only(_engine: AsyncEngine) -> None:
+    """Tests a read-only server, like a hot standby, is warmed up too."""
+    engine = create_db_engine(
+        pool_size=1,
+        connect_args={"server_settings": {"default_transaction_read_only": "on"}},
+    )
+    try:
+        await warm_up_pool(engine, connections=1)
+
+        async with engine.connect() as connection:
+            raw_connection = await connection.get_raw_connection()
+            prepared = raw_connection.dbapi_connection._prepared_statement_cache
+            assert any(sql.startswith("UPDATE otps") for sql in prepared)
+    finally:
+        await engine.dispose()
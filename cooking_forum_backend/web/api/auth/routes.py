@@ -1,29 +1,75 @@
 from datetime import datetime, timedelta
 import random
-from typing import Annotated, List
+import uuid
+from functools import lru_cache, partial
+from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, HTTPException, status
+import ujson
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
 from fastapi.param_functions import Depends
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError
+from pydantic import TypeAdapter
 from cooking_forum_backend.db.models.user_model import UserModel
-from cooking_forum_backend.db.repositories.otp_repository import OTPRepository
+from cooking_forum_backend.db.repositories.otp_repository import (
+    OTPConsumeResult,
+    OTPRepository,
+)
+from cooking_forum_backend.db.repositories.refresh_token_repository import (
+    RefreshTokenRepository,
+)
 
 from cooking_forum_backend.db.repositories.user_repository import UserRepository
+from cooking_forum_backend.services.background import (
+    BackgroundTaskGroup,
+    get_background_tasks,
+)
 from cooking_forum_backend.services.crypto import CryptoService
 from cooking_forum_backend.services.email_service import EmailService
+from cooking_forum_backend.services.jwt_backends import get_jwt_backend
+from cooking_forum_backend.services.response_cache import (
+    CachedResponse,
+    get_response_cache,
+)
+from cooking_forum_backend.services.timing import measure
+from cooking_forum_backend.services.token_revocation import (
+    TokenRevocationSet,
+    get_token_revocations,
+)
+from cooking_forum_backend.services.tracing import traced
+from cooking_forum_backend.services.user_loader import UserLoader
+from cooking_forum_backend.settings import settings
+from cooking_forum_backend.web.conditional import (
+    NOT_MODIFIED_RESPONSE,
+    etag_matches,
+    not_modified,
+    weak_etag,
+)
 from cooking_forum_backend.web.api.auth.schema import (
     OtpCheckDTO,
     OtpDTO,
     OtpRequestDTO,
+    RefreshTokenRequestDTO,
     TokenDTO,
     TokenRequestDTO,
+    UserBatchDTO,
+    UserBatchInputDTO,
     UserDTO,
     UserInputDTO,
+    UserMentionDTO,
 )
 
 router = APIRouter()
 
+# Detail of the 401 answered for each refused OTP
+OTP_FAILURES = {
+    OTPConsumeResult.NOT_FOUND: "OTP Not found",
+    OTPConsumeResult.EXPIRED: "OTP expired",
+    OTPConsumeResult.USED: "OTP already used",
+    OTPConsumeResult.INVALID_VALUE: "Invalid OTP",
+}
+
+@traced()
 async def get_user_by_credentials(
     username: str,
     password: str,
@@ -59,11 +105,45 @@ async def get_user_by_credentials(
     return user
 
 
+async def issue_tokens(
+    user: UserModel,
+    crypto_service: CryptoService,
+    refresh_token_repository: RefreshTokenRepository,
+):
+    """
+    Issue an access token and the refresh token paired with it.
+
+    :param user: user the tokens are issued to.
+    :param crypto_service: service signing the access token.
+    :param refresh_token_repository: DAO storing the refresh token hash.
+    :return: token response.
+    """
+    jti = uuid.uuid4().hex
+    access_token = crypto_service.create_access_token({"sub": user.username, "jti": jti})
+    refresh_token = crypto_service.create_refresh_token()
+    now = datetime.utcnow()
+
+    await refresh_token_repository.create_refresh_token(
+        user_id=user.id,
+        token_hash=crypto_service.hash_refresh_token(refresh_token),
+        access_jti=jti,
+        access_expires_at=now + crypto_service.jwt_expires_delta,
+        expires_at=now + crypto_service.jwt_refresh_expires_delta,
+    )
+
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
 
 async def get_current_user(
     token: Annotated[str, Depends(OAuth2PasswordBearer(tokenUrl="/api/token"))],
     crypto_service: Annotated[CryptoService, Depends()],
-    user_repository: Annotated[UserRepository, Depends()],
+    user_loader: Annotated[UserLoader, Depends()],
+    refresh_token_repository: Annotated[RefreshTokenRepository, Depends()],
+    token_revocations: Annotated[TokenRevocationSet, Depends(get_token_revocations)],
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -76,8 +156,13 @@ async def get_current_user(
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-        
-        user = await user_repository.get_by_username(username)
+
+        if token_revocations.is_stale():
+            await token_revocations.sync(refresh_token_repository)
+        if payload.get("jti", "") in token_revocations:
+            raise credentials_exception
+
+        user = await user_loader.load_by_username(username)
     except JWTError:
         raise credentials_exception
     
@@ -121,6 +206,7 @@ async def login(
     credentials: Annotated[TokenRequestDTO, Depends()],
     crypto_service: Annotated[CryptoService, Depends()],
     user_repository: Annotated[UserRepository, Depends()],
+    refresh_token_repository: Annotated[RefreshTokenRepository, Depends()],
 ):
     user = await get_user_by_credentials(
         username=credentials.username,
@@ -128,9 +214,8 @@ async def login(
         with_2fa_requested=False,
         user_repository=user_repository,
     )
-    access_token = crypto_service.create_access_token({"sub": user.username})
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    return await issue_tokens(user, crypto_service, refresh_token_repository)
 
 
 
@@ -145,6 +230,7 @@ async def send_otp(
     otp_repository: Annotated[OTPRepository, Depends()],
     email_service: Annotated[EmailService, Depends()],
     user_repository: Annotated[UserRepository, Depends()],
+    background_tasks: Annotated[BackgroundTaskGroup, Depends(get_background_tasks)],
 ):
     user = await get_user_by_credentials(
         username=credentials.username,
@@ -159,7 +245,9 @@ async def send_otp(
         expires_at=datetime.utcnow() + timedelta(minutes=15),
     )
 
-    await email_service.sendEmail(user.email, f"Your 2FA code is {otp.value}")
+    background_tasks.spawn(
+        email_service.sendEmail(user.email, f"Your 2FA code is {otp.value}"),
+    )
 
     return {"otp_id": otp.id, "otp_type": "email"}
 
@@ -174,6 +262,7 @@ async def login_with_otp(
     crypto_service: Annotated[CryptoService, Depends()],
     otp_repository: Annotated[OTPRepository, Depends()],
     user_repository: Annotated[UserRepository, Depends()],
+    refresh_token_repository: Annotated[RefreshTokenRepository, Depends()],
 ):
     user = await get_user_by_credentials(
         username=credentials.username,
@@ -182,56 +271,324 @@ async def login_with_otp(
         user_repository=user_repository,
     )
 
-    otp = await otp_repository.get_active_by_user_id(user.id)
+    consumed = await otp_repository.consume(
+        user_id=user.id,
+        otp_id=credentials.otp_id,
+        value=credentials.otp_value,
+    )
 
-    if not otp:
+    if consumed is not OTPConsumeResult.CONSUMED:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="OTP Not found",
+            detail=OTP_FAILURES[consumed],
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    
-    if otp.id != credentials.otp_id or otp.value != credentials.otp_value:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid OTP",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    access_token = crypto_service.create_access_token({"sub": user.username})
 
-    await otp_repository.set_used_at(otp.id)
+    return await issue_tokens(user, crypto_service, refresh_token_repository)
 
-    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post(
+    "/token/refresh",
+    summary="Exchange a refresh token for a new access token. The refresh token is rotated.",
+    response_description="A new JWT access token and refresh token if successful, 401 otherwise",
+    response_model=TokenDTO,
+)
+async def refresh_token(
+    credentials: Annotated[RefreshTokenRequestDTO, Depends()],
+    crypto_service: Annotated[CryptoService, Depends()],
+    user_repository: Annotated[UserRepository, Depends()],
+    refresh_token_repository: Annotated[RefreshTokenRepository, Depends()],
+    token_revocations: Annotated[TokenRevocationSet, Depends(get_token_revocations)],
+):
+    invalid_token_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    stored = await refresh_token_repository.get_by_hash(
+        crypto_service.hash_refresh_token(credentials.refresh_token),
+    )
+    if stored is None or stored.expires_at <= datetime.utcnow():
+        raise invalid_token_exception
+
+    revoked = await refresh_token_repository.revoke(stored.id)
+    if revoked is None:
+        # An already rotated token was presented again: it may have been
+        # stolen, so every session of the user is revoked.
+        for jti, expires_at in await refresh_token_repository.revoke_all_for_user(
+            stored.user_id,
+        ):
+            token_revocations.add(jti, expires_at)
+        raise invalid_token_exception
+
+    user = await user_repository.get_by_id(stored.user_id)
+    if user is None:
+        raise invalid_token_exception
+
+    return await issue_tokens(user, crypto_service, refresh_token_repository)
+
+
+@router.post(
+    "/token/revoke",
+    summary="Revoke a refresh token and the access token issued with it",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def revoke_token(
+    credentials: Annotated[RefreshTokenRequestDTO, Depends()],
+    crypto_service: Annotated[CryptoService, Depends()],
+    refresh_token_repository: Annotated[RefreshTokenRepository, Depends()],
+    token_revocations: Annotated[TokenRevocationSet, Depends(get_token_revocations)],
+) -> None:
+    stored = await refresh_token_repository.get_by_hash(
+        crypto_service.hash_refresh_token(credentials.refresh_token),
+    )
+    # Unknown or already revoked tokens are not an error (RFC 7009)
+    if stored is None:
+        return
+
+    revoked = await refresh_token_repository.revoke(stored.id)
+    if revoked is not None:
+        token_revocations.add(*revoked)
 
 @router.get(
     "/users/me",
     summary="Get current logged user",
-    response_model=UserDTO
+    response_model=UserDTO,
+    responses=NOT_MODIFIED_RESPONSE,
 )
 async def me(
+    response: Response,
     current_user: Annotated[UserModel, Depends(get_current_user)],
+    if_none_match: Annotated[Optional[str], Header()] = None,
 ):
+    # Users are never updated, the row can't change under the same id.
+    headers = {
+        "ETag": weak_etag(current_user.id, current_user.created_at.isoformat()),
+        "Cache-Control": settings.users_me_cache_control,
+        "Vary": "Authorization",
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers)
+
+    response.headers.update(headers)
     return UserDTO.model_validate(current_user)
 
 
+_users_adapter = TypeAdapter(List[UserDTO])
+
+
+async def _render_users_page(
+    user_repository: UserRepository,
+    limit: int,
+    offset: int,
+) -> CachedResponse:
+    users = await user_repository.get_all_users(limit=limit, offset=offset)
+    with measure("serialize"):
+        body = _users_adapter.dump_json(
+            [UserDTO.model_validate(user) for user in users],
+        )
+    return CachedResponse(body=body, etag=weak_etag(*[user.id for user in users]))
+
+
 @router.get(
     "/users/",
     summary="Get all users, does not require authentication",
-    response_model=List[UserDTO]
+    response_model=List[UserDTO],
+    responses=NOT_MODIFIED_RESPONSE,
 )
 async def get_users(
     user_repository: Annotated[UserRepository, Depends()],
     limit: int = 10,
     offset: int = 0,
-) -> List[UserModel]:
+    if_none_match: Annotated[Optional[str], Header()] = None,
+) -> Response:
     """
     Retrieve all users objects from the database.
 
+    Encoded pages are kept in the "users" response cache, cleared when
+    a user registers. Concurrent misses of a page run a single query.
+
+    The ETag is computed from the ids of the page alone, so revalidating
+    a page missing from the cache gets a 304 without loading the users.
+
     :param limit: limit of users objects, defaults to 10.
     :param offset: offset of users objects, defaults to 0.
     :param users_dao: DAO for users models.
     :return: list of users objects from database.
     """
-    return await user_repository.get_all_users(limit=limit, offset=offset)
+    cache = get_response_cache("users")
+    cache_key = ("get_users", limit, offset)
+
+    cached = cache.get(cache_key)
+    if cached is None and if_none_match:
+        user_ids = await user_repository.get_user_ids(limit=limit, offset=offset)
+        etag = weak_etag(*user_ids)
+        if etag_matches(if_none_match, etag):
+            return not_modified(
+                {"ETag": etag, "Cache-Control": settings.users_cache_control},
+            )
+    if cached is None:
+        cached = await cache.get_or_create(
+            cache_key,
+            partial(_render_users_page, user_repository, limit, offset),
+        )
+
+    headers = {"ETag": cached.etag, "Cache-Control": settings.users_cache_control}
+    if etag_matches(if_none_match, cached.etag):
+        return not_modified(headers)
+
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def _encode_user(user: UserModel) -> CachedResponse:
+    return CachedResponse(
+        body=UserDTO.model_validate(user).model_dump_json().encode(),
+        etag=weak_etag(user.id, user.created_at.isoformat()),
+    )
+
+
+def _join_users(entries: List[Optional[CachedResponse]]) -> bytes:
+    bodies = [b"null" if entry is None else entry.body for entry in entries]
+    return b"[" + b",".join(bodies) + b"]"
+
+
+@router.post(
+    "/users/batch",
+    summary="Get users by ids and usernames, does not require authentication",
+    response_model=UserBatchDTO,
+)
+async def get_users_batch(
+    lookup: UserBatchInputDTO,
+    user_repository: Annotated[UserRepository, Depends()],
+) -> Response:
+    """
+    Resolve a list of ids and usernames with a single query.
+
+    Users are shared with the "users" response cache: the ones cached
+    are not queried, the ones loaded are cached for the next lookups.
+
+    :param lookup: ids and usernames to look up.
+    :param user_repository: DAO for users models.
+    :return: users in request order, null for the ones not found.
+    """
+    cache = get_response_cache("users")
+    generation = cache.generation
+    keys = [("user", user_id) for user_id in lookup.ids]
+    keys += [("user_by_username", username) for username in lookup.usernames]
+    found = {key: cache.get(key) for key in keys}
+
+    missing = [key for key, entry in found.items() if entry is None]
+    if missing:
+        users = await user_repository.get_by_ids_or_usernames(
+            ids=[value for kind, value in missing if kind == "user"],
+            usernames=[value for kind, value in missing if kind == "user_by_username"],
+        )
+        with measure("serialize"):
+            for user in users:
+                entry = _encode_user(user)
+                for key in (("user", user.id), ("user_by_username", user.username)):
+                    cache.set(key, entry, generation)
+                    if key in found:
+                        found[key] = entry
+
+    entries = [found[key] for key in keys]
+    id_count = len(lookup.ids)
+    return Response(
+        content=(
+            b'{"ids":' + _join_users(entries[:id_count])
+            + b',"usernames":' + _join_users(entries[id_count:]) + b"}"
+        ),
+        media_type="application/json",
+    )
+
+
+_mentions_adapter = TypeAdapter(List[UserMentionDTO])
+
+
+async def _render_completions(
+    user_repository: UserRepository,
+    prefix: str,
+    limit: int,
+) -> CachedResponse:
+    users = await user_repository.autocomplete(prefix, limit=limit)
+    with measure("serialize"):
+        body = _mentions_adapter.dump_json(
+            [
+                UserMentionDTO(id=user_id, username=username)
+                for user_id, username in users
+            ],
+        )
+    return CachedResponse(body=body, etag=weak_etag(*[user_id for user_id, _ in users]))
+
+
+@router.get(
+    "/users/autocomplete",
+    summary="Complete a username, does not require authentication",
+    response_model=List[UserMentionDTO],
+    responses=NOT_MODIFIED_RESPONSE,
+)
+async def autocomplete_users(
+    user_repository: Annotated[UserRepository, Depends()],
+    prefix: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=20)] = 10,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+) -> Response:
+    """
+    Complete a username, for mentions in the forum editor.
+
+    Completions of short prefixes, requested on every first keystrokes,
+    are kept in the "user_autocomplete" response cache until a user
+    registers.
+
+    :param prefix: start of the username, case insensitive.
+    :param limit: maximum number of users, defaults to 10.
+    :param user_repository: DAO for users models.
+    :return: ids and usernames, shortest first.
+    """
+    render = partial(_render_completions, user_repository, prefix, limit)
+    if len(prefix) <= settings.autocomplete_cache_max_prefix_length:
+        cached = await get_response_cache("user_autocomplete").get_or_create(
+            ("autocomplete", prefix.lower(), limit),
+            render,
+        )
+    else:
+        cached = await render()
+
+    headers = {"ETag": cached.etag, "Cache-Control": settings.users_cache_control}
+    if etag_matches(if_none_match, cached.etag):
+        return not_modified(headers)
+
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@lru_cache(maxsize=None)
+def _jwks_body() -> bytes:
+    return ujson.dumps(get_jwt_backend().jwks()).encode()
+
+
+@router.get(
+    "/.well-known/jwks.json",
+    summary="Public keys verifying the access tokens, empty for HS256",
+)
+async def jwks() -> Response:
+    """
+    JSON Web Key Set of the token signing keys.
+
+    The body is encoded once per worker, keys only change on restart.
+
+    :return: JWKS document.
+    """
+    return Response(
+        content=_jwks_body(),
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=300"},
+    )
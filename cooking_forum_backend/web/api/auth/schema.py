@@ -1,9 +1,11 @@
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, List, Optional
 from attr import dataclass
 from fastapi import Form
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, model_validator
+
+from cooking_forum_backend.settings import settings
 
 
 class UserDTO(BaseModel):
@@ -21,6 +23,15 @@ class UserDTO(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserMentionDTO(BaseModel):
+    """
+    DTO for username completions.
+    """
+
+    id: int
+    username: str
+
+
 class UserInputDTO(BaseModel):
     """
     DTO to create user models from input.
@@ -32,6 +43,34 @@ class UserInputDTO(BaseModel):
     two_fa_enabled: bool
 
 
+class UserBatchInputDTO(BaseModel):
+    """
+    DTO to look up several users at once.
+    """
+
+    ids: List[int] = []
+    usernames: List[str] = []
+
+    @model_validator(mode="after")
+    def check_size(self) -> "UserBatchInputDTO":
+        max_size = settings.users_batch_max_size
+        if len(self.ids) + len(self.usernames) > max_size:
+            raise ValueError(f"At most {max_size} ids and usernames can be looked up")
+        return self
+
+
+class UserBatchDTO(BaseModel):
+    """
+    DTO for batch lookups of users.
+
+    Both lists follow the order of the request, with null for the users
+    not found.
+    """
+
+    ids: List[Optional[UserDTO]]
+    usernames: List[Optional[UserDTO]]
+
+
 class OtpDTO(BaseModel):
     """
     DTO for 2FA challenges.
@@ -48,6 +87,7 @@ class TokenDTO(BaseModel):
 
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
 
 # class TokenRequestDTO(BaseModel):
 #     username: str = Form(...)
@@ -70,6 +110,15 @@ class TokenRequestDTO:
 
 class OtpRequestDTO(TokenRequestDTO):
     pass
+
+class RefreshTokenRequestDTO:
+    def __init__(
+        self,
+        *,
+        refresh_token: Annotated[str, Form()],
+    ):
+        self.refresh_token = refresh_token
+
 class OtpCheckDTO:
     def __init__(
         self,
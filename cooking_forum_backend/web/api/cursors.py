@@ -0,0 +1,38 @@
+import base64
+import binascii
+from typing import Any, Callable, Tuple
+
+from fastapi import HTTPException, status
+
+CURSOR_SEPARATOR = ","
+
+
+def encode_cursor(*parts: str) -> str:
+    """
+    Encode the position of the last item of a page.
+
+    :param parts: sort key of the item, as strings parsed back exactly.
+    :return: opaque cursor.
+    """
+    return base64.urlsafe_b64encode(CURSOR_SEPARATOR.join(parts).encode()).decode()
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[str], Any]) -> Tuple[Any, ...]:
+    """
+    Decode a cursor made by ``encode_cursor``.
+
+    :param cursor: opaque cursor.
+    :param parsers: parser of every part of the sort key.
+    :raises HTTPException: if the cursor is malformed.
+    :return: parsed sort key.
+    """
+    try:
+        parts = base64.urlsafe_b64decode(cursor).decode().split(CURSOR_SEPARATOR)
+        if len(parts) != len(parsers):
+            raise ValueError(cursor)
+        return tuple(parse(part) for parse, part in zip(parsers, parts))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
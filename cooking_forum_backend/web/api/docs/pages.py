@@ -0,0 +1,83 @@
+import logging
+import time
+from typing import Dict, Optional
+
+import ujson
+from fastapi import FastAPI
+from fastapi.openapi.docs import (
+    get_redoc_html,
+    get_swagger_ui_html,
+    get_swagger_ui_oauth2_redirect_html,
+)
+
+from cooking_forum_backend.settings import settings
+from cooking_forum_backend.web.prebuilt import PrebuiltResponse
+from cooking_forum_backend.web.static_files import static_url
+
+logger = logging.getLogger("uvicorn.error")
+
+OPENAPI_URL = "/api/openapi.json"
+
+
+class DocsPages:
+    """
+    OpenAPI document and docs pages of an application, built once.
+
+    They're built on startup, or on the first request when the startup
+    events don't run, as in tests.
+    """
+
+    def __init__(self, app: FastAPI) -> None:
+        self.app = app
+        self._pages: Optional[Dict[str, PrebuiltResponse]] = None
+
+    def build(self) -> Dict[str, PrebuiltResponse]:
+        """
+        Render and compress every page.
+
+        :return: pages by name.
+        """
+        started = time.perf_counter()
+        title = self.app.title
+        openapi = ujson.dumps(self.app.openapi(), ensure_ascii=False).encode()
+        swagger = get_swagger_ui_html(
+            openapi_url=OPENAPI_URL,
+            title=f"{title} - Swagger UI",
+            oauth2_redirect_url=self.app.url_path_for("swagger_ui_redirect"),
+            swagger_js_url=static_url("docs/swagger-ui-bundle.js"),
+            swagger_css_url=static_url("docs/swagger-ui.css"),
+        )
+        redoc = get_redoc_html(
+            openapi_url=OPENAPI_URL,
+            title=f"{title} - ReDoc",
+            redoc_js_url=static_url("docs/redoc.standalone.js"),
+        )
+
+        cache_control = settings.docs_cache_control
+        self._pages = {
+            "openapi": PrebuiltResponse(openapi, "application/json", cache_control),
+            "swagger": PrebuiltResponse(swagger.body, "text/html", cache_control),
+            "swagger_redirect": PrebuiltResponse(
+                get_swagger_ui_oauth2_redirect_html().body,
+                "text/html",
+                cache_control,
+            ),
+            "redoc": PrebuiltResponse(redoc.body, "text/html", cache_control),
+        }
+        logger.info(
+            "Startup phase docs build took %.1f ms",
+            (time.perf_counter() - started) * 1000,
+        )
+        return self._pages
+
+    def get(self, name: str) -> PrebuiltResponse:
+        """
+        Get a page, building the pages if needed.
+
+        :param name: "openapi", "swagger", "swagger_redirect" or "redoc".
+        :return: the page.
+        """
+        pages = self._pages
+        if pages is None:
+            pages = self.build()
+        return pages[name]
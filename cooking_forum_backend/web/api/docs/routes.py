@@ -1,53 +1,48 @@
 from fastapi import APIRouter, Request
-from fastapi.openapi.docs import (
-    get_redoc_html,
-    get_swagger_ui_html,
-    get_swagger_ui_oauth2_redirect_html,
-)
-from fastapi.responses import HTMLResponse
+from fastapi.responses import Response
 
 router = APIRouter()
 
 
+@router.get("/openapi.json", include_in_schema=False)
+async def openapi(request: Request) -> Response:
+    """
+    OpenAPI document.
+
+    :param request: current request.
+    :return: prebuilt OpenAPI document.
+    """
+    return request.app.state.docs.get("openapi").response(request)
+
+
 @router.get("/docs", include_in_schema=False)
-async def swagger_ui_html(request: Request) -> HTMLResponse:
+async def swagger_ui_html(request: Request) -> Response:
     """
     Swagger UI.
 
     :param request: current request.
-    :return: rendered swagger UI.
+    :return: prebuilt swagger UI.
     """
-    title = request.app.title
-    return get_swagger_ui_html(
-        openapi_url=request.app.openapi_url,
-        title=f"{title} - Swagger UI",
-        oauth2_redirect_url=str(request.url_for("swagger_ui_redirect")),
-        swagger_js_url="/static/docs/swagger-ui-bundle.js",
-        swagger_css_url="/static/docs/swagger-ui.css",
-    )
+    return request.app.state.docs.get("swagger").response(request)
 
 
 @router.get("/swagger-redirect", include_in_schema=False)
-async def swagger_ui_redirect() -> HTMLResponse:
+async def swagger_ui_redirect(request: Request) -> Response:
     """
     Redirect to swagger.
 
+    :param request: current request.
     :return: redirect.
     """
-    return get_swagger_ui_oauth2_redirect_html()
+    return request.app.state.docs.get("swagger_redirect").response(request)
 
 
 @router.get("/redoc", include_in_schema=False)
-async def redoc_html(request: Request) -> HTMLResponse:
+async def redoc_html(request: Request) -> Response:
     """
     Redoc UI.
 
     :param request: current request.
-    :return: rendered redoc UI.
-    """
-    title = request.app.title
-    return get_redoc_html(
-        openapi_url=request.app.openapi_url,
-        title=f"{title} - ReDoc",
-        redoc_js_url="/static/docs/redoc.standalone.js",
-    )
+    :return: prebuilt redoc UI.
+    """
+    return request.app.state.docs.get("redoc").response(request)
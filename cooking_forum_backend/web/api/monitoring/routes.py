@@ -1,8 +1,47 @@
-from fastapi import APIRouter
+import hmac
+from typing import Annotated, Any, Dict, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from cooking_forum_backend.db.instrumentation import orm_stats, statement_cache_stats
+from cooking_forum_backend.services.memory import (
+    NoSnapshotError,
+    memory_gauges,
+    tracemalloc_snapshots,
+)
+from cooking_forum_backend.services.profiler import (
+    MAX_INTERVAL,
+    MAX_SECONDS,
+    MIN_INTERVAL,
+    ProfilerBusyError,
+    profile,
+    profile_workers,
+)
+from cooking_forum_backend.settings import settings
 
 router = APIRouter()
 
 
+def require_admin_token(
+    x_admin_token: Annotated[Optional[str], Header()] = None,
+) -> None:
+    """
+    Let only the requests with the admin token through.
+
+    :param x_admin_token: token sent by the client.
+    :raises HTTPException: 404 if no admin token is configured, 403 if
+        the token is missing or wrong.
+    """
+    if settings.admin_token is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if x_admin_token is None or not hmac.compare_digest(
+        x_admin_token.encode(),
+        settings.admin_token.encode(),
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+
 @router.get("/health")
 def health_check() -> None:
     """
@@ -10,3 +49,120 @@ def health_check() -> None:
 
     It returns 200 if the project is healthy.
     """
+
+
+@router.get("/metrics")
+async def metrics() -> Dict[str, Any]:
+    """
+    Counters of the worker handling the request.
+
+    ``statement_cache`` counts the lookups of SQLAlchemy's compiled
+    statement cache since the worker started. ``memory`` has the RSS and
+    heap gauges, ``orm`` the live model instances and request sessions,
+    with the size of their identity maps.
+
+    It runs on the event loop, like the requests adding sessions, so the
+    weak sets aren't iterated while they change. Every read is cheap.
+
+    :return: counters by name.
+    """
+    return {
+        "statement_cache": statement_cache_stats.snapshot(),
+        "memory": memory_gauges(),
+        "orm": orm_stats.snapshot(),
+    }
+
+
+@router.post("/memory/snapshot", dependencies=[Depends(require_admin_token)])
+def take_memory_snapshot() -> Dict[str, Any]:
+    """
+    Take the tracemalloc snapshot of the worker that diffs compare to.
+
+    Tracing starts with the first snapshot and goes on, slowing down
+    allocations, until ``DELETE /api/memory/snapshot``.
+
+    :return: tracing gauges.
+    """
+    return tracemalloc_snapshots.take_baseline(settings.tracemalloc_frames)
+
+
+@router.get("/memory/diff", dependencies=[Depends(require_admin_token)])
+def diff_memory_snapshot(
+    limit: Annotated[int, Query(ge=1, le=500)] = 20,
+    cumulative: bool = False,
+) -> Dict[str, Any]:
+    """
+    Allocations of the worker grown since the snapshot, by module.
+
+    :param limit: number of modules, largest changes first.
+    :param cumulative: count allocations in every module of their
+        traceback, and not only in the module allocating.
+    :raises HTTPException: 409 if no snapshot was taken.
+    :return: the modules and totals.
+    """
+    try:
+        return tracemalloc_snapshots.diff(limit, cumulative)
+    except NoSnapshotError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Take a snapshot first",
+        )
+
+
+@router.delete(
+    "/memory/snapshot",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_admin_token)],
+)
+def stop_memory_tracing() -> None:
+    """Stop tracemalloc in the worker and drop its snapshot."""
+    tracemalloc_snapshots.stop()
+
+
+@router.get(
+    "/profile",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_admin_token)],
+)
+async def profile_worker(
+    seconds: Annotated[float, Query(gt=0, le=MAX_SECONDS)] = 10,
+    interval_ms: Annotated[
+        float,
+        Query(ge=MIN_INTERVAL * 1000, le=MAX_INTERVAL * 1000),
+    ] = settings.profiler_interval_ms,
+    workers: Literal["self", "all"] = "self",
+) -> PlainTextResponse:
+    """
+    Sample the stacks of the worker for a while.
+
+    The profile is returned in the collapsed format of flamegraph.pl and
+    speedscope. Stacks of the event loop thread are under ``[running]``,
+    the await chains of the suspended tasks under ``[awaiting]``.
+
+    With ``workers=all`` the other workers of the gunicorn arbiter are
+    profiled as well, and every stack starts with ``worker <pid>``.
+
+    :param seconds: duration of the profile.
+    :param interval_ms: milliseconds between two samples.
+    :param workers: profile only this worker, or all of them.
+    :raises HTTPException: 409 if a profile is already running.
+    :return: the collapsed stacks.
+    """
+    interval = interval_ms / 1000
+    try:
+        if workers == "self":
+            return PlainTextResponse(await profile(seconds, interval))
+        profiles = await profile_workers(settings.profiler_dir, seconds, interval)
+    except ProfilerBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running in this worker",
+        )
+    return PlainTextResponse(
+        "".join(
+            f"worker {pid};{line}\n"
+            for pid, collapsed in sorted(profiles.items())
+            for line in collapsed.splitlines()
+        ),
+        headers={"X-Profiled-Workers": ",".join(map(str, sorted(profiles)))},
+    )
@@ -0,0 +1,4 @@
+"""Recipes API."""
+from cooking_forum_backend.web.api.recipes.routes import router
+
+__all__ = ["router"]
@@ -0,0 +1,102 @@
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.param_functions import Depends
+
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.db.repositories.recipe_repository import RecipeRepository
+from cooking_forum_backend.web.api.auth.routes import get_current_user
+from cooking_forum_backend.web.api.cursors import decode_cursor, encode_cursor
+from cooking_forum_backend.web.api.recipes.schema import (
+    RecipeDTO,
+    RecipeInputDTO,
+    RecipeSearchHitDTO,
+    RecipeSearchPageDTO,
+)
+
+router = APIRouter()
+
+
+@router.post(
+    "/recipes",
+    summary="Post a recipe",
+    response_model=RecipeDTO,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_recipe(
+    new_recipe: RecipeInputDTO,
+    current_user: Annotated[UserModel, Depends(get_current_user)],
+    recipe_repository: Annotated[RecipeRepository, Depends()],
+):
+    recipe = await recipe_repository.create_recipe(
+        author_id=current_user.id,
+        title=new_recipe.title,
+        ingredients=new_recipe.ingredients,
+        instructions=new_recipe.instructions,
+    )
+
+    return RecipeDTO.model_validate(recipe)
+
+
+@router.get(
+    "/recipes/search",
+    summary="Search recipes, best matches first. Supports \"phrases\", or and -word",
+    response_model=RecipeSearchPageDTO,
+)
+async def search_recipes(
+    recipe_repository: Annotated[RecipeRepository, Depends()],
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: Optional[str] = None,
+):
+    """
+    Ranked full-text search of the recipes.
+
+    :param q: search query.
+    :param limit: hits per page, defaults to 20.
+    :param cursor: next_cursor of the previous page.
+    :param recipe_repository: DAO for recipe models.
+    :return: page of hits.
+    """
+    after = decode_cursor(cursor, float, int) if cursor else None
+    hits = await recipe_repository.search(q, limit=limit, after=after)
+
+    next_cursor = None
+    if len(hits) == limit:
+        last_recipe, last_rank, _ = hits[-1]
+        # repr() round-trips the rank exactly
+        next_cursor = encode_cursor(repr(last_rank), str(last_recipe.id))
+
+    return RecipeSearchPageDTO(
+        results=[
+            RecipeSearchHitDTO(
+                id=recipe.id,
+                author_id=recipe.author_id,
+                title=recipe.title,
+                snippet=snippet,
+                rank=rank,
+                created_at=recipe.created_at,
+            )
+            for recipe, rank, snippet in hits
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/recipes/{recipe_id}",
+    summary="Get a recipe",
+    response_model=RecipeDTO,
+)
+async def get_recipe(
+    recipe_id: int,
+    recipe_repository: Annotated[RecipeRepository, Depends()],
+):
+    recipe = await recipe_repository.get_by_id(recipe_id)
+    if recipe is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recipe not found",
+        )
+
+    return RecipeDTO.model_validate(recipe)
@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class RecipeInputDTO(BaseModel):
+    """DTO to create recipe models from input."""
+
+    title: str = Field(min_length=1, max_length=200)
+    ingredients: str
+    instructions: str
+
+
+class RecipeDTO(BaseModel):
+    """
+    DTO for recipe models.
+
+    It returned when accessing recipe models from the API.
+    """
+
+    id: int
+    author_id: int
+    title: str
+    ingredients: str
+    instructions: str
+    created_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RecipeSearchHitDTO(BaseModel):
+    """DTO for a recipe found by a search, with the matches highlighted."""
+
+    id: int
+    author_id: int
+    title: str
+    snippet: str
+    rank: float
+    created_at: datetime
+
+
+class RecipeSearchPageDTO(BaseModel):
+    """DTO for a page of search hits."""
+
+    results: List[RecipeSearchHitDTO]
+    # Pass it as cursor to get the next page, None on the last page
+    next_cursor: Optional[str] = None
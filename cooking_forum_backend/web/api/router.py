@@ -1,8 +1,12 @@
 from fastapi.routing import APIRouter
 
-from cooking_forum_backend.web.api import docs, auth, monitoring
+from cooking_forum_backend.settings import settings
+from cooking_forum_backend.web.api import docs, auth, monitoring, recipes, threads
 
 api_router = APIRouter()
-api_router.include_router(docs.router)
+if settings.docs_enabled:
+    api_router.include_router(docs.router)
 api_router.include_router(auth.router)
 api_router.include_router(monitoring.router)
+api_router.include_router(recipes.router)
+api_router.include_router(threads.router)
@@ -0,0 +1,4 @@
+"""Forum threads API."""
+from cooking_forum_backend.web.api.threads.routes import router
+
+__all__ = ["router"]
@@ -0,0 +1,149 @@
+from datetime import datetime
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.param_functions import Depends
+
+from cooking_forum_backend.db.models.user_model import UserModel
+from cooking_forum_backend.db.repositories.thread_repository import ThreadRepository
+from cooking_forum_backend.web.api.auth.routes import get_current_user
+from cooking_forum_backend.web.api.cursors import decode_cursor, encode_cursor
+from cooking_forum_backend.web.api.threads.schema import (
+    PostDTO,
+    PostInputDTO,
+    PostPageDTO,
+    ThreadDTO,
+    ThreadFeedPageDTO,
+    ThreadInputDTO,
+)
+
+router = APIRouter()
+
+thread_not_found = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND,
+    detail="Thread not found",
+)
+
+
+@router.post(
+    "/threads",
+    summary="Start a thread",
+    response_model=ThreadDTO,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_thread(
+    new_thread: ThreadInputDTO,
+    current_user: Annotated[UserModel, Depends(get_current_user)],
+    thread_repository: Annotated[ThreadRepository, Depends()],
+):
+    thread = await thread_repository.create_thread(
+        author_id=current_user.id,
+        title=new_thread.title,
+        body=new_thread.body,
+    )
+
+    return ThreadDTO.model_validate(thread)
+
+
+@router.get(
+    "/threads",
+    summary="Threads by latest activity",
+    response_model=ThreadFeedPageDTO,
+)
+async def get_feed(
+    thread_repository: Annotated[ThreadRepository, Depends()],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: Optional[str] = None,
+):
+    """
+    Front page feed, the most recently active threads first.
+
+    :param limit: threads per page, defaults to 20.
+    :param cursor: next_cursor of the previous page.
+    :param thread_repository: DAO for thread models.
+    :return: page of threads.
+    """
+    after = decode_cursor(cursor, datetime.fromisoformat, int) if cursor else None
+    threads = await thread_repository.get_feed(limit=limit, after=after)
+
+    next_cursor = None
+    if len(threads) == limit:
+        last = threads[-1]
+        next_cursor = encode_cursor(last.last_activity_at.isoformat(), str(last.id))
+
+    return ThreadFeedPageDTO(
+        results=[ThreadDTO.model_validate(thread) for thread in threads],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/threads/{thread_id}",
+    summary="Get a thread",
+    response_model=ThreadDTO,
+)
+async def get_thread(
+    thread_id: int,
+    thread_repository: Annotated[ThreadRepository, Depends()],
+):
+    thread = await thread_repository.get_by_id(thread_id)
+    if thread is None:
+        raise thread_not_found
+
+    return ThreadDTO.model_validate(thread)
+
+
+@router.post(
+    "/threads/{thread_id}/posts",
+    summary="Reply in a thread",
+    response_model=PostDTO,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_post(
+    thread_id: int,
+    new_post: PostInputDTO,
+    current_user: Annotated[UserModel, Depends(get_current_user)],
+    thread_repository: Annotated[ThreadRepository, Depends()],
+):
+    post = await thread_repository.create_post(
+        thread_id=thread_id,
+        author_id=current_user.id,
+        body=new_post.body,
+    )
+    if post is None:
+        raise thread_not_found
+
+    return PostDTO.model_validate(post)
+
+
+@router.get(
+    "/threads/{thread_id}/posts",
+    summary="Posts of a thread, oldest first",
+    response_model=PostPageDTO,
+)
+async def get_posts(
+    thread_id: int,
+    thread_repository: Annotated[ThreadRepository, Depends()],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: Optional[str] = None,
+):
+    """
+    Posts of a thread.
+
+    :param thread_id: id of the thread.
+    :param limit: posts per page, defaults to 20.
+    :param cursor: next_cursor of the previous page.
+    :param thread_repository: DAO for thread models.
+    :return: page of posts.
+    """
+    after_id = decode_cursor(cursor, int)[0] if cursor else None
+    posts = await thread_repository.get_posts(thread_id, limit=limit, after_id=after_id)
+
+    next_cursor = None
+    if len(posts) == limit:
+        next_cursor = encode_cursor(str(posts[-1].id))
+
+    return PostPageDTO(
+        results=[PostDTO.model_validate(post) for post in posts],
+        next_cursor=next_cursor,
+    )
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ThreadInputDTO(BaseModel):
+    """DTO to create a thread and its first post from input."""
+
+    title: str = Field(min_length=1, max_length=200)
+    body: str = Field(min_length=1)
+
+
+class PostInputDTO(BaseModel):
+    """DTO to create post models from input."""
+
+    body: str = Field(min_length=1)
+
+
+class ThreadDTO(BaseModel):
+    """
+    DTO for thread models.
+
+    It returned when accessing thread models from the API.
+    """
+
+    id: int
+    author_id: int
+    title: str
+    post_count: int
+    created_at: datetime
+    last_activity_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PostDTO(BaseModel):
+    """
+    DTO for post models.
+
+    It returned when accessing post models from the API.
+    """
+
+    id: int
+    thread_id: int
+    author_id: int
+    body: str
+    created_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ThreadFeedPageDTO(BaseModel):
+    """DTO for a page of the threads feed."""
+
+    results: List[ThreadDTO]
+    # Pass it as cursor to get the next page, None on the last page
+    next_cursor: Optional[str] = None
+
+
+class PostPageDTO(BaseModel):
+    """DTO for a page of the posts of a thread."""
+
+    results: List[PostDTO]
+    # Pass it as cursor to get the next page, None on the last page
+    next_cursor: Optional[str] = None
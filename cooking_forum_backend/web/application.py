@@ -1,17 +1,30 @@
 from importlib import metadata
-from pathlib import Path
 
 from fastapi import FastAPI
-from fastapi.responses import UJSONResponse
-from fastapi.staticfiles import StaticFiles
 
+from cooking_forum_backend.db import instrumentation  # noqa: F401
+from cooking_forum_backend.services.background import BackgroundTaskGroup
+from cooking_forum_backend.services.token_revocation import TokenRevocationSet
+from cooking_forum_backend.settings import settings
+from cooking_forum_backend.web.api.docs.pages import DocsPages
 from cooking_forum_backend.web.api.router import api_router
 from cooking_forum_backend.web.lifetime import (
     register_shutdown_event,
     register_startup_event,
 )
-
-APP_ROOT = Path(__file__).parent.parent
+from cooking_forum_backend.web.middleware.compression import CompressionMiddleware
+from cooking_forum_backend.web.middleware.correlation import CorrelationIdMiddleware
+from cooking_forum_backend.web.middleware.drain import (
+    InFlightMiddleware,
+    InFlightTracker,
+)
+from cooking_forum_backend.web.middleware.server_timing import ServerTimingMiddleware
+from cooking_forum_backend.web.middleware.tracing import TracingMiddleware
+from cooking_forum_backend.web.responses import TimedUJSONResponse
+from cooking_forum_backend.web.static_files import (
+    STATIC_DIR,
+    PrecompressedStaticFiles,
+)
 
 
 def get_app() -> FastAPI:
@@ -27,8 +40,38 @@ def get_app() -> FastAPI:
         version=metadata.version("cooking_forum_backend"),
         docs_url=None,
         redoc_url=None,
-        openapi_url="/api/openapi.json",
-        default_response_class=UJSONResponse,
+        # Served prebuilt by the docs router.
+        openapi_url=None,
+        default_response_class=TimedUJSONResponse,
+    )
+
+    app.state.token_revocations = TokenRevocationSet(
+        sync_interval=settings.jwt_revocation_sync_seconds,
+    )
+    app.state.in_flight = InFlightTracker()
+    app.state.background_tasks = BackgroundTaskGroup()
+    app.state.docs = DocsPages(app)
+
+    app.add_middleware(InFlightMiddleware, tracker=app.state.in_flight)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        content_types=settings.compression_content_types,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+        exclude_prefixes=("/static/",),
+    )
+    # Outside of the drain, so requests rejected while draining are logged too.
+    app.add_middleware(
+        ServerTimingMiddleware,
+        send_header=settings.server_timing_header,
+        access_log_sample_rate=settings.access_log_sample_rate,
+    )
+    app.add_middleware(TracingMiddleware)
+    # Around the access log and the root span, so they carry the id too.
+    app.add_middleware(
+        CorrelationIdMiddleware,
+        header_name=settings.request_id_header,
     )
 
     # Adds startup and shutdown events.
@@ -41,7 +84,10 @@ def get_app() -> FastAPI:
     # This directory is used to access swagger files.
     app.mount(
         "/static",
-        StaticFiles(directory=APP_ROOT / "static"),
+        PrecompressedStaticFiles(
+            directory=STATIC_DIR,
+            versioned_cache_control=settings.static_cache_control,
+        ),
         name="static",
     )
 
@@ -0,0 +1,57 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+from starlette import status
+from starlette.responses import Response
+
+# OpenAPI description of the 304 of routes sending ETags.
+NOT_MODIFIED_RESPONSE: Dict[int, Dict[str, Any]] = {
+    status.HTTP_304_NOT_MODIFIED: {
+        "description": "Not modified, If-None-Match matched the ETag",
+    },
+}
+
+
+def weak_etag(*parts: object) -> str:
+    """
+    Build a weak ETag from the versions of what a response shows.
+
+    :param parts: values changing whenever the response does, such as ids
+        and timestamps of immutable rows.
+    :return: ETag header value.
+    """
+    digest = hashlib.blake2b(
+        "\x1f".join(str(part) for part in parts).encode(),
+        digest_size=12,
+    )
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header, with the weak comparison of RFC 9110.
+
+    :param if_none_match: header value, None when missing.
+    :param etag: current ETag.
+    :return: whether the client already has the current representation.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque_tag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """
+    Build a 304 response.
+
+    :param headers: ETag and caching headers, repeated on 304 responses.
+    :return: empty response.
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -1,12 +1,28 @@
+import logging
+import time
 from typing import Awaitable, Callable
 
 from fastapi import FastAPI
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
-
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from cooking_forum_backend.db.capabilities import Capability, supports
+from cooking_forum_backend.db.engine import create_db_engine
+from cooking_forum_backend.db.meta import meta
+from cooking_forum_backend.db.models import load_all_models
+from cooking_forum_backend.db.warmup import warm_up_pool
+from cooking_forum_backend.log import configure_logging, stop_logging
+from cooking_forum_backend.services.profiler import (
+    install_profile_signal,
+    remove_profile_signal,
+)
+from cooking_forum_backend.services.tracing import configure_tracing, shutdown_tracing
 from cooking_forum_backend.settings import settings
 
+# uvicorn routes this logger to gunicorn's error log in workers.
+logger = logging.getLogger("uvicorn.error")
+
 
-def _setup_db(app: FastAPI) -> None:  # pragma: no cover
+async def _setup_db(app: FastAPI) -> None:  # pragma: no cover
     """
     Creates connection to the database.
 
@@ -14,9 +30,19 @@ def _setup_db(app: FastAPI) -> None:  # pragma: no cover
     session_factory for creating sessions
     and stores them in the application's state property.
 
+    It runs on startup of every worker, after gunicorn forked it,
+    so connections are never shared between processes. With
+    ``db_warmup_connections`` set, that many connections are opened
+    and their hot statements prepared before the worker takes requests.
+
     :param app: fastAPI application.
     """
-    engine = create_async_engine(str(settings.db_url), echo=settings.db_echo)
+    started = time.perf_counter()
+    engine = create_db_engine(
+        echo=settings.db_echo,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+    )
     session_factory = async_sessionmaker(
         engine,
         expire_on_commit=False,
@@ -24,6 +50,34 @@ def _setup_db(app: FastAPI) -> None:  # pragma: no cover
     app.state.db_engine = engine
     app.state.db_session_factory = session_factory
 
+    # Fail fast on a wrong configuration and keep the connection pooled.
+    async with engine.connect():
+        pass  # noqa: WPS420
+    if settings.db_driver == "sqlite" and settings.db_file is None:
+        # An in-memory database starts empty, there's nothing to migrate.
+        load_all_models()
+        async with engine.begin() as conn:
+            await conn.run_sync(meta.create_all)
+    logger.info(
+        "Startup phase DB connect took %.1f ms",
+        (time.perf_counter() - started) * 1000,
+    )
+
+    # Overflow connections are closed when returned, don't warm them up.
+    # Nothing is kept behind a pooler: connections nor prepared statements.
+    warmup_connections = min(settings.db_warmup_connections, settings.db_pool_size)
+    if (
+        warmup_connections > 0
+        and not settings.db_pooler_mode
+        and supports(engine.dialect.name, Capability.PREPARED_STATEMENTS)
+    ):
+        elapsed = await warm_up_pool(engine, warmup_connections)
+        logger.info(
+            "Startup phase DB warm-up of %d connections took %.1f ms",
+            warmup_connections,
+            elapsed * 1000,
+        )
+
 
 def register_startup_event(
     app: FastAPI,
@@ -40,8 +94,28 @@ def register_startup_event(
 
     @app.on_event("startup")
     async def _startup() -> None:  # noqa: WPS430
+        # First, in the worker: the log writer thread doesn't survive a fork.
+        configure_logging(
+            settings.log_level.value,
+            log_format=settings.log_format,
+            queue_size=settings.log_queue_size,
+        )
+        configure_tracing(
+            settings.tracing_exporter,
+            settings.tracing_sample_rate,
+            file_path=settings.tracing_file,
+            otlp_endpoint=settings.tracing_otlp_endpoint,
+            queue_size=settings.tracing_queue_size,
+        )
+        install_profile_signal(
+            settings.profiler_dir,
+            settings.profiler_signal_seconds,
+            settings.profiler_interval_ms / 1000,
+        )
         app.middleware_stack = None
-        _setup_db(app)
+        await _setup_db(app)
+        if settings.docs_enabled:
+            app.state.docs.build()
         app.middleware_stack = app.build_middleware_stack()
         pass  # noqa: WPS420
 
@@ -54,14 +128,21 @@ def register_shutdown_event(
     """
     Actions to run on application's shutdown.
 
+    Requests are drained before, by the worker's ``DrainingServer``.
+    Background tasks get up to ``shutdown_drain_seconds`` to complete.
+
     :param app: fastAPI application.
     :return: function that actually performs actions.
     """
 
     @app.on_event("shutdown")
     async def _shutdown() -> None:  # noqa: WPS430
-        await app.state.db_engine.dispose()
+        # Background tasks use the connections, let them finish first.
+        await app.state.background_tasks.shutdown(settings.shutdown_drain_seconds)
 
-        pass  # noqa: WPS420
+        await app.state.db_engine.dispose()
+        remove_profile_signal()
+        shutdown_tracing()
+        stop_logging()
 
     return _shutdown
@@ -0,0 +1 @@
+"""ASGI middlewares of the application."""
@@ -0,0 +1,176 @@
+import zlib
+from typing import Dict, List, Optional, Protocol, Sequence
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cooking_forum_backend.services.timing import measure
+
+# Preferred first, when the client accepts both with the same weight.
+ENCODINGS = ("br", "gzip")
+
+
+class _Compressor(Protocol):
+    def compress(self, chunk: bytes) -> bytes:
+        """Compress a chunk, may return nothing while buffering."""
+
+    def flush(self) -> bytes:
+        """Flush the end of the stream."""
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _gzip_compressor(level: int) -> _Compressor:
+    # wbits 16 + MAX_WBITS writes the gzip header and trailer.
+    return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """
+    Supported encodings accepted by a client, preferred first.
+
+    :param accept_encoding: Accept-Encoding header value, may be empty.
+    :return: "br" and "gzip", in order of preference, when accepted.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0
+        weights[coding.strip().lower()] = weight
+
+    accepted = [
+        encoding
+        for encoding in ENCODINGS
+        if weights.get(encoding, weights.get("*", 0)) > 0
+    ]
+    # sorted() is stable, brotli stays first on equal weights.
+    return sorted(
+        accepted,
+        key=lambda encoding: -weights.get(encoding, weights.get("*", 0)),
+    )
+
+
+class CompressionMiddleware:
+    """
+    Compresses dynamic responses with brotli or gzip.
+
+    The encoding is picked from Accept-Encoding, brotli first. Responses
+    smaller than ``minimum_size``, of a type not in ``content_types``, or
+    already encoded are sent as they are. Paths under ``exclude_prefixes``
+    are never compressed here: static files are served precompressed.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Sequence[str] = ("application/json", "text/"),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        exclude_prefixes: Sequence[str] = (),
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.exclude_prefixes = tuple(exclude_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        encodings = accepted_encodings(
+            Headers(scope=scope).get("accept-encoding", ""),
+        )
+        if not encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = encodings[0]
+
+        start_message: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:  # noqa: WPS430, WPS231
+            nonlocal start_message, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Held until the first body chunk tells the response size.
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not self._should_compress(start_message, body, more_body):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = self._compressor(encoding)
+                headers = MutableHeaders(scope=start_message)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                del headers["Content-Length"]  # noqa: WPS420
+                if not more_body:
+                    with measure("compress"):
+                        body = compressor.compress(body) + compressor.flush()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start_message)
+
+            with measure("compress"):
+                body = compressor.compress(body)
+                if not more_body:
+                    body += compressor.flush()
+            await send(
+                {"type": "http.response.body", "body": body, "more_body": more_body},
+            )
+
+        await self.app(scope, receive, send_compressed)
+
+    def _should_compress(self, start: Message, body: bytes, more_body: bool) -> bool:
+        if start["status"] < 200 or start["status"] in {204, 206, 304}:
+            return False
+
+        headers = Headers(raw=start["headers"])
+        if "content-encoding" in headers:
+            return False
+        if not headers.get("content-type", "").startswith(self.content_types):
+            return False
+
+        if more_body:
+            size = headers.get("content-length")
+            return size is None or int(size) >= self.minimum_size
+        return len(body) >= self.minimum_size
+
+    def _compressor(self, encoding: str) -> _Compressor:
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _gzip_compressor(self.gzip_level)
@@ -0,0 +1,44 @@
+import re
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cooking_forum_backend.log import correlation_id
+
+# Ids sent by clients or proxies are kept if they can't mangle a log line.
+VALID_ID = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+
+class CorrelationIdMiddleware:
+    """
+    Gives every request a correlation id, found in all its log records.
+
+    The id comes from the request header when a proxy or the client
+    already set a valid one, it's generated otherwise, and is sent back
+    in the same response header.
+    """
+
+    def __init__(self, app: ASGIApp, header_name: str = "X-Request-ID") -> None:
+        self.app = app
+        self.header_name = header_name
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(self.header_name, "")
+        if not VALID_ID.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+
+        async def send_with_id(message: Message) -> None:  # noqa: WPS430
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[self.header_name] = request_id
+            await send(message)
+
+        token = correlation_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            correlation_id.reset(token)
@@ -0,0 +1,78 @@
+import asyncio
+from typing import Optional
+
+from starlette import status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class InFlightTracker:
+    """Counts the requests being handled by this worker."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.draining = False
+        self._idle: Optional[asyncio.Event] = None
+
+    def enter(self) -> None:
+        self.count += 1
+
+    def exit(self) -> None:
+        self.count -= 1
+        if self.count == 0 and self._idle is not None:
+            self._idle.set()
+
+    def start_draining(self) -> None:
+        """Reject every new request from now on."""
+        self.draining = True
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """
+        Wait for the requests in flight to complete.
+
+        :param timeout: maximum seconds to wait.
+        :return: True if no request is left in flight.
+        """
+        if self.count == 0:
+            return True
+
+        self._idle = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class InFlightMiddleware:
+    """
+    Tracks requests in flight and rejects new ones while draining.
+
+    Rejected requests get a 503 with ``Connection: close``, so load
+    balancers retry them on another instance. Health checks are
+    rejected as well, which takes the worker out of rotation.
+    """
+
+    def __init__(self, app: ASGIApp, tracker: InFlightTracker) -> None:
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self.tracker.draining:
+            response = JSONResponse(
+                {"detail": "Server is shutting down"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "1", "Connection": "close"},
+            )
+            await response(scope, receive, send)
+            return
+
+        self.tracker.enter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.tracker.exit()
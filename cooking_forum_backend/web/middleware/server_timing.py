@@ -0,0 +1,94 @@
+import logging
+import random
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cooking_forum_backend.services.timing import RequestTimings, request_timings
+
+access_logger = logging.getLogger("cooking_forum_backend.access")
+
+
+class ServerTimingMiddleware:
+    """
+    Breaks down the time spent on every request.
+
+    DB, crypto and serialization spans are collected for the request
+    and sent in the ``Server-Timing`` header, then written with the total
+    time in the access log once the response is complete. Only a
+    ``access_log_sample_rate`` share of the 2xx responses is logged,
+    every other status always is.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        send_header: bool = True,
+        access_log_sample_rate: float = 1,
+    ) -> None:
+        self.app = app
+        self.send_header = send_header
+        self.access_log_sample_rate = access_log_sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        status_code = 500
+
+        async def send_with_timings(message: Message) -> None:  # noqa: WPS430
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.send_header:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing",
+                        timings.header(time.perf_counter() - started),
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            request_timings.reset(token)
+            if self._sampled(status_code):
+                self._log(scope, status_code, started, timings)
+
+    def _sampled(self, status_code: int) -> bool:
+        if not 200 <= status_code < 300:  # noqa: WPS432
+            return True
+        return random.random() < self.access_log_sample_rate  # noqa: S311
+
+    def _log(
+        self,
+        scope: Scope,
+        status_code: int,
+        started: float,
+        timings: RequestTimings,
+    ) -> None:
+        client = scope.get("client")
+        client_address = f"{client[0]}:{client[1]}" if client else "-"
+        duration_ms = (time.perf_counter() - started) * 1000
+        access_logger.info(
+            '%s - "%s %s HTTP/%s" %d total=%.1fms %s',
+            client_address,
+            scope["method"],
+            scope["path"],
+            scope["http_version"],
+            status_code,
+            duration_ms,
+            timings.summary(),
+            extra={
+                "client": client_address,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(duration_ms, 1),
+                "timings_ms": timings.milliseconds(),
+            },
+        )
@@ -0,0 +1,69 @@
+from typing import Any, Callable, Dict
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cooking_forum_backend.log import correlation_id
+from cooking_forum_backend.services.tracing import KIND_SERVER, get_tracer, start_span
+
+
+class TracingMiddleware:
+    """
+    Opens the root span of the sampled requests.
+
+    The span is named after the route template once the request is
+    routed, e.g. ``GET /api/recipes/{recipe_id}``. A ``traceparent``
+    header continues the caller's trace, and its sampled flag is followed.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._routes: Dict[Callable[..., Any], str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        tracer = get_tracer()
+        if scope["type"] != "http" or tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        parent = tracer.sampled(Headers(scope=scope).get("traceparent"))
+        if parent is None:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        attributes = {"http.request.method": method, "url.path": scope["path"]}
+        request_id = correlation_id.get()
+        if request_id is not None:
+            attributes["correlation_id"] = request_id
+        with start_span(method, KIND_SERVER, attributes, parent=parent) as span:
+
+            async def send_with_status(message: Message) -> None:  # noqa: WPS430
+                if message["type"] == "http.response.start":
+                    span.set_attribute(  # type: ignore
+                        "http.response.status_code",
+                        message["status"],
+                    )
+                    if message["status"] >= 500:  # noqa: WPS432
+                        span.error = f"HTTP {message['status']}"  # type: ignore
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = self._route(scope)
+                if route is not None:
+                    span.name = f"{method} {route}"  # type: ignore
+                    span.set_attribute("http.route", route)  # type: ignore
+
+    def _route(self, scope: Scope) -> Any:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return None
+        if not self._routes and "app" in scope:
+            self._routes = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self._routes.get(endpoint)
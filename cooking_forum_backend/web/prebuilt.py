@@ -0,0 +1,54 @@
+import gzip
+import hashlib
+from typing import Dict, Optional
+
+import brotli
+from starlette.requests import Request
+from starlette.responses import Response
+
+from cooking_forum_backend.web.conditional import etag_matches, not_modified, weak_etag
+from cooking_forum_backend.web.middleware.compression import accepted_encodings
+
+
+class PrebuiltResponse:
+    """
+    Response body encoded and compressed once, then sent as it is.
+
+    The brotli and gzip variants are built with the highest settings,
+    since it only happens once per worker.
+    """
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str) -> None:
+        self.media_type = media_type
+        self.etag = weak_etag(hashlib.blake2b(body).hexdigest())
+        self.headers = {
+            "ETag": self.etag,
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        self.bodies: Dict[Optional[str], bytes] = {
+            None: body,
+            "br": brotli.compress(body, quality=11),
+            "gzip": gzip.compress(body, compresslevel=9, mtime=0),
+        }
+
+    def response(self, request: Request) -> Response:
+        """
+        Send the body in the encoding accepted by a client.
+
+        :param request: current request.
+        :return: the response, a 304 when If-None-Match matches.
+        """
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return not_modified(self.headers)
+
+        encodings = accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding = encodings[0] if encodings else None
+        headers = dict(self.headers)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(
+            content=self.bodies[encoding],
+            media_type=self.media_type,
+            headers=headers,
+        )
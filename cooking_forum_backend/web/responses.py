@@ -0,0 +1,13 @@
+from typing import Any
+
+from fastapi.responses import UJSONResponse
+
+from cooking_forum_backend.services.timing import measure
+
+
+class TimedUJSONResponse(UJSONResponse):
+    """UJSONResponse reporting its encoding time as serialization."""
+
+    def render(self, content: Any) -> bytes:
+        with measure("serialize"):
+            return super().render(content)
@@ -0,0 +1,152 @@
+"""
+Static files served precompressed.
+
+Run ``python -m cooking_forum_backend.web.static_files`` when building
+the image to write the ``.br`` and ``.gz`` siblings of the static files.
+"""
+import argparse
+import gzip
+import hashlib
+import mimetypes
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import brotli
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, PathLike, StaticFiles
+from starlette.types import Scope
+
+from cooking_forum_backend.web.middleware.compression import accepted_encodings
+
+STATIC_DIR = Path(__file__).parent.parent / "static"
+SIBLING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+COMPRESSIBLE_SUFFIXES = frozenset(
+    (".css", ".html", ".js", ".json", ".map", ".svg", ".txt"),
+)
+
+
+@lru_cache(maxsize=None)
+def static_url(path: str) -> str:
+    """
+    URL of a static file, versioned with a hash of its content.
+
+    Clients can cache the file forever: the URL changes with it.
+
+    :param path: path of the file in the static directory.
+    :return: URL of the file.
+    """
+    digest = hashlib.blake2b((STATIC_DIR / path).read_bytes(), digest_size=6)
+    return f"/static/{path}?v={digest.hexdigest()}"
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    Static files, sent as their ``.br`` or ``.gz`` sibling when accepted.
+
+    Nothing is compressed per request: files without siblings are sent
+    as they are. Versioned URLs (see ``static_url``) are sent with
+    ``versioned_cache_control``.
+    """
+
+    def __init__(self, *, versioned_cache_control: str, **kwargs: object) -> None:
+        super().__init__(**kwargs)  # type: ignore
+        self.versioned_cache_control = versioned_cache_control
+
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        headers = {"Vary": "Accept-Encoding"}
+        if "v" in QueryParams(scope.get("query_string", b"")):
+            headers["Cache-Control"] = self.versioned_cache_control
+
+        media_type = mimetypes.guess_type(str(full_path))[0] or "text/plain"
+        sibling = _find_sibling(
+            str(full_path),
+            request_headers.get("accept-encoding", ""),
+        )
+        if sibling is not None:
+            encoding, sibling_path, sibling_stat = sibling
+            headers["Content-Encoding"] = encoding
+            full_path, stat_result = sibling_path, sibling_stat
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+            method=scope["method"],
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def _find_sibling(
+    path: str,
+    accept_encoding: str,
+) -> Optional[Tuple[str, str, os.stat_result]]:
+    for encoding in accepted_encodings(accept_encoding):
+        sibling_path = path + SIBLING_SUFFIXES[encoding]
+        try:
+            return encoding, sibling_path, os.stat(sibling_path)
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def _compressible_files(directory: Path) -> Iterator[Path]:
+    for path in sorted(directory.rglob("*")):
+        if path.is_file() and path.suffix in COMPRESSIBLE_SUFFIXES:
+            yield path
+
+
+def precompress(directory: Path = STATIC_DIR) -> int:
+    """
+    Write the ``.br`` and ``.gz`` siblings of the static files.
+
+    Siblings newer than their file are kept, and siblings which would
+    not be smaller than the file are not written.
+
+    :param directory: static directory.
+    :return: number of siblings written.
+    """
+    written = 0
+    for path in _compressible_files(directory):
+        content = None
+        for encoding, suffix in SIBLING_SUFFIXES.items():
+            sibling = path.with_name(path.name + suffix)
+            if sibling.exists() and sibling.stat().st_mtime >= path.stat().st_mtime:
+                continue
+            if content is None:
+                content = path.read_bytes()
+            if encoding == "br":
+                compressed = brotli.compress(content, quality=11)
+            else:
+                compressed = gzip.compress(content, compresslevel=9, mtime=0)
+            if len(compressed) < len(content):
+                sibling.write_bytes(compressed)
+                written += 1
+    return written
+
+
+def main() -> None:
+    """Precompress a static directory."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory", nargs="?", type=Path, default=STATIC_DIR)
+    args = parser.parse_args()
+
+    written = precompress(args.directory)
+    print(f"{written} precompressed files written")  # noqa: WPS421
+
+
+if __name__ == "__main__":
+    main()